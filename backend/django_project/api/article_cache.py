@@ -0,0 +1,89 @@
+"""
+article_cache.py
+
+This module contains the in-process cache for data derived from an article (vocabulary vectors,
+token streams, ...), keyed by article id.
+
+Only the most recent few articles are kept, so rolling over to a new daily article drops the old ones.
+An article's content can be updated in place (re-fetching it updates its ArticleCache row), so its entries
+are dropped from every cache by discard_article: on ArticleCache saves and deletes in this process (see
+game/models.py), and when get_article_tokens sees the article's text change, for saves made by another one.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+
+_caches = weakref.WeakSet()     # Every PerArticleCache, for discard_article
+
+
+class PerArticleCache:
+    """
+    PerArticleCache is a small, thread-safe LRU of per-article values.
+    """
+
+    def __init__(self, max_articles: int = 2):
+        self.max_articles = max_articles
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, article_id):
+        return article_id in self._entries
+
+    def get(self, article_id):
+        """
+        get returns the value cached for article_id, or None.
+        """
+        with self._lock:
+            value = self._entries.get(article_id)
+            if value is not None:
+                self._entries.move_to_end(article_id)
+            return value
+
+    def set(self, article_id, value):
+        """
+        set caches value for article_id, evicting the least recently used articles beyond max_articles.
+        """
+        with self._lock:
+            self._entries[article_id] = value
+            self._entries.move_to_end(article_id)
+            while len(self._entries) > self.max_articles:
+                self._entries.popitem(last=False)
+
+    def get_or_build(self, article_id, build):
+        """
+        get_or_build returns the value cached for article_id, calling build() to create it on a miss.
+
+        build runs outside the lock; two threads racing on the same article both build, and the last one wins.
+        """
+        value = self.get(article_id)
+        if value is None:
+            value = build()
+            self.set(article_id, value)
+        return value
+
+    def discard(self, article_id):
+        """
+        discard drops the value cached for article_id, if any.
+        """
+        with self._lock:
+            self._entries.pop(article_id, None)
+
+    def clear(self):
+        """
+        clear drops every cached article.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def discard_article(article_id):
+    """
+    discard_article drops article_id from every PerArticleCache, after its content changed.
+    """
+    for cache in list(_caches):
+        cache.discard(article_id)
@@ -0,0 +1,173 @@
+"""
+article_tokens.py
+
+This module contains the tokenized form of an article, used to render each user's scrambled view.
+
+The article is parsed once; afterwards rendering a view is a dictionary lookup per distinct token
+and a join, with no spaCy call.
+"""
+
+import numpy as np
+from api.article_cache import PerArticleCache, discard_article
+from api.json_render import EncodedList
+
+KIND_WORD = 0       # Token is part of the game and is scrambled
+KIND_SPACE = 1      # Whitespace token (POS SPACE)
+KIND_PUNCT = 2      # Punctuation token (POS PUNCT), rendered as-is
+
+MAX_CACHED_ARTICLES = 2     # Number of tokenized articles kept in memory (today's and the one being rolled over)
+
+
+class TokenizedArticle:
+    """
+    TokenizedArticle holds an article's token stream in compact array form.
+
+    texts is the list of distinct token texts. Per token, token_ids indexes into texts, kinds holds
+    KIND_WORD/KIND_SPACE/KIND_PUNCT and whitespace says whether the token was followed by a space.
+    """
+
+    def __init__(self, texts, token_ids, kinds, whitespace):
+        self.texts = list(texts)
+        self.token_ids = np.asarray(token_ids, dtype=np.int32)
+        self.kinds = np.asarray(kinds, dtype=np.uint8)
+        self.whitespace = np.asarray(whitespace, dtype=np.bool_)
+
+        # Rendering only depends on the text and on whether it is punctuation, so each distinct
+        # (text, punct) pair is rendered once per call and tokens index into those pieces.
+        is_punct = self.kinds == KIND_PUNCT
+        pairs = self.token_ids.astype(np.int64) * 2 + is_punct
+        unique_pairs, self.render_ids = np.unique(pairs, return_inverse=True)
+        self.render_ids = self.render_ids.astype(np.int32).reshape(-1)
+        self.render_texts = [self.texts[pair // 2] for pair in unique_pairs.tolist()]
+        self.render_punct = (unique_pairs % 2 == 1).tolist()
+        self._keys = {}
+        self._key_ids = {}
+        self._templates = {}
+
+    def __len__(self):
+        return len(self.token_ids)
+
+    @classmethod
+    def from_doc(cls, doc):
+        """
+        from_doc builds a TokenizedArticle from a spaCy doc with POS tags.
+        """
+        texts = []
+        text_ids = {}
+        token_ids = []
+        kinds = []
+        whitespace = []
+
+        for token in doc:
+            text_id = text_ids.get(token.text)
+            if text_id is None:
+                text_id = text_ids[token.text] = len(texts)
+                texts.append(token.text)
+
+            token_ids.append(text_id)
+            if token.pos_ == "SPACE":
+                kinds.append(KIND_SPACE)
+            elif token.pos_ == "PUNCT":
+                kinds.append(KIND_PUNCT)
+            else:
+                kinds.append(KIND_WORD)
+            whitespace.append(bool(token.whitespace_))
+
+        return cls(texts, token_ids, kinds, whitespace)
+
+    def keys(self, punct_thresh: int):
+        """
+        keys returns the game's vocabulary in order of first appearance: every word, plus punctuation
+        longer than punct_thresh (for weird formattings). Whitespace is never part of the game.
+
+        The list is computed once per punct_thresh and shared, callers must not modify it.
+        """
+        if punct_thresh not in self._keys:
+            keys = {}
+            for text_id, kind in zip(self.token_ids.tolist(), self.kinds.tolist()):
+                text = self.texts[text_id]
+                if kind == KIND_WORD or (kind == KIND_PUNCT and len(text) > punct_thresh):
+                    keys[text] = text
+            self._keys[punct_thresh] = list(keys)
+        return self._keys[punct_thresh]
+
+    def key_ids(self, punct_thresh: int):
+        """
+        key_ids returns the vocabulary index of every key, its position in keys(punct_thresh).
+
+        The dictionary is computed once per punct_thresh and shared, callers must not modify it.
+        """
+        if punct_thresh not in self._key_ids:
+            self._key_ids[punct_thresh] = {key: key_id for key_id, key in enumerate(self.keys(punct_thresh))}
+        return self._key_ids[punct_thresh]
+
+    def template(self, punct_thresh: int):
+        """
+        template returns the article as a list for clients to render themselves: a string is output as-is,
+        an int is a vocabulary index (see key_ids) output as a space followed by what the user sees for that key.
+
+        Rendering the template with a game state gives the same text as render. Adjacent strings are merged.
+        """
+        if punct_thresh not in self._templates:
+            key_ids = self.key_ids(punct_thresh)
+            template = []
+            for render_id in self.render_ids.tolist():
+                text = self.render_texts[render_id]
+                if self.render_punct[render_id]:
+                    piece = text
+                elif text in key_ids:
+                    template.append(key_ids[text])
+                    continue
+                else:
+                    piece = " " + text
+
+                if template and isinstance(template[-1], str):
+                    template[-1] += piece
+                else:
+                    template.append(piece)
+            self._templates[punct_thresh] = EncodedList(template)     # Shared by every user, so encode it once
+        return self._templates[punct_thresh]
+
+    def render(self, game_state: dict):
+        """
+        render re-renders the article with the scrambling in game_state.
+
+        Punctuation is passed through as-is, every other token is prefixed with a space and replaced
+        by its game_state entry when it has one.
+        """
+        pieces = [
+            text if punct else " " + game_state.get(text, text)
+            for text, punct in zip(self.render_texts, self.render_punct)
+        ]
+        return "".join([pieces[i] for i in self.render_ids.tolist()])
+
+
+_cache = PerArticleCache(MAX_CACHED_ARTICLES)
+
+
+def get_article_tokens(article_id, text: str, tokenize):
+    """
+    get_article_tokens returns the TokenizedArticle for article_id, calling tokenize(text) to parse it on first use.
+
+    tokenize must return a spaCy doc with POS tags, or a TokenizedArticle (e.g. from the NLP service).
+    If text is not what the cached tokens were parsed from, the article was updated (possibly by another
+    process): everything cached for it is dropped and it is parsed again.
+    """
+    cached = _cache.get(article_id)
+    if cached is not None:
+        if cached[0] == text:
+            return cached[1]
+        discard_article(article_id)
+
+    tokens = tokenize(text)
+    if not isinstance(tokens, TokenizedArticle):
+        tokens = TokenizedArticle.from_doc(tokens)
+    _cache.set(article_id, (text, tokens))
+    return tokens
+
+
+def clear_token_cache():
+    """
+    clear_token_cache drops every cached tokenized article.
+    """
+    _cache.clear()
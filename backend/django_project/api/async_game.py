@@ -0,0 +1,182 @@
+"""
+async_game.py
+
+This module contains the async counterparts of the guess processing in utils.py, for the async views
+(see async_views.py).
+
+All spaCy work runs in a bounded pool of worker processes, each with its own copy of the model, so the event
+loop (and the server process) keeps answering cheap requests while guesses are scored, and the server process
+never loads the model. Guesses are scored in the pool from the event loop; the views wrapped in
+uses_scoring_pool send the rest (tokenizing articles, vectorizing their vocabulary) to it through a
+PoolNLPClient (see nlp_service.use_client). Database access goes through the async ORM.
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import wraps
+
+import numpy as np
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from api import nlp_service, scoring_worker, utils
+from api.article_tokens import TokenizedArticle
+from api.game_context import GameContext
+from api.guess_cache import get_guess_cache, normalize_guess
+from game.models import GameState, UserGuess
+
+DEFAULT_POOL_WORKERS = 2    # Worker processes scoring guesses, each loads its own spaCy model
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool_workers():
+    """
+    get_pool_workers returns the number of scoring processes, NLP_POOL_WORKERS in settings.
+
+    0 scores guesses on a thread of this process instead, e.g. for development.
+    """
+    return getattr(settings, "NLP_POOL_WORKERS", DEFAULT_POOL_WORKERS)
+
+
+def uses_pool():
+    """
+    uses_pool returns whether NLP work goes to the process pool: pool workers are set and no NLP service is.
+    """
+    return get_pool_workers() > 0 and not getattr(settings, "NLP_SERVICE_ADDRESS", None)
+
+
+def get_scoring_pool():
+    """
+    get_scoring_pool returns the shared pool of scoring processes, starting it on first use.
+
+    Workers are spawned rather than forked, since the server process may already be running threads.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=get_pool_workers(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=scoring_worker.init_worker,
+                )
+    return _pool
+
+
+def shutdown_scoring_pool():
+    """
+    shutdown_scoring_pool stops the scoring processes. The next scored guess starts a new pool.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class PoolNLPClient:
+    """
+    PoolNLPClient has NLPClient's methods (see nlp_service.py), answered by the scoring pool.
+
+    Its methods block until the pool answers, so call them from sync code on a thread, not the event loop.
+    """
+
+    def __init__(self):
+        self._vectors_length = None
+
+    def _run(self, fn, *args):
+        return get_scoring_pool().submit(fn, *args).result()
+
+    def vectors_length(self):
+        """
+        vectors_length returns the width of the model's word vectors.
+        """
+        if self._vectors_length is None:
+            self._vectors_length = self._run(scoring_worker.vectors_length)
+        return self._vectors_length
+
+    def vectorize(self, texts):
+        """
+        vectorize returns the document vector of every text, as a float32 array with one row per text.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.vectors_length()), dtype=np.float32)
+        return np.stack(self._run(scoring_worker.vectorize, texts))
+
+    def score(self, guess: str, title: str):
+        """
+        score returns the GuessEntry of guess against title.
+        """
+        return self._run(scoring_worker.score_guess, guess, title)
+
+    def tokenize(self, text: str):
+        """
+        tokenize returns the TokenizedArticle of text.
+        """
+        return TokenizedArticle(*self._run(scoring_worker.tokenize, [text])[0])
+
+
+_pool_client = PoolNLPClient()
+
+
+def uses_scoring_pool(view):
+    """
+    uses_scoring_pool decorates an async view so the NLP work of its utils calls goes to the scoring pool.
+    """
+    @wraps(view)
+    async def inner(*args, **kwargs):
+        with nlp_service.use_client(_pool_client if uses_pool() else None):
+            return await view(*args, **kwargs)
+    return inner
+
+
+async def ascore_guess(guess: str, title: str):
+    """
+    ascore_guess returns the GuessEntry of a normalized guess against title, scoring it off the event loop on a miss.
+
+    The entry is cached in this process's guess cache, so guess_update finds it afterwards.
+    """
+    cache = get_guess_cache()
+    entry = cache.get(title, guess)
+    if entry is not None:
+        return entry
+
+    # The NLP service (see nlp_service.py) already scores out of process, only wait for it off the loop
+    if uses_pool():
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(get_scoring_pool(), scoring_worker.score_guess, guess, title)
+    else:
+        entry = await sync_to_async(utils.score_guess, thread_sensitive=False)(guess, title)
+    cache.set(title, guess, entry)
+    return entry
+
+
+async def aprocess_guess(user_id, guess: str, context: GameContext):
+    """
+    aprocess_guess is the async version of utils.process_guess, for a context loaded with aload_game_context.
+    """
+    print("Processing guess: " + guess + " for id = " + str(user_id))
+
+    game_state = context.game_state
+    if game_state is None:
+        raise GameState.DoesNotExist("No game for user " + str(user_id))
+    if not utils.can_guess(context, guess):
+        return
+
+    # Score in the pool, then apply the reveal on a thread: the scored guess is cached now, and the article's
+    # vocabulary is vectorized by the pool (once per article) under uses_scoring_pool
+    await ascore_guess(normalize_guess(guess), context.title)
+    changed_fields, guess_fields = await sync_to_async(utils.play_guess, thread_sensitive=False)(context, guess)
+
+    # Update database with new state and scores, writing only the changed column
+    await game_state.asave(update_fields=changed_fields)
+    context.add_guess(await UserGuess.objects.acreate(game_state=game_state, **guess_fields))
+
+    # If the user finished the game, update the user's profile
+    for score in utils.get_final_scores(context):
+        await sync_to_async(utils.update_user_profile)(user_id, score, context.profile)
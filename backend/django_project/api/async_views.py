@@ -0,0 +1,218 @@
+"""
+async_views.py
+
+This module contains async versions of the API's game views, with the same URLs and responses as views.py.
+They are served instead of the sync views when ASYNC_GAME_VIEWS is set (see urls.py), and are meant for
+running under ASGI (asgi.py): guesses are scored in a process pool (see async_game.py) and the database is
+read through the async ORM, so one server process keeps answering reads while guesses are being scored.
+Every view is wrapped in uses_scoring_pool, so the server process never runs spaCy itself.
+"""
+
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET, require_POST
+from game.daily_article_cache import get_cached_daily_article
+from . import utils
+from .async_game import aprocess_guess, uses_scoring_pool
+from .game_context import aload_game_context, aload_game_version
+from .json_render import JSONResponse
+from .views import make_game_etag
+
+
+async def agame_etag(request):
+    """
+    agame_etag is the async version of views.game_etag.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+
+    version = await aload_game_version(user.id)
+    return make_game_etag(request, version, await sync_to_async(get_cached_daily_article)())
+
+
+def acondition(etag_func):
+    """
+    acondition is Django's condition decorator for async views with an async etag_func.
+
+    condition calls etag_func synchronously, which cannot use the ORM from the event loop.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag = await etag_func(request, *args, **kwargs)
+            etag = quote_etag(etag) if etag is not None else None
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+
+            if etag and request.method in ("GET", "HEAD"):
+                response.headers.setdefault("ETag", etag)
+            return response
+        return inner
+    return decorator
+
+
+def get_request_data(request):
+    """
+    get_request_data returns the request's POST data, sent as JSON or as a form.
+
+    For UTIL use, NOT USER.
+    """
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+### API PATHS ###
+@require_GET
+@uses_scoring_pool
+@acondition(agame_etag)
+async def get_scrambled_article(request):
+    """
+    get_scrambled_article(request)
+
+    Async version of views.get_scrambled_article. The article is rendered (and a game created if needed) on a thread.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    print("get_scrambled_article request for user: " + str(user.id))
+
+    context = await aload_game_context(user.id)
+    template = request.GET.get('template') in ('1', 'true')
+    return JSONResponse(await sync_to_async(utils.get_user_article)(user.id, context, template=template))
+
+
+@require_GET
+@uses_scoring_pool
+async def get_article_delta(request):
+    """
+    get_article_delta(request)
+
+    Async version of views.get_article_delta.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    print("get_article_delta request for user: " + str(user.id))
+
+    context = await aload_game_context(user.id)
+    return JSONResponse(await sync_to_async(utils.get_article_delta)(user.id, request.GET.get('since'), context))
+
+
+@require_GET
+@uses_scoring_pool
+@acondition(agame_etag)
+async def get_guess_scoreboard(request):
+    """
+    get_guess_scoreboard(request)
+
+    Async version of views.get_guess_scoreboard.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    print("get_guess_scoreboard request for user: " + str(user.id))
+
+    # Scores come straight from the loaded context, nothing left to offload
+    context = await aload_game_context(user.id)
+    return JSONResponse(utils.get_user_scores(user.id, context))
+
+
+@require_POST
+@uses_scoring_pool
+async def process_guess(request):
+    """
+    process_guess(request)
+
+    Async version of views.process_guess, with the same "snapshot" and "since" options.
+    The guess is scored in the NLP process pool (see async_game.py).
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    data = get_request_data(request)
+    context = None
+    delta = None
+
+    # Read guess parameter from post
+    guess = data.get('guess')
+    if guess:
+        print("Received guess: " + guess + " for user: " + str(user.id))
+        context = await aload_game_context(user.id)
+        since = data.get('since')
+        if since is None and context.game_state is not None:
+            since = utils.get_state_token(context)  # Version before this guess
+        await aprocess_guess(user.id, guess, context)
+        if context.game_state is not None:
+            delta = await sync_to_async(utils.get_article_delta)(user.id, since, context)
+    else:
+        print("Unable to parse guess")
+
+    # Prepare the response data
+    response_data = {
+        "request": "process_guess",
+        "guess" : guess
+    }
+    if delta is not None:
+        response_data["delta"] = delta
+
+    # Reuse the game loaded for the guess to return the new state
+    if data.get('snapshot'):
+        if context is None:
+            context = await aload_game_context(user.id)
+        response_data["snapshot"] = await sync_to_async(utils.get_game_snapshot)(user.id, context)
+
+    return JSONResponse(response_data)
+
+
+@require_GET
+@uses_scoring_pool
+@acondition(agame_etag)
+async def get_game_over(request):
+    """
+    get_game_over(request)
+
+    Async version of views.get_game_over.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    print("get_game_over request for user: " + str(user.id))
+
+    context = await aload_game_context(user.id)
+    return JSONResponse(utils.get_game_over(user.id, context))
+
+
+@require_GET
+@uses_scoring_pool
+async def get_game_snapshot(request):
+    """
+    get_game_snapshot(request)
+
+    Async version of views.get_game_snapshot.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    print("get_game_snapshot request for user: " + str(user.id))
+
+    context = await aload_game_context(user.id)
+    return JSONResponse(await sync_to_async(utils.get_game_snapshot)(user.id, context))
@@ -0,0 +1,142 @@
+"""
+game_context.py
+
+This module contains the GameContext loader: everything an API request needs about a user's game
+(user, profile, current game state, its article and guesses, and today's daily article),
+fetched together instead of one query per helper.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.utils import timezone
+from game.daily_article_cache import get_cached_daily_article
+from game.models import DailyArticle, GameState
+
+
+class GameContext:
+    """
+    GameContext holds one user's game data for the length of a request.
+
+    game_state is None when the user has no game yet. guesses is the game's guesses in order, kept
+    up to date by add_guess so helpers never query them again. daily_article is today's
+    CachedDailyArticle (see game/daily_article_cache.py) when it was loaded through the cache.
+    """
+
+    def __init__(self, user, game_state=None, guesses=None, daily_title=None, daily_article=None):
+        self.user = user
+        self.game_state = game_state
+        self.guesses = list(guesses) if guesses else []
+        self.daily_article = daily_article
+        self.daily_title = daily_article.title if daily_title is None and daily_article is not None else daily_title
+
+    @property
+    def article(self):
+        return self.game_state.article if self.game_state is not None else None
+
+    @property
+    def profile(self):
+        return self.user.profile
+
+    @property
+    def title(self):
+        """
+        title returns today's daily article title, raising DailyArticle.DoesNotExist if none is set.
+        """
+        if self.daily_title is None:
+            raise DailyArticle.DoesNotExist("No daily article for " + str(timezone.now().date()))
+        return self.daily_title
+
+    @property
+    def scores(self):
+        """
+        scores returns the game's guesses as {guess text: score}, in the order they were made.
+        """
+        return {guess.guess_text: guess.score for guess in self.guesses}
+
+    def set_game_state(self, game_state):
+        """
+        set_game_state replaces the context's game (e.g. after a new one was created), which starts without guesses.
+        """
+        self.game_state = game_state
+        self.guesses = []
+
+    def add_guess(self, guess):
+        """
+        add_guess records a guess that was just saved for the context's game.
+        """
+        self.guesses.append(guess)
+
+
+def load_game_context(user_id):
+    """
+    load_game_context loads the GameContext of the user identified by user_id.
+
+    With a game in progress this is one query (game state joined with its user, profile and article) plus
+    one for the guesses; today's article comes from the daily article cache. Raises User.DoesNotExist for
+    an unknown user.
+    """
+    daily_article = get_cached_daily_article()
+    game_state = (
+        GameState.objects
+        .select_related("user", "user__profile", "article")
+        .prefetch_related("guesses")
+        .filter(user_id=user_id)
+        .first()
+    )
+    if game_state is not None:
+        return GameContext(game_state.user, game_state, game_state.guesses.all(), daily_article=daily_article)
+
+    # No game yet, load the user on their own
+    user = User.objects.select_related("profile").get(id=user_id)
+    return GameContext(user, daily_article=daily_article)
+
+
+async def aload_game_context(user_id):
+    """
+    aload_game_context is the async version of load_game_context, for async views. Same queries, through the async ORM.
+    """
+    daily_article = await sync_to_async(get_cached_daily_article)()
+    game_state = await (
+        GameState.objects
+        .select_related("user", "user__profile", "article")
+        .prefetch_related("guesses")
+        .filter(user_id=user_id)
+        .afirst()
+    )
+    if game_state is not None:
+        return GameContext(game_state.user, game_state, game_state.guesses.all(), daily_article=daily_article)
+
+    # No game yet, load the user on their own
+    user = await User.objects.select_related("profile").aget(id=user_id)
+    return GameContext(user, daily_article=daily_article)
+
+
+def load_game_version(user_id):
+    """
+    load_game_version returns a cheap version of the user's game, (game id, article id, updated_at, number of guesses),
+    or None if the user has no game.
+
+    Any change to the game's state or guesses changes the version. It is one query, with no NLP or rendering
+    work, so responses built from the game can be validated before loading it (see the ETags in views.py).
+    """
+    return (
+        GameState.objects
+        .filter(user_id=user_id)
+        .annotate(guess_count=Count("guesses"))
+        .values_list("id", "article_id", "updated_at", "guess_count")
+        .first()
+    )
+
+
+async def aload_game_version(user_id):
+    """
+    aload_game_version is the async version of load_game_version.
+    """
+    return await (
+        GameState.objects
+        .filter(user_id=user_id)
+        .annotate(guess_count=Count("guesses"))
+        .values_list("id", "article_id", "updated_at", "guess_count")
+        .afirst()
+    )
@@ -0,0 +1,182 @@
+"""
+guess_cache.py
+
+This module contains the in-process cache of scored guesses, shared by every user's games.
+
+Most guesses for a daily article are the same few topic words, so a guess's vector and its
+similarity to the title are computed once and reused. Entries only depend on the guess text and the
+title, so they are keyed by both: around the daily rollover, users still on yesterday's article share the
+cache with today's, and yesterday's guesses age out of the LRU as they stop being asked.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+DEFAULT_MAX_ENTRIES = 10000             # Most distinct (title, guess) pairs kept
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024    # Most memory the cached vectors and texts may take
+ENTRY_OVERHEAD_BYTES = 200              # Rough per-entry bookkeeping cost (dict slot, tuple, array header)
+
+
+def normalize_guess(guess: str):
+    """
+    normalize_guess collapses runs of whitespace into single spaces and trims the ends.
+
+    Guesses that only differ in spacing share one cache entry and score the same.
+    """
+    return " ".join(guess.split())
+
+
+class GuessEntry:
+    """
+    GuessEntry is a scored guess: its document vector, the vector's norm and its similarity to the title.
+    """
+
+    __slots__ = ("vector", "norm", "title_sim")
+
+    def __init__(self, vector, norm: float, title_sim: float):
+        self.vector = vector
+        self.norm = norm
+        self.title_sim = title_sim
+
+
+class GuessCache:
+    """
+    GuessCache is a thread-safe LRU of GuessEntry by (title, normalized guess text), bounded by entry count and by bytes.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, title: str, guess: str):
+        """
+        get returns the GuessEntry cached for guess against title, or None. guess must be normalized.
+        """
+        key = (title, guess)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, title: str, guess: str, entry: GuessEntry):
+        """
+        set caches entry for guess against title, evicting the least recently used guesses beyond the bounds.
+        """
+        size = entry.vector.nbytes + sys.getsizeof(guess) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+
+        key = (title, guess)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._sizes[key]
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def get_or_score(self, title: str, guess: str, score):
+        """
+        get_or_score returns the GuessEntry for guess against title, calling score(guess, title) to create it on a miss.
+
+        score runs outside the lock; two threads racing on the same guess both score it, and the last one wins.
+        """
+        entry = self.get(title, guess)
+        if entry is None:
+            entry = score(guess, title)
+            self.set(title, guess, entry)
+        return entry
+
+    def clear(self):
+        """
+        clear drops every cached guess and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """
+        stats returns the cache's counters.
+
+        Format is Dictionary/JSON:
+        stats = {
+            "entries" : <number of cached (title, guess) pairs>,
+            "bytes" : <estimated memory used>,
+            "hits" : <lookups answered from the cache>,
+            "misses" : <lookups that had to score the guess>,
+            "hit_rate" : <hits / lookups, 0 before any lookup>,
+            "evictions" : <guesses dropped to stay within the bounds>
+        }
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_guess_cache():
+    """
+    get_guess_cache returns the process's GuessCache, sized from GUESS_CACHE_MAX_ENTRIES/GUESS_CACHE_MAX_BYTES in settings.
+    """
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GuessCache(
+                    getattr(settings, "GUESS_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+                    getattr(settings, "GUESS_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+                )
+    return _cache
+
+
+def clear_guess_cache():
+    """
+    clear_guess_cache drops every cached guess.
+    """
+    get_guess_cache().clear()
+
+
+def guess_cache_stats():
+    """
+    guess_cache_stats returns the process's guess cache counters (see GuessCache.stats).
+    """
+    return get_guess_cache().stats()
@@ -0,0 +1,117 @@
+"""
+json_render.py
+
+This module contains the JSON rendering of the game API's responses.
+
+Parts of a response that are the same for every user of an article (its template, image URL, ...) are
+encoded once and spliced into each response as bytes; only the per-user fields (scrambled text, scores,
+state) are encoded per request. orjson is used when it is installed, the standard library json otherwise.
+"""
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+
+def dumps(value):
+    """
+    dumps returns value encoded as compact JSON bytes, with the fast encoder when it is installed.
+
+    Values json cannot encode natively (dates, decimals, ...) are encoded the way JsonResponse does.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_encoder.default)
+    return _encoder.encode(value).encode()
+
+
+class EncodedList(list):
+    """
+    EncodedList is a list that is encoded once, the first time it is rendered. It must not be changed after that.
+    """
+
+    _encoded = None
+
+    @property
+    def encoded(self):
+        if self._encoded is None:
+            self._encoded = dumps(list(self))
+        return self._encoded
+
+
+class EncodedFields(dict):
+    """
+    EncodedFields is a dict whose fixed keys are encoded once, so rendering it only encodes the other keys.
+
+    The fixed keys are still read and written like any other; if one is replaced, the dict is encoded in full.
+    """
+
+    def __init__(self, data, fixed):
+        super().__init__(data)
+        self._fixed = tuple((key, data[key]) for key in fixed if key in data)
+        self._fixed_json = b",".join(dumps(key) + b":" + dumps(value) for key, value in self._fixed)
+
+    def copy(self):
+        """
+        copy returns a shallow copy sharing the encoded fixed keys, e.g. to fill in a user's fields.
+        """
+        other = dict.__new__(EncodedFields)
+        dict.update(other, self)
+        other._fixed = self._fixed
+        other._fixed_json = self._fixed_json
+        return other
+
+    def render(self):
+        """
+        render returns the dict encoded as JSON bytes, reusing the encoding of the fixed keys.
+        """
+        if any(self.get(key, self) is not value for key, value in self._fixed):
+            return _render_dict(self)
+
+        fixed = {key for key, _ in self._fixed}
+        rest = [_render_item(key, value) for key, value in self.items() if key not in fixed]
+        return b"{" + b",".join(([self._fixed_json] if self._fixed_json else []) + rest) + b"}"
+
+
+def _has_encoded(value):
+    if isinstance(value, (EncodedList, EncodedFields)):
+        return True
+    return isinstance(value, dict) and any(_has_encoded(item) for item in value.values())
+
+
+def _render_item(key, value):
+    return dumps(key) + b":" + render(value)
+
+
+def _render_dict(value):
+    return b"{" + b",".join(_render_item(key, item) for key, item in value.items()) + b"}"
+
+
+def render(value):
+    """
+    render returns value encoded as JSON bytes, splicing in the pre-encoded parts it holds.
+
+    Only dicts holding pre-encoded parts are walked, everything else is encoded in one call.
+    """
+    if isinstance(value, EncodedList):
+        return value.encoded
+    if isinstance(value, EncodedFields):
+        return value.render()
+    if isinstance(value, dict) and _has_encoded(value):
+        return _render_dict(value)
+    return dumps(value)
+
+
+class JSONResponse(HttpResponse):
+    """
+    JSONResponse is JsonResponse rendered with render, for responses that hold pre-encoded parts.
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=render(data), **kwargs)
@@ -0,0 +1,162 @@
+"""
+micro_batch.py
+
+This module contains MicroBatcher, which coalesces work submitted by concurrent callers into batches.
+
+Callers submit lists of items under a key and wait on a Future; a single worker thread collects whatever is
+submitted within a short window (batch_wait seconds after the first item, at most batch_size submissions)
+and runs each key's items in one call. Used by the in-process scoring queue (scoring_queue.py) and the
+NLP worker (nlp_service.py).
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class BatcherClosed(RuntimeError):
+    """
+    BatcherClosed is the error of a submission to a closed MicroBatcher, or one still queued when it was closed.
+    """
+
+
+class MicroBatcher:
+    """
+    MicroBatcher runs run_batch(key, items) -> results (one per item) over the items submitted together under key.
+
+    batch_wait bounds the latency a batch adds, batch_size bounds the work (and so the wait) of one batch.
+    """
+
+    def __init__(self, run_batch, batch_size: int, batch_wait: float, name: str = "micro-batcher"):
+        self.run_batch = run_batch
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.name = name
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self._pending = queue.Queue()
+        self._thread = None
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+
+    def submit(self, key, items):
+        """
+        submit queues items under key and returns a Future of their results, in order.
+
+        After close, the Future fails straight away with BatcherClosed.
+        """
+        self._ensure_started()
+        future = Future()
+        with self._lock:
+            if self._closed.is_set():
+                future.set_exception(BatcherClosed(self.name + " is closed"))
+            else:
+                self._pending.put((key, list(items), future))
+        return future
+
+    def close(self):
+        """
+        close stops the worker thread once it finishes its current batch. Items still queued are failed.
+        """
+        with self._lock:
+            self._closed.set()
+        self._fail_pending()
+
+    def _fail_pending(self):
+        while True:
+            try:
+                _, _, future = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(BatcherClosed(self.name + " is closed"))
+
+    def stats(self):
+        """
+        stats returns the number of submissions answered, the batches they were answered in, and the largest batch.
+        """
+        with self._lock:
+            return {"requests": self.requests, "batches": self.batches, "largest_batch": self.largest_batch}
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _loop(self):
+        while not self._closed.is_set():
+            try:
+                batch = [self._pending.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+
+            # Collect whatever else arrives within the batch window
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            self._run(batch)
+
+        self._fail_pending()
+
+    def _run(self, batch):
+        """
+        _run answers a batch of submissions with one run_batch call per key over all of their items.
+
+        If a key's call fails, its submissions are retried one by one, so a bad submission only fails itself.
+        """
+        by_key = {}
+        for key, items, future in batch:
+            by_key.setdefault(key, []).append((items, future))
+
+        outcomes = []
+        for key, submissions in by_key.items():
+            try:
+                results = self.run_batch(key, [item for items, _ in submissions for item in items])
+            except Exception as e:
+                if len(submissions) == 1:
+                    logger.warning(f"{self.name} batch for {key} failed: {e}")
+                    outcomes.append((submissions[0][1], None, e))
+                else:
+                    outcomes.extend(self._run_alone(key, submissions))
+                continue
+
+            start = 0
+            for items, future in submissions:
+                outcomes.append((future, results[start:start + len(items)], None))
+                start += len(items)
+
+        # Count the batch before answering it, so a caller holding its result sees up to date stats
+        with self._lock:
+            self.requests += len(batch)
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+        for future, results, error in outcomes:
+            if error is None:
+                future.set_result(results)
+            else:
+                future.set_exception(error)
+
+    def _run_alone(self, key, submissions):
+        """
+        _run_alone runs each submission of a failed batch on its own, returning (future, results, error) of each.
+        """
+        for items, future in submissions:
+            try:
+                yield future, self.run_batch(key, items), None
+            except Exception as e:
+                logger.warning(f"{self.name} request for {key} failed: {e}")
+                yield future, None, e
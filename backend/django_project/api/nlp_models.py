@@ -0,0 +1,226 @@
+"""
+nlp_models.py
+
+This module contains the spaCy model used by the game and the NLP profiles it is run with.
+
+The model is loaded lazily by get_nlp() the first time something needs it, so importing api.utils
+(every manage.py command, test run and worker boot) no longer pays for it. Under a pre-forking server
+call preload() in the master process before workers fork, so they share the vector tables copy-on-write.
+model_stats() reports how long the load took and how much memory it cost.
+
+A profile names the pipeline components a code path needs, so nothing pays for the parser or NER
+unless it asks for them:
+    "vectors" - tokenizer only, enough for word vectors and similarity
+    "tagger"  - tokenizer, tagger and attribute ruler, enough for SPACE/PUNCT detection
+    "full"    - every component in the model
+
+Both the model and the profiles can be overridden with NLP_MODEL and NLP_PROFILES in settings.py.
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+from django.conf import settings
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_VECTORS = "vectors"
+PROFILE_TAGGER = "tagger"
+PROFILE_FULL = "full"
+
+DEFAULT_MODEL = "en_core_web_lg"    # python -m spacy download en_core_web_lg
+DEFAULT_BATCH_SIZE = 256            # Texts per nlp.pipe batch in pipe_docs
+
+# Components enabled for each profile. An empty list runs the tokenizer only, None runs everything.
+DEFAULT_PROFILES = {
+    PROFILE_VECTORS: [],
+    PROFILE_TAGGER: ["tok2vec", "tagger", "attribute_ruler"],
+    PROFILE_FULL: None,
+}
+
+_nlp = None
+_nlp_lock = threading.Lock()
+_stats = {}
+
+
+def _get_memory():
+    """
+    _get_memory returns the current process's resident and unique memory in bytes, or None without psutil.
+    """
+    if psutil is None:  # pragma: no cover
+        return None
+
+    process = psutil.Process()
+    try:
+        info = process.memory_full_info()
+        return {"rss": info.rss, "uss": info.uss}
+    except (psutil.AccessDenied, AttributeError):  # pragma: no cover
+        return {"rss": process.memory_info().rss, "uss": None}
+
+
+def _load(name: str):
+    """
+    _load loads the spaCy model name and records load time and memory in _stats.
+    """
+    memory_before = _get_memory()
+    start = time.perf_counter()
+
+    import spacy  # Imported here, importing spacy alone takes most of a second
+    model = spacy.load(name)
+
+    load_seconds = time.perf_counter() - start
+    memory_after = _get_memory()
+
+    _stats.clear()
+    _stats.update({
+        "model": name,
+        "pid": os.getpid(),
+        "load_seconds": load_seconds,
+        "rss_bytes": memory_after["rss"] if memory_after else None,
+        "rss_delta_bytes": memory_after["rss"] - memory_before["rss"] if memory_after else None,
+    })
+
+    logger.info(
+        f"Loaded spaCy model {name} in {load_seconds:.2f}s"
+        + (f", RSS +{_stats['rss_delta_bytes'] / 2**20:.0f}MB" if memory_after else "")
+    )
+    return model
+
+
+def get_nlp():
+    """
+    get_nlp returns the shared spaCy model, loading it on first use.
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                _nlp = _load(getattr(settings, "NLP_MODEL", DEFAULT_MODEL))
+    return _nlp
+
+
+def is_loaded():
+    """
+    is_loaded returns whether the model has been loaded in this process.
+    """
+    return _nlp is not None
+
+
+def preload(freeze: bool = True):
+    """
+    preload loads the model now instead of on first use.
+
+    Meant for the master process of a pre-forking server (e.g. gunicorn --preload) so every worker
+    inherits the loaded model. With freeze, the objects allocated so far are moved out of the garbage
+    collector's reach, otherwise collections in the workers would touch and copy the shared pages.
+    """
+    model = get_nlp()
+    if freeze and hasattr(gc, "freeze"):
+        gc.collect()
+        gc.freeze()
+    return model
+
+
+def unload():
+    """
+    unload drops this process's reference to the model, so the next get_nlp() loads it again.
+    """
+    global _nlp
+    with _nlp_lock:
+        _nlp = None
+        _stats.clear()
+
+
+def model_stats():
+    """
+    model_stats returns load statistics for the model, and the current memory of this process.
+
+    Format is Dictionary/JSON:
+    stats = {
+        "loaded" : <bool>,
+        "model" : <model name - if loaded>,
+        "pid" : <pid that loaded the model - if loaded>,
+        "load_seconds" : <load time - if loaded>,
+        "rss_bytes" : <RSS right after loading - if loaded>,
+        "rss_delta_bytes" : <RSS growth caused by loading - if loaded>,
+        "current_rss_bytes" : <RSS now>,
+        "current_uss_bytes" : <memory unique to this process now, shared pages excluded>
+    }
+    """
+    stats = {"loaded": is_loaded()}
+    stats.update(_stats)
+
+    memory = _get_memory()
+    stats["current_rss_bytes"] = memory["rss"] if memory else None
+    stats["current_uss_bytes"] = memory["uss"] if memory else None
+    return stats
+
+
+def _reset_lock_after_fork():
+    """
+    _reset_lock_after_fork gives a forked child a fresh lock, in case the fork happened mid-load.
+    """
+    global _nlp_lock
+    _nlp_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
+
+
+def get_profiles():
+    """
+    get_profiles returns the profile table, with any NLP_PROFILES from settings layered over the defaults.
+    """
+    profiles = dict(DEFAULT_PROFILES)
+    profiles.update(getattr(settings, "NLP_PROFILES", {}))
+    return profiles
+
+
+def get_disabled(profile: str):
+    """
+    get_disabled returns the names of the pipeline components profile leaves switched off.
+
+    Returns None for a tokenizer-only profile, since no component runs at all.
+    """
+    profiles = get_profiles()
+    if profile not in profiles:
+        raise ValueError("Unknown NLP profile: " + str(profile))
+
+    enabled = profiles[profile]
+    if enabled is None:
+        return []
+    if not enabled:
+        return None
+    return [name for name in get_nlp().pipe_names if name not in enabled]
+
+
+def get_doc(text: str, profile: str = PROFILE_FULL):
+    """
+    get_doc converts a string into a spaCy doc, running only the components of profile.
+    """
+    disabled = get_disabled(profile)
+    if disabled is None:
+        return get_nlp().make_doc(text)
+    return get_nlp()(text, disable=disabled)
+
+
+def pipe_docs(texts, profile: str = PROFILE_FULL, batch_size: int = DEFAULT_BATCH_SIZE, n_process: int = 1):
+    """
+    pipe_docs converts many strings into spaCy docs with nlp.pipe, running only the components of profile.
+
+    Docs are yielded in the order of texts. n_process > 1 parses in worker processes, which only pays off for
+    thousands of texts.
+    """
+    nlp = get_nlp()
+    disabled = get_disabled(profile)
+    if disabled is None:
+        disabled = nlp.pipe_names   # Tokenizer only
+    return nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disabled)
@@ -0,0 +1,283 @@
+"""
+nlp_service.py
+
+This module contains the optional out-of-process NLP service: one long-lived worker owns the spaCy model
+and web workers send it their scoring, vectorizing and tokenizing work over a local socket, so they never
+load the model themselves.
+
+The worker is started with `python manage.py run_nlp_worker` and web workers use it when NLP_SERVICE_ADDRESS
+is set in settings (see utils.py). Messages go over multiprocessing.connection, authenticated with a key
+derived from SECRET_KEY. Each message is a request (op, payload) answered with ("ok", result) or
+("error", message). Ops:
+    "info"       - None -> {"model": <name>, "vectors_length": <vector width>}
+    "vectorize"  - [text, ...] -> float32 array of document vectors, one row per text
+    "similarity" - [(text, text), ...] -> [similarity, ...]
+    "score"      - [(guess, title), ...] -> [GuessEntry, ...] (see utils.score_guess)
+    "tokenize"   - [text, ...] -> [(texts, token_ids, kinds, whitespace), ...] (see TokenizedArticle)
+
+Requests arriving together (from any connection) are batched into one nlp.pipe call per op.
+"""
+
+import contextvars
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+from django.conf import settings
+from api import nlp_models, scoring_worker
+from api.article_tokens import TokenizedArticle
+from api.micro_batch import MicroBatcher
+from api.scoring_queue import score_pairs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 64         # Most requests answered by one batch
+DEFAULT_BATCH_WAIT = 0.005      # Seconds a batch waits for more requests after the first one
+DEFAULT_TIMEOUT = 30            # Seconds a client waits for an answer
+
+
+class NLPServiceError(RuntimeError):
+    """
+    NLPServiceError is raised by NLPClient when the service cannot be reached or a request fails.
+    """
+
+
+def get_authkey():
+    """
+    get_authkey returns the key clients and the worker authenticate each other with, derived from SECRET_KEY.
+    """
+    return hashlib.sha256(("nlp-service:" + settings.SECRET_KEY).encode()).digest()
+
+
+##### WORKER #####
+def _similarity(pairs):
+    texts = list(dict.fromkeys(text for pair in pairs for text in pair))
+    docs = dict(zip(texts, nlp_models.pipe_docs(texts, nlp_models.PROFILE_VECTORS)))
+    return [docs[a].similarity(docs[b]) for a, b in pairs]
+
+
+# Batched ops: a list of items in, one result per item out
+_BATCH_OPS = {
+    "vectorize": scoring_worker.vectorize,
+    "similarity": _similarity,
+    "score": score_pairs,
+    "tokenize": scoring_worker.tokenize,
+}
+
+
+class NLPServer:
+    """
+    NLPServer answers NLP requests on address (a Unix socket path), batching requests that arrive together.
+
+    Every connection is served by its own thread; a single batching thread (see micro_batch.py) owns the model,
+    collecting up to batch_size pending requests (waiting at most batch_wait seconds after the first) into one
+    call per op.
+    """
+
+    def __init__(self, address: str, batch_size: int = DEFAULT_BATCH_SIZE, batch_wait: float = DEFAULT_BATCH_WAIT):
+        self.address = address
+        self.batcher = MicroBatcher(lambda op, items: _BATCH_OPS[op](items), batch_size, batch_wait, name="nlp-batcher")
+        self._listener = None
+        self._closed = threading.Event()
+
+    def start(self):
+        """
+        start listens on the socket without blocking. The batching thread starts with the first request.
+        """
+        if os.path.exists(self.address):
+            os.unlink(self.address)     # Left behind by a worker that did not shut down cleanly
+        self._listener = Listener(self.address, family="AF_UNIX", authkey=get_authkey())
+        threading.Thread(target=self._accept_loop, name="nlp-accept", daemon=True).start()
+        logger.info(f"NLP service listening on {self.address}")
+
+    def serve_forever(self):
+        """
+        serve_forever starts the server and blocks until close is called.
+        """
+        self.start()
+        self._closed.wait()
+
+    def close(self):
+        """
+        close stops accepting connections and removes the socket.
+        """
+        self._closed.set()
+        self.batcher.close()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def stats(self):
+        """
+        stats returns the number of requests answered and of batches they were answered in.
+        """
+        return self.batcher.stats()
+
+    def submit(self, op: str, payload):
+        """
+        submit queues a request for the batching thread and returns a Future of its result.
+        """
+        future = Future()
+        if op == "info":
+            future.set_result({"model": nlp_models.model_stats().get("model"),
+                               "vectors_length": scoring_worker.vectors_length()})
+        elif op not in _BATCH_OPS:
+            future.set_exception(ValueError("Unknown op: " + str(op)))
+        else:
+            future = self.batcher.submit(op, payload)
+        return future
+
+    def _accept_loop(self):
+        while not self._closed.is_set():
+            try:
+                connection = self._listener.accept()
+            except Exception as e:     # Closed listener, or a client that failed authentication
+                if self._closed.is_set():
+                    return
+                logger.warning(f"NLP service rejected a connection: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        with connection:
+            while not self._closed.is_set():
+                try:
+                    op, payload = connection.recv()
+                except (EOFError, OSError):
+                    return      # Client went away
+                except Exception as e:
+                    connection.send(("error", "Bad request: " + str(e)))
+                    continue
+
+                try:
+                    connection.send(("ok", self.submit(op, payload).result()))
+                except Exception as e:
+                    connection.send(("error", str(e)))
+
+
+##### CLIENT #####
+class NLPClient:
+    """
+    NLPClient sends requests to the NLPServer at address. It is thread-safe, each thread has its own connection.
+    """
+
+    def __init__(self, address: str, timeout: float = DEFAULT_TIMEOUT):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+        self._info = None
+
+    def _connect(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            try:
+                connection = Client(self.address, family="AF_UNIX", authkey=get_authkey())
+            except (OSError, EOFError) as e:
+                raise NLPServiceError("Cannot reach the NLP service at " + self.address + ": " + str(e)) from e
+            self._local.connection = connection
+        return connection
+
+    def _drop_connection(self):
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            connection.close()
+
+    def call(self, op: str, payload=None):
+        """
+        call sends one request and returns its result, reconnecting once if the connection was lost.
+        """
+        for attempt in range(2):
+            connection = self._connect()
+            try:
+                connection.send((op, payload))
+                if not connection.poll(self.timeout):
+                    self._drop_connection()     # The late answer would be read by the next request
+                    raise NLPServiceError("NLP service did not answer " + op + " within " + str(self.timeout) + "s")
+                status, result = connection.recv()
+                break
+            except (OSError, EOFError) as e:
+                self._drop_connection()
+                if attempt == 1:
+                    raise NLPServiceError("Lost the connection to the NLP service: " + str(e)) from e
+
+        if status != "ok":
+            raise NLPServiceError(result)
+        return result
+
+    def vectors_length(self):
+        """
+        vectors_length returns the width of the model's word vectors.
+        """
+        if self._info is None:
+            self._info = self.call("info")
+        return self._info["vectors_length"]
+
+    def vectorize(self, texts):
+        """
+        vectorize returns the document vector of every text, as a float32 array with one row per text.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.vectors_length()), dtype=np.float32)
+        return np.stack(self.call("vectorize", texts))
+
+    def similarity(self, a: str, b: str):
+        """
+        similarity returns the spaCy similarity of a and b.
+        """
+        return self.call("similarity", [(a, b)])[0]
+
+    def score(self, guess: str, title: str):
+        """
+        score returns the GuessEntry of guess against title.
+        """
+        return self.call("score", [(guess, title)])[0]
+
+    def tokenize(self, text: str):
+        """
+        tokenize returns the TokenizedArticle of text.
+        """
+        return TokenizedArticle(*self.call("tokenize", [text])[0])
+
+
+_client = None
+_client_lock = threading.Lock()
+_scoped_client = contextvars.ContextVar("nlp_client", default=None)
+
+
+def get_client():
+    """
+    get_client returns the shared NLPClient for NLP_SERVICE_ADDRESS in settings, or None if the service is not used.
+
+    Without a service, it returns the client set by use_client in the current context, if any.
+    """
+    global _client
+    address = getattr(settings, "NLP_SERVICE_ADDRESS", None)
+    if not address:
+        return _scoped_client.get()
+
+    with _client_lock:
+        if _client is None or _client.address != address:
+            _client = NLPClient(address, getattr(settings, "NLP_SERVICE_TIMEOUT", DEFAULT_TIMEOUT))
+        return _client
+
+
+@contextmanager
+def use_client(client):
+    """
+    use_client makes get_client return client (anything with NLPClient's methods) within the block, when no
+    NLP service is configured. The client follows the context into sync_to_async threads.
+    """
+    token = _scoped_client.set(client)
+    try:
+        yield client
+    finally:
+        _scoped_client.reset(token)
@@ -0,0 +1,130 @@
+"""
+reveal_plan.py
+
+This module contains the per-article memo of reveal plans: for one guess against one title, which
+vocabulary keys get fully and partially unscrambled.
+
+The threshold pass of guess_update gives the same keys for every user making the same guess, only
+the random partial-reveal positions differ. A plan stores the result as arrays of key ids so later
+users apply it without scoring the guess against the vocabulary again.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from api.article_cache import PerArticleCache
+
+MAX_CACHED_ARTICLES = 2         # Number of article plan tables kept in memory (today's and the one being rolled over)
+MAX_PLANS_PER_ARTICLE = 20000   # Most distinct (title, guess) plans kept per article
+
+
+class RevealPlan:
+    """
+    RevealPlan is the outcome of one guess's threshold pass.
+
+    full and partial hold the key ids (into the article's ScrambleEngine) to unscramble fully and partially,
+    title_sim is the guess's similarity to the title and win whether it won the game.
+    """
+
+    __slots__ = ("full", "partial", "title_sim", "win")
+
+    def __init__(self, full, partial, title_sim: float, win: bool):
+        self.full = np.asarray(full, dtype=np.int32)
+        self.partial = np.asarray(partial, dtype=np.int32)
+        self.title_sim = title_sim
+        self.win = win
+
+    @classmethod
+    def from_masks(cls, full, partial, title_sim: float, win: bool):
+        """
+        from_masks builds a RevealPlan from the per-key full and partial masks of get_reveal_masks.
+        """
+        return cls(np.flatnonzero(full), np.flatnonzero(partial), title_sim, win)
+
+
+class RevealPlanTable:
+    """
+    RevealPlanTable is a thread-safe LRU of one article's RevealPlans by (title, normalized guess).
+
+    keys is the engine key order the plans' key ids refer to. Title blacklists are kept alongside,
+    since they only depend on the title.
+    """
+
+    def __init__(self, keys, max_plans: int = MAX_PLANS_PER_ARTICLE):
+        self.keys = keys
+        self.max_plans = max_plans
+        self._plans = OrderedDict()
+        self._blacklists = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._plans)
+
+    def matches(self, keys):
+        """
+        matches returns whether the table's key ids are valid for an engine with keys.
+        """
+        return keys is self.keys or keys == self.keys
+
+    def get(self, title: str, guess: str):
+        """
+        get returns the RevealPlan cached for guess against title, or None.
+        """
+        with self._lock:
+            plan = self._plans.get((title, guess))
+            if plan is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._plans.move_to_end((title, guess))
+            return plan
+
+    def set(self, title: str, guess: str, plan: RevealPlan):
+        """
+        set caches plan for guess against title, evicting the least recently used plans beyond max_plans.
+        """
+        with self._lock:
+            self._plans[(title, guess)] = plan
+            self._plans.move_to_end((title, guess))
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+
+    def get_blacklist(self, title: str, build):
+        """
+        get_blacklist returns the key blacklist for title, calling build(keys, title) to create it on first use.
+        """
+        blacklist = self._blacklists.get(title)
+        if blacklist is None:
+            blacklist = build(self.keys, title)
+            with self._lock:
+                self._blacklists[title] = blacklist
+        return blacklist
+
+    def stats(self):
+        """
+        stats returns the table's size and hit/miss counters.
+        """
+        with self._lock:
+            return {"plans": len(self._plans), "hits": self.hits, "misses": self.misses}
+
+
+_cache = PerArticleCache(MAX_CACHED_ARTICLES)
+
+
+def get_plan_table(article_id, keys):
+    """
+    get_plan_table returns the RevealPlanTable for article_id, or None if its key ids do not match keys.
+    """
+    table = _cache.get_or_build(article_id, lambda: RevealPlanTable(keys))
+    return table if table.matches(keys) else None
+
+
+def clear_plan_cache():
+    """
+    clear_plan_cache drops every cached reveal plan.
+    """
+    _cache.clear()
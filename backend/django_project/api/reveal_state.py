@@ -0,0 +1,90 @@
+"""
+reveal_state.py
+
+This module contains the stored format of a seeded game's progress (GameState.reveal_state) and a lazy
+word_mapping view over it.
+
+A stored reveal state is a 5 byte header followed by a payload:
+    byte 0      - format version
+    bytes 1-4   - number of vocabulary characters, unsigned little-endian
+    payload     - version 1: one bit per character, set when revealed (numpy.packbits order)
+"""
+
+import struct
+from collections.abc import MutableMapping
+
+import numpy as np
+from api.scramble import pack_revealed, unpack_revealed
+
+VERSION_BITS = 1
+REVEAL_STATE_VERSION = VERSION_BITS     # Version written by encode_reveal_state
+
+_HEADER = struct.Struct("<BI")
+
+
+def encode_reveal_state(revealed, version: int = REVEAL_STATE_VERSION):
+    """
+    encode_reveal_state encodes a per-character reveal mask into the stored format.
+    """
+    revealed = np.asarray(revealed, dtype=np.bool_)
+    if version != VERSION_BITS:
+        raise ValueError("Unknown reveal state version: " + str(version))
+
+    return _HEADER.pack(version, len(revealed)) + pack_revealed(revealed)
+
+
+def decode_reveal_state(data, count: int):
+    """
+    decode_reveal_state decodes a stored reveal state into a reveal mask of count characters.
+
+    Raises ValueError if the state does not hold exactly count characters or has an unknown version.
+    """
+    data = bytes(data)
+    if len(data) < _HEADER.size:
+        raise ValueError("Reveal state is too short")
+
+    version, stored_count = _HEADER.unpack_from(data)
+    if version != VERSION_BITS:
+        raise ValueError("Unknown reveal state version: " + str(version))
+
+    if stored_count != count:
+        raise ValueError("Reveal state holds " + str(stored_count) + " characters, expected " + str(count))
+
+    return unpack_revealed(data[_HEADER.size:], count)
+
+
+class LazyWordMapping(MutableMapping):
+    """
+    LazyWordMapping is a word_mapping dictionary that is only built when first used.
+
+    load is called at most once, on the first read or write, and must return the full mapping.
+    Code paths that never look at the mapping (e.g. a rejected guess) never pay for building it.
+    """
+
+    def __init__(self, load):
+        self._load = load
+        self._mapping = None
+
+    @property
+    def loaded(self):
+        return self._mapping is not None
+
+    def _get(self):
+        if self._mapping is None:
+            self._mapping = self._load()
+        return self._mapping
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __setitem__(self, key, value):
+        self._get()[key] = value
+
+    def __delitem__(self, key):
+        del self._get()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
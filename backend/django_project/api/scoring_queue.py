@@ -0,0 +1,131 @@
+"""
+scoring_queue.py
+
+This module contains the in-process scoring queue: guesses scored at the same moment by different request
+threads (e.g. right after the daily article rolls over) are coalesced into one nlp.pipe call, and their
+similarities against the article vocabulary into one matrix multiplication.
+
+The queue is a MicroBatcher (see micro_batch.py) with two kinds of batches:
+    "score"                 - (guess, title) pairs -> GuessEntry per pair
+    ("similarities", vocab) - (vector, norm) pairs -> similarities against every row of vocab
+
+It is used by utils.score_guess and utils.make_reveal_plan when SCORING_BATCH_WAIT in settings is above 0.
+A request waits at most SCORING_BATCH_WAIT seconds for others to join its batch, and a batch holds at most
+SCORING_BATCH_SIZE requests. A request whose batch is not answered within RESULT_TIMEOUT seconds, or that
+reaches a queue closed by a settings change, is scored inline instead.
+"""
+
+import concurrent.futures
+import threading
+
+import numpy as np
+from django.conf import settings
+from api import nlp_models
+from api.guess_cache import GuessEntry
+from api.micro_batch import BatcherClosed, MicroBatcher
+
+DEFAULT_BATCH_SIZE = 64         # Most requests coalesced into one batch
+DEFAULT_BATCH_WAIT = 0.002      # Seconds a batch waits for more requests after the first one
+RESULT_TIMEOUT = 5.0            # Seconds a request waits for its batch before scoring inline
+
+SCORE = "score"
+SIMILARITIES = "similarities"
+
+
+def score_pairs(pairs):
+    """
+    score_pairs scores every (guess, title) pair with a single nlp.pipe call over the distinct texts.
+
+    Returns one GuessEntry per pair, the same as utils.score_guess would.
+    """
+    texts = list(dict.fromkeys(text for pair in pairs for text in pair))
+    docs = dict(zip(texts, nlp_models.pipe_docs(texts, nlp_models.PROFILE_VECTORS)))
+
+    entries = []
+    for guess, title in pairs:
+        vector = np.array(docs[guess].vector, dtype=np.float32)
+        entries.append(GuessEntry(vector, float(np.linalg.norm(vector)), docs[guess].similarity(docs[title])))
+    return entries
+
+
+def vocab_similarities(vocab, vectors):
+    """
+    vocab_similarities returns the similarities of every (vector, norm) pair against vocab (see
+    VocabMatrix.similarities), computed as one matrix multiplication.
+    """
+    width = vocab.vectors.shape[1]
+    unit = np.zeros((len(vectors), width), dtype=np.float32)
+    for i, (vector, norm) in enumerate(vectors):
+        if norm:
+            unit[i] = np.asarray(vector, dtype=np.float32) / norm
+
+    sims = vocab.vectors @ unit.T
+    return [np.ascontiguousarray(sims[:, i]) for i in range(len(vectors))]
+
+
+def _run_batch(key, items):
+    if key == SCORE:
+        return score_pairs(items)
+    return vocab_similarities(key[1], items)
+
+
+class ScoringQueue:
+    """
+    ScoringQueue coalesces guess scoring from concurrent threads into batches.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, batch_wait: float = DEFAULT_BATCH_WAIT,
+                 result_timeout: float = RESULT_TIMEOUT):
+        self.batcher = MicroBatcher(_run_batch, batch_size, batch_wait, name="scoring-queue")
+        self.result_timeout = result_timeout
+
+    def score(self, guess: str, title: str):
+        """
+        score returns the GuessEntry of guess against title, scored in a batch with concurrent guesses.
+        """
+        return self._submit(SCORE, [(guess, title)])[0]
+
+    def similarities(self, vocab, vector, norm=None):
+        """
+        similarities returns vocab.similarities(vector, norm), computed in a batch with concurrent guesses on vocab.
+        """
+        if norm is None:
+            norm = float(np.linalg.norm(vector))
+        return self._submit((SIMILARITIES, vocab), [(vector, norm)])[0]
+
+    def _submit(self, key, items):
+        """
+        _submit returns the results of items batched under key, or computed inline if the batch is not answered in time.
+        """
+        try:
+            return self.batcher.submit(key, items).result(timeout=self.result_timeout)
+        except (BatcherClosed, concurrent.futures.TimeoutError):
+            return _run_batch(key, items)
+
+    def close(self):
+        self.batcher.close()
+
+    def stats(self):
+        return self.batcher.stats()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_scoring_queue():
+    """
+    get_scoring_queue returns the shared ScoringQueue, or None if batching is turned off (SCORING_BATCH_WAIT of 0).
+    """
+    global _queue
+    batch_wait = getattr(settings, "SCORING_BATCH_WAIT", 0)
+    if not batch_wait:
+        return None
+
+    batch_size = getattr(settings, "SCORING_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+    with _queue_lock:
+        if _queue is None or (_queue.batcher.batch_size, _queue.batcher.batch_wait) != (batch_size, batch_wait):
+            if _queue is not None:
+                _queue.close()
+            _queue = ScoringQueue(batch_size, batch_wait)
+        return _queue
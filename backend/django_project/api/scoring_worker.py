@@ -0,0 +1,61 @@
+"""
+scoring_worker.py
+
+This module contains the functions run in the NLP scoring processes of async_game.py, and by the NLP
+worker of nlp_service.py. They are the only code of the async web process's requests that needs the model.
+
+Worker processes are spawned, so they import this module before Django is set up; it must not import
+models (or modules that do, like utils.py) at module level.
+"""
+
+
+def init_worker():
+    """
+    init_worker sets up Django and loads the spaCy model when a worker process starts, not on its first guess.
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    from api import nlp_models
+    nlp_models.get_nlp()
+
+
+def score_guess(guess: str, title: str):
+    """
+    score_guess scores guess against title in a worker process, see utils.score_guess.
+    """
+    from api import utils
+    return utils.score_guess(guess, title)
+
+
+def vectors_length():
+    """
+    vectors_length returns the width of the model's word vectors.
+    """
+    from api import nlp_models
+    return nlp_models.get_nlp().vocab.vectors_length
+
+
+def vectorize(texts):
+    """
+    vectorize returns the document vector of every text, as float32 arrays, from one nlp.pipe call.
+    """
+    import numpy as np
+    from api import nlp_models
+
+    docs = nlp_models.pipe_docs(texts, nlp_models.PROFILE_VECTORS)
+    return [np.array(doc.vector, dtype=np.float32) for doc in docs]
+
+
+def tokenize(texts):
+    """
+    tokenize returns the TokenizedArticle parts (texts, token_ids, kinds, whitespace) of every text, from one nlp.pipe call.
+    """
+    from api import nlp_models
+    from api.article_tokens import TokenizedArticle
+
+    tokens = [TokenizedArticle.from_doc(doc) for doc in nlp_models.pipe_docs(texts, nlp_models.PROFILE_TAGGER)]
+    return [(t.texts, t.token_ids, t.kinds, t.whitespace) for t in tokens]
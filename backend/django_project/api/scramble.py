@@ -0,0 +1,183 @@
+"""
+scramble.py
+
+This module contains the scramble engine: an article's vocabulary as integer key ids, and a user's
+scrambled/revealed progress as NumPy arrays over the vocabulary's characters.
+
+Scrambling a new game and unscrambling words after a guess are batched array operations, so their cost
+no longer grows with the article's character count in pure Python.
+"""
+
+import numpy as np
+from api.article_cache import PerArticleCache
+
+MAX_CACHED_ARTICLES = 2     # Number of article engines kept in memory (today's and the one being rolled over)
+
+
+def make_rng(seed=None):
+    """
+    make_rng returns a NumPy random generator; the same seed always gives the same scramble and reveals.
+    """
+    return np.random.default_rng(seed)
+
+
+def to_codes(text: str):
+    """
+    to_codes converts a string into an array of unicode code points.
+    """
+    return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+
+
+def from_codes(codes):
+    """
+    from_codes converts an array of unicode code points back into a string.
+    """
+    return np.asarray(codes, dtype="<u4").tobytes().decode("utf-32-le", "surrogatepass")
+
+
+def pack_revealed(revealed):
+    """
+    pack_revealed packs a reveal bitmask into bytes, eight characters per byte.
+    """
+    return np.packbits(np.asarray(revealed, dtype=np.bool_)).tobytes()
+
+
+def unpack_revealed(data, count: int):
+    """
+    unpack_revealed unpacks the first count characters of a reveal bitmask packed by pack_revealed.
+    """
+    bits = np.unpackbits(np.frombuffer(bytes(data), dtype=np.uint8), count=count)
+    if len(bits) != count:
+        raise ValueError("Reveal bitmask holds fewer than " + str(count) + " characters")
+    return bits.astype(np.bool_)
+
+
+class ScrambleEngine:
+    """
+    ScrambleEngine holds an article's vocabulary as flat arrays.
+
+    Key id i is keys[i]. Its characters are chars[offsets[i]:offsets[i + 1]], and owner maps every
+    character back to its key id.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.index = {key: key_id for key_id, key in enumerate(self.keys)}
+
+        self.chars = to_codes("".join(self.keys))
+        self.lengths = np.fromiter((len(key) for key in self.keys), dtype=np.int64, count=len(self.keys))
+        self.offsets = np.zeros(len(self.keys) + 1, dtype=np.int64)
+        np.cumsum(self.lengths, out=self.offsets[1:])
+        self.owner = np.repeat(np.arange(len(self.keys), dtype=np.int64), self.lengths)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def scramble(self, letter_bag, rng=None):
+        """
+        scramble returns a fully scrambled ScrambleState, drawing every character from letter_bag.
+        """
+        if rng is None:
+            rng = make_rng()
+
+        letters = to_codes("".join(letter_bag))
+        if len(letters) == 0 and len(self.chars) > 0:
+            raise IndexError("Cannot scramble with an empty letter bag")
+
+        scrambled = rng.choice(letters, size=len(self.chars)) if len(self.chars) else self.chars.copy()
+        revealed = np.zeros(len(self.chars), dtype=np.bool_)
+        return ScrambleState(self, scrambled, revealed)
+
+    def from_mapping(self, game_state: dict):
+        """
+        from_mapping returns the ScrambleState stored in a word_mapping dictionary.
+
+        A character counts as revealed when it matches the original, whether it was revealed or
+        scrambled to the right letter by chance; either way it renders the same.
+        """
+        scrambled = to_codes("".join([game_state[key] for key in self.keys]))
+        if len(scrambled) != len(self.chars):
+            raise ValueError("Game state does not match the vocabulary's key lengths")
+
+        return ScrambleState(self, scrambled.copy(), scrambled == self.chars)
+
+    def select(self, key_ids):
+        """
+        select returns a per-character mask of the characters belonging to key_ids.
+        """
+        selected = np.zeros(len(self.keys), dtype=np.bool_)
+        selected[key_ids] = True
+        return selected[self.owner]
+
+
+class ScrambleState:
+    """
+    ScrambleState is one user's progress over a ScrambleEngine's characters.
+
+    scrambled holds the scrambled code point of every character and revealed is the reveal bitmask;
+    a character shows as the original where revealed is set and as scrambled otherwise.
+    """
+
+    def __init__(self, engine: ScrambleEngine, scrambled, revealed):
+        self.engine = engine
+        self.scrambled = scrambled
+        self.revealed = revealed
+
+    def reveal_full(self, key_ids):
+        """
+        reveal_full fully unscrambles the keys in key_ids.
+        """
+        self.revealed |= self.engine.select(key_ids)
+
+    def reveal_partial(self, key_ids, rng=None):
+        """
+        reveal_partial unscrambles half (rounded down) of the character positions of each key in key_ids,
+        picked at random per key. Positions that were already revealed may be picked again.
+        """
+        if rng is None:
+            rng = make_rng()
+
+        engine = self.engine
+        positions = np.flatnonzero(engine.select(key_ids))
+        if len(positions) == 0:
+            return
+
+        # Shuffle each key's positions by sorting on (key, random priority), then take the first half of every key
+        owners = engine.owner[positions]
+        order = np.lexsort((rng.random(len(positions)), owners))
+        positions = positions[order]
+        owners = owners[order]
+
+        rank = np.arange(len(positions)) - np.searchsorted(owners, owners, side="left")
+        self.revealed[positions[rank < engine.lengths[owners] // 2]] = True
+
+    def view(self):
+        """
+        view returns the code points the user currently sees.
+        """
+        return np.where(self.revealed, self.engine.chars, self.scrambled)
+
+    def to_mapping(self):
+        """
+        to_mapping returns the state as a word_mapping dictionary from each key to what the user sees.
+        """
+        text = from_codes(self.view())
+        offsets = self.engine.offsets.tolist()
+        return {key: text[offsets[i]:offsets[i + 1]] for i, key in enumerate(self.engine.keys)}
+
+
+_cache = PerArticleCache(MAX_CACHED_ARTICLES)
+
+
+def get_article_engine(article_id, keys):
+    """
+    get_article_engine returns the ScrambleEngine for article_id, building it from keys on first use.
+    """
+    return _cache.get_or_build(article_id, lambda: ScrambleEngine(keys))
+
+
+def clear_engine_cache():
+    """
+    clear_engine_cache drops every cached article engine.
+    """
+    _cache.clear()
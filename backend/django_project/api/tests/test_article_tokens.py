@@ -0,0 +1,100 @@
+from unittest import TestCase
+
+import spacy
+from spacy.tokens import Doc
+
+from api.article_tokens import (
+    KIND_WORD, KIND_SPACE, KIND_PUNCT, TokenizedArticle, get_article_tokens, clear_token_cache
+)
+from api.scramble import get_article_engine, clear_engine_cache
+
+
+def make_doc():
+    """Build a POS-tagged doc by hand so no trained model is needed."""
+    vocab = spacy.blank("en").vocab
+    words = ["Cats", "chase", "mice", ".", "\n", "Cats", "sleep", "...."]
+    spaces = [True, True, False, False, False, True, False, False]
+    pos = ["NOUN", "VERB", "NOUN", "PUNCT", "SPACE", "NOUN", "VERB", "PUNCT"]
+    return Doc(vocab, words=words, spaces=spaces, pos=pos)
+
+
+class TokenizedArticleTest(TestCase):
+    """Test suite for the cached token stream of an article."""
+
+    def setUp(self):
+        clear_token_cache()
+        clear_engine_cache()
+
+    def test_from_doc(self):
+        """Tokens are stored as ids into the distinct texts, with their kind and whitespace."""
+        tokens = TokenizedArticle.from_doc(make_doc())
+        self.assertEqual(len(tokens), 8)
+        self.assertEqual(tokens.texts, ["Cats", "chase", "mice", ".", "\n", "sleep", "...."])
+        self.assertEqual(tokens.token_ids.tolist(), [0, 1, 2, 3, 4, 0, 5, 6])
+        self.assertEqual(tokens.kinds.tolist()[3:5], [KIND_PUNCT, KIND_SPACE])
+        self.assertEqual(tokens.kinds[0], KIND_WORD)
+        self.assertEqual(tokens.whitespace.tolist()[:3], [True, True, False])
+
+    def test_keys(self):
+        """Keys are the words in order of first appearance, plus long punctuation."""
+        tokens = TokenizedArticle.from_doc(make_doc())
+        self.assertEqual(tokens.keys(punct_thresh=2), ["Cats", "chase", "mice", "sleep", "...."])
+        self.assertEqual(tokens.keys(punct_thresh=4), ["Cats", "chase", "mice", "sleep"])
+
+    def test_render_unscrambled(self):
+        """Rendering without scrambling prefixes every non-punctuation token with a space."""
+        tokens = TokenizedArticle.from_doc(make_doc())
+        self.assertEqual(tokens.render({}), " Cats chase mice. \n Cats sleep....")
+
+    def test_render_scrambled(self):
+        """Words are replaced by their game state entry, punctuation is passed through."""
+        tokens = TokenizedArticle.from_doc(make_doc())
+        game_state = {"Cats": "Xqzt", "mice": "ecim", "....": "abcd"}
+        self.assertEqual(tokens.render(game_state), " Xqzt chase ecim. \n Xqzt sleep....")
+
+    def test_key_ids(self):
+        """Every key's vocabulary index is its position in keys."""
+        tokens = TokenizedArticle.from_doc(make_doc())
+        self.assertEqual(tokens.key_ids(punct_thresh=2), {"Cats": 0, "chase": 1, "mice": 2, "sleep": 3, "....": 4})
+
+    def test_template(self):
+        """The template renders to the same text as render, with words as vocabulary indices."""
+        tokens = TokenizedArticle.from_doc(make_doc())
+        template = tokens.template(punct_thresh=2)
+        self.assertEqual(template, [0, 1, 2, ". \n", 0, 3, "...."])
+
+        keys = tokens.keys(punct_thresh=2)
+        game_state = {"Cats": "Xqzt", "mice": "ecim", "....": "abcd"}
+        rendered = "".join(
+            piece if isinstance(piece, str) else " " + game_state.get(keys[piece], keys[piece])
+            for piece in template
+        )
+        self.assertEqual(rendered, tokens.render(game_state))
+
+    def test_article_tokens_are_parsed_once(self):
+        """The article is tokenized on first use and reused afterwards."""
+        calls = []
+
+        def tokenize(text):
+            calls.append(text)
+            return make_doc()
+
+        first = get_article_tokens(1, "text", tokenize)
+        second = get_article_tokens(1, "text", tokenize)
+        self.assertIs(first, second)
+        self.assertEqual(calls, ["text"])
+
+    def test_changed_text_is_parsed_again(self):
+        """An article whose text changed is parsed again, and everything cached for it is dropped."""
+        calls = []
+
+        def tokenize(text):
+            calls.append(text)
+            return make_doc()
+
+        first = get_article_tokens(1, "text", tokenize)
+        engine = get_article_engine(1, first.keys(2))
+        second = get_article_tokens(1, "new text", tokenize)
+        self.assertIsNot(first, second)
+        self.assertEqual(calls, ["text", "new text"])
+        self.assertIsNot(get_article_engine(1, second.keys(2)), engine)
@@ -0,0 +1,124 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import path
+from django.utils import timezone
+
+from unittest.mock import patch
+
+import numpy as np
+from asgiref.sync import async_to_sync
+from api import async_views, nlp_service
+from api.article_tokens import clear_token_cache
+from api.async_game import ascore_guess, shutdown_scoring_pool
+from api.guess_cache import clear_guess_cache, get_guess_cache
+from api.scramble import clear_engine_cache
+from api.vocab import clear_vocab_cache
+from api.utils import score_guess
+from game.daily_article_cache import invalidate_daily_article
+from game.models import ArticleCache, DailyArticle, GameState, UserGuess
+
+# Serve the async views for these tests, whatever ASYNC_GAME_VIEWS says
+urlpatterns = [
+    path('scrambled_article/', async_views.get_scrambled_article),
+    path('article_delta/', async_views.get_article_delta),
+    path('guess_scoreboard/', async_views.get_guess_scoreboard),
+    path('process_guess/', async_views.process_guess),
+    path('game_over/', async_views.get_game_over),
+    path('game_snapshot/', async_views.get_game_snapshot),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__, NLP_POOL_WORKERS=0, GAME_STATE_STORAGE="seeded")
+class AsyncViewsTestCase(TestCase):
+    """Test suite for the async game views."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="async", password="password")
+        self.article = ArticleCache.objects.create(article_id="1", title="Cat", content="This is a test. The cat is a pet.")
+        DailyArticle.objects.create(date=timezone.now().date(), article=self.article)
+        invalidate_daily_article()
+        clear_guess_cache()
+
+    async def test_unauthorized(self):
+        """Anonymous users get a 401."""
+        response = await self.async_client.get("/scrambled_article/")
+        self.assertEqual(response.status_code, 401)
+
+    async def test_process_guess(self):
+        """A guess is scored, saved, and answered with its delta and the new snapshot."""
+        await self.async_client.aforce_login(self.user)
+        article = (await self.async_client.get("/scrambled_article/")).json()
+
+        response = await self.async_client.post(
+            "/process_guess/", {"guess": "test", "snapshot": True}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertFalse(data["delta"]["full"])
+        self.assertTrue(data["delta"]["revealed"])
+        self.assertEqual(list(data["snapshot"]["scores"]), ["test"])
+        self.assertNotEqual(data["snapshot"]["article"]["main-text"], article["article"]["main-text"])
+
+        self.assertEqual(await UserGuess.objects.filter(game_state__user=self.user).acount(), 1)
+        self.assertEqual(get_guess_cache().stats()["entries"], 1)  # Scored once, then found in the cache
+
+        # The scoreboard and the game over status see the guess
+        scores = (await self.async_client.get("/guess_scoreboard/")).json()
+        self.assertEqual(list(scores["scores"]), ["test"])
+        self.assertFalse((await self.async_client.get("/game_over/")).json()["game_over"])
+
+        # A repeated guess is not played again
+        await self.async_client.post("/process_guess/", {"guess": "test"}, content_type="application/json")
+        self.assertEqual(await UserGuess.objects.filter(game_state__user=self.user).acount(), 1)
+
+    async def test_not_modified(self):
+        """A request with the current ETag gets a 304."""
+        await self.async_client.aforce_login(self.user)
+        await self.async_client.get("/game_snapshot/")  # Creates the game
+
+        response = await self.async_client.get("/guess_scoreboard/")
+        etag = response["ETag"]
+        response = await self.async_client.get("/guess_scoreboard/", headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        game_state = await GameState.objects.aget(user=self.user)
+        await UserGuess.objects.acreate(game_state=game_state, guess_text="dog", score=300)
+        response = await self.async_client.get("/guess_scoreboard/", headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_score_in_pool(self):
+        """Guesses scored in the process pool match scoring them in this process."""
+        with self.settings(NLP_POOL_WORKERS=1):
+            try:
+                entry = async_to_sync(ascore_guess)("a cat", "Cat")
+            finally:
+                shutdown_scoring_pool()
+
+        expected = score_guess("a cat", "Cat")
+        np.testing.assert_allclose(entry.vector, expected.vector)
+        self.assertAlmostEqual(entry.title_sim, expected.title_sim, places=5)
+        self.assertIs(get_guess_cache().get("Cat", "a cat"), entry)
+
+    def test_model_stays_in_pool(self):
+        """With pool workers, creating a game and playing a guess never loads the model in this process."""
+        for clear in (clear_token_cache, clear_vocab_cache, clear_engine_cache):
+            clear()
+            self.addCleanup(clear)
+        self.assertIsNone(nlp_service.get_client())
+
+        async def play():
+            await self.async_client.aforce_login(self.user)
+            article = await self.async_client.get("/scrambled_article/")
+            guess = await self.async_client.post("/process_guess/", {"guess": "test"}, content_type="application/json")
+            return article, guess
+
+        with self.settings(NLP_POOL_WORKERS=1), patch("api.nlp_models.get_nlp", side_effect=AssertionError("model loaded")):
+            try:
+                article, guess = async_to_sync(play)()
+            finally:
+                shutdown_scoring_pool()
+
+        self.assertEqual(article.status_code, 200)
+        self.assertEqual(guess.status_code, 200)
+        self.assertTrue(guess.json()["delta"]["revealed"])
+        self.assertIsNone(nlp_service.get_client())
@@ -0,0 +1,61 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from api.game_context import GameContext, load_game_context
+from game.daily_article_cache import get_cached_daily_article, invalidate_daily_article
+from game.models import ArticleCache, DailyArticle, GameState, UserGuess
+
+
+class GameContextTest(TestCase):
+    """Test suite for the per-request game context loader."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="context", password="password")
+        self.article = ArticleCache.objects.create(article_id="1", title="Cat", content="The cat is a pet.")
+        DailyArticle.objects.create(date=timezone.now().date(), article=self.article)
+        invalidate_daily_article()
+        get_cached_daily_article()  # Today's article is read once per day, not per request
+
+    def test_load_game_in_two_queries(self):
+        """A game in progress loads with its user, profile, article, guesses and today's article in two queries."""
+        game_state = GameState.objects.create(user=self.user, article=self.article)
+        UserGuess.objects.create(game_state=game_state, guess_text="dog", score=300)
+        UserGuess.objects.create(game_state=game_state, guess_text="pet", score=600)
+
+        with self.assertNumQueries(2):
+            context = load_game_context(self.user.id)
+            self.assertEqual(context.game_state, game_state)
+            self.assertEqual(context.article.title, "Cat")
+            self.assertEqual(context.profile.user_id, self.user.id)
+            self.assertEqual(context.title, "Cat")
+            self.assertEqual(context.daily_article.article, self.article)
+            self.assertEqual(context.scores, {"dog": 300, "pet": 600})
+
+    def test_load_without_game(self):
+        """A user without a game still gets their profile and today's article, in two queries."""
+        with self.assertNumQueries(2):
+            context = load_game_context(self.user.id)
+            self.assertIsNone(context.game_state)
+            self.assertIsNone(context.article)
+            self.assertEqual(context.profile.user_id, self.user.id)
+            self.assertEqual(context.title, "Cat")
+            self.assertEqual(context.scores, {})
+
+    def test_no_daily_article(self):
+        """Asking for the title without a daily article raises DailyArticle.DoesNotExist."""
+        DailyArticle.objects.all().delete()
+        context = load_game_context(self.user.id)
+        with self.assertRaises(DailyArticle.DoesNotExist):
+            context.title
+
+    def test_unknown_user(self):
+        """Loading an unknown user raises User.DoesNotExist."""
+        with self.assertRaises(User.DoesNotExist):
+            load_game_context(-1)
+
+    def test_add_guess(self):
+        """Recorded guesses show up in the scores without another query."""
+        context = GameContext(self.user, GameState(user=self.user, article=self.article), [], "Cat")
+        context.add_guess(UserGuess(guess_text="dog", score=300))
+        self.assertEqual(context.scores, {"dog": 300})
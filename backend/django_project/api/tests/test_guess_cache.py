@@ -0,0 +1,77 @@
+from unittest import TestCase
+
+import numpy as np
+
+from api.guess_cache import GuessCache, GuessEntry, normalize_guess
+
+
+def make_entry(width=4, title_sim=0.5):
+    return GuessEntry(np.ones(width, dtype=np.float32), 2.0, title_sim)
+
+
+class GuessCacheTest(TestCase):
+    """Test suite for the shared cache of scored guesses."""
+
+    def test_normalize_guess(self):
+        """Whitespace runs collapse to one space and the ends are trimmed."""
+        self.assertEqual(normalize_guess("  ancient \t Rome\n"), "ancient Rome")
+        self.assertEqual(normalize_guess("Rome"), "Rome")
+
+    def test_scores_each_guess_once(self):
+        """A guess is scored on its first lookup and answered from the cache afterwards."""
+        cache = GuessCache()
+        calls = []
+
+        def score(guess, title):
+            calls.append((guess, title))
+            return make_entry()
+
+        first = cache.get_or_score("Cat", "pet", score)
+        second = cache.get_or_score("Cat", "pet", score)
+        self.assertIs(first, second)
+        self.assertEqual(calls, [("pet", "Cat")])
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_titles_share_the_cache(self):
+        """Around the daily rollover, guesses against both titles are kept side by side."""
+        cache = GuessCache()
+        yesterday, today = make_entry(title_sim=0.1), make_entry(title_sim=0.9)
+        cache.set("Cat", "pet", yesterday)
+        self.assertIsNone(cache.get("Dog", "pet"))
+        cache.set("Dog", "pet", today)
+        self.assertIs(cache.get("Cat", "pet"), yesterday)
+        self.assertIs(cache.get("Dog", "pet"), today)
+        self.assertEqual(len(cache), 2)
+
+    def test_entry_bound(self):
+        """The least recently used guess is evicted beyond max_entries."""
+        cache = GuessCache(max_entries=2)
+        cache.set("Cat", "a", make_entry())
+        cache.set("Cat", "b", make_entry())
+        cache.get("Cat", "a")
+        cache.set("Cat", "c", make_entry())
+        self.assertIsNotNone(cache.get("Cat", "a"))
+        self.assertIsNone(cache.get("Cat", "b"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_bound(self):
+        """Entries are evicted to keep the estimated size within max_bytes."""
+        cache = GuessCache(max_bytes=3000)
+        for guess in ["a", "b", "c"]:
+            cache.set("Cat", guess, make_entry(width=256))   # About 1.3KB each
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.stats()["bytes"], 3000)
+
+        cache.set("Cat", "huge", make_entry(width=10000))     # Larger than the whole cache, never stored
+        self.assertIsNone(cache.get("Cat", "huge"))
+
+    def test_clear(self):
+        """clear drops the entries and resets the counters."""
+        cache = GuessCache()
+        cache.get_or_score("Cat", "pet", lambda guess, title: make_entry())
+        cache.clear()
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["hits"], stats["misses"], stats["bytes"]), (0, 0, 0, 0))
@@ -0,0 +1,75 @@
+import datetime
+import json
+from unittest import TestCase
+from unittest.mock import patch
+
+from api import json_render
+from api.article_tokens import TokenizedArticle
+from api.json_render import EncodedFields, EncodedList, JSONResponse, dumps, render
+
+
+class JSONRenderTest(TestCase):
+    """Test suite for rendering responses with pre-encoded parts."""
+
+    def assertRendersLike(self, value):
+        self.assertEqual(json.loads(render(value)), json.loads(json.dumps(value)))
+
+    def test_dumps(self):
+        """Both encoders give the same JSON, including for values only Django's encoder knows."""
+        value = {"text": "naïve \"quoted\"\n", "score": 0.25, "list": [1, None, True], "date": datetime.date(2025, 1, 2)}
+        fast = json.loads(dumps(value))
+        with patch.object(json_render, "orjson", None):
+            slow = json.loads(dumps(value))
+        self.assertEqual(fast, slow)
+        self.assertEqual(slow["date"], "2025-01-02")
+
+    def test_encoded_list(self):
+        """An EncodedList is encoded once and spliced as-is."""
+        template = EncodedList([" The", 0, "."])
+        with patch.object(json_render, "dumps", wraps=json_render.dumps) as counted:
+            first = render({"template": template, "state": "1.0"})
+            second = render({"template": template, "state": "1.1"})
+        self.assertEqual(json.loads(first), {"template": [" The", 0, "."], "state": "1.0"})
+        self.assertEqual(json.loads(second)["state"], "1.1")
+        self.assertEqual(sum(1 for call in counted.call_args_list if call.args[0] == list(template)), 1)
+
+    def test_encoded_fields(self):
+        """Fixed keys are encoded once; other keys are filled in per copy."""
+        article = EncodedFields({"main-text": "", "image-url": "http://example.com/a.jpg"}, ["image-url"])
+        first = article.copy()
+        first["main-text"] = "xyz abc"
+        second = article.copy()
+        second["main-text"] = "cat abc"
+
+        self.assertIsInstance(first, EncodedFields)
+        self.assertEqual(json.loads(render({"article": first})), {"article": {"main-text": "xyz abc", "image-url": "http://example.com/a.jpg"}})
+        self.assertEqual(json.loads(render(second))["main-text"], "cat abc")
+        self.assertEqual(article["main-text"], "")
+
+    def test_encoded_fields_replaced(self):
+        """Replacing or removing a fixed key renders the current value."""
+        article = EncodedFields({"main-text": "a", "image-url": "old"}, ["image-url"]).copy()
+        article["image-url"] = "new"
+        self.assertEqual(json.loads(render(article))["image-url"], "new")
+        del article["image-url"]
+        self.assertRendersLike(article)
+
+    def test_plain_values(self):
+        """Values without pre-encoded parts render like json.dumps."""
+        self.assertRendersLike({"scores": {"cat": 0.5, "dog": 0.25}, "game_over": False})
+        self.assertRendersLike([1, "two", {"three": 3}])
+        self.assertRendersLike(EncodedFields({}, ["missing"]))
+
+    def test_template_is_encoded(self):
+        """Article templates are shared EncodedLists."""
+        tokens = TokenizedArticle(["The", "cat", "."], [0, 1, 2], [0, 0, 1], [True, False, False])
+        template = tokens.template(2)
+        self.assertIsInstance(template, EncodedList)
+        self.assertIs(tokens.template(2), template)
+
+    def test_response(self):
+        """JSONResponse renders JSON with the right content type."""
+        response = JSONResponse({"template": EncodedList([1, 2])}, status=201)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(json.loads(response.content), {"template": [1, 2]})
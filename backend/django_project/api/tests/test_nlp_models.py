@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+from unittest.mock import patch, MagicMock
+
+from api import nlp_models
+
+
+class NlpModelsTest(SimpleTestCase):
+    """Test suite for the lazy spaCy model registry."""
+
+    def setUp(self):
+        nlp_models.unload()
+
+    def tearDown(self):
+        nlp_models.unload()
+
+    @patch("api.nlp_models._load")
+    def test_model_is_loaded_once_on_first_use(self, mock_load):
+        """The model is not loaded until get_nlp() is called, and only once."""
+        self.assertFalse(nlp_models.is_loaded())
+        first = nlp_models.get_nlp()
+        second = nlp_models.get_nlp()
+        self.assertIs(first, second)
+        self.assertTrue(nlp_models.is_loaded())
+        mock_load.assert_called_once_with(settings.NLP_MODEL)
+
+    @patch("api.nlp_models._load")
+    def test_unload_forces_reload(self, mock_load):
+        """After unload() the next get_nlp() loads the model again."""
+        nlp_models.get_nlp()
+        nlp_models.unload()
+        self.assertFalse(nlp_models.is_loaded())
+        nlp_models.get_nlp()
+        self.assertEqual(mock_load.call_count, 2)
+
+    @patch("api.nlp_models.gc")
+    @patch("api.nlp_models._load")
+    def test_preload_freezes_gc(self, mock_load, mock_gc):
+        """preload() loads the model and freezes the garbage collector for copy-on-write sharing."""
+        model = nlp_models.preload()
+        self.assertIs(model, mock_load.return_value)
+        mock_gc.freeze.assert_called_once()
+
+        mock_gc.reset_mock()
+        nlp_models.preload(freeze=False)
+        mock_gc.freeze.assert_not_called()
+
+    def test_model_stats_before_load(self):
+        """model_stats() reports the current process memory even before the model is loaded."""
+        stats = nlp_models.model_stats()
+        self.assertFalse(stats["loaded"])
+        self.assertNotIn("load_seconds", stats)
+        self.assertIn("current_rss_bytes", stats)
+
+    @patch("spacy.load")
+    def test_load_records_stats(self, mock_spacy_load):
+        """Loading the model records its name, load time and memory growth."""
+        nlp_models.get_nlp()
+        stats = nlp_models.model_stats()
+        self.assertTrue(stats["loaded"])
+        self.assertEqual(stats["model"], settings.NLP_MODEL)
+        self.assertGreaterEqual(stats["load_seconds"], 0)
+        self.assertIn("rss_delta_bytes", stats)
+
+    def test_disabled_components_per_profile(self):
+        """Each profile disables the components it does not list."""
+        mock_nlp = MagicMock()
+        mock_nlp.pipe_names = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+        with patch("api.nlp_models._load", return_value=mock_nlp):
+            self.assertIsNone(nlp_models.get_disabled("vectors"))
+            self.assertEqual(nlp_models.get_disabled("tagger"), ["parser", "lemmatizer", "ner"])
+            self.assertEqual(nlp_models.get_disabled("full"), [])
+            with self.assertRaises(ValueError):
+                nlp_models.get_disabled("unknown")
+
+    def test_pipe_docs_runs_profile(self):
+        """pipe_docs batches texts through nlp.pipe with only the profile's components."""
+        mock_nlp = MagicMock()
+        mock_nlp.pipe_names = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+        with patch("api.nlp_models._load", return_value=mock_nlp):
+            nlp_models.pipe_docs(["a", "b"], "vectors", batch_size=8, n_process=2)
+            mock_nlp.pipe.assert_called_with(["a", "b"], batch_size=8, n_process=2, disable=mock_nlp.pipe_names)
+
+            nlp_models.pipe_docs(["a"], "tagger")
+            mock_nlp.pipe.assert_called_with(
+                ["a"], batch_size=nlp_models.DEFAULT_BATCH_SIZE, n_process=1, disable=["parser", "lemmatizer", "ner"]
+            )
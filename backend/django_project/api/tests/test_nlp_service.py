@@ -0,0 +1,112 @@
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+import numpy as np
+from django.test import override_settings
+
+from api import utils
+from api.article_tokens import clear_token_cache
+from api.nlp_service import NLPClient, NLPServer, NLPServiceError
+from api.vocab import clear_vocab_cache
+
+
+class NLPServiceTest(TestCase):
+    """Test suite for the out-of-process NLP worker and its client."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.directory.name, "nlp.sock")
+        self.server = NLPServer(self.address, batch_wait=0.05)
+        self.server.start()
+        self.client = NLPClient(self.address, timeout=10)
+
+    def tearDown(self):
+        self.server.close()
+        self.directory.cleanup()
+
+    def test_vectorize(self):
+        """Vectors match the ones computed in this process."""
+        vectors = self.client.vectorize(["cat", "a dog"])
+        self.assertEqual(vectors.shape, (2, self.client.vectors_length()))
+        np.testing.assert_allclose(vectors[0], utils.get_key_vector("cat"))
+        np.testing.assert_allclose(vectors[1], utils.get_key_vector("a dog"))
+        self.assertEqual(self.client.vectorize([]).shape, (0, self.client.vectors_length()))
+
+    def test_score(self):
+        """Scored guesses match utils.score_guess."""
+        entry = self.client.score("a cat", "Cat")
+        expected = utils.score_guess("a cat", "Cat")
+        np.testing.assert_allclose(entry.vector, expected.vector)
+        self.assertAlmostEqual(entry.norm, expected.norm, places=5)
+        self.assertAlmostEqual(entry.title_sim, expected.title_sim, places=5)
+        self.assertAlmostEqual(self.client.similarity("a cat", "Cat"), expected.title_sim, places=5)
+
+    def test_tokenize(self):
+        """Tokenized articles render like ones parsed in this process."""
+        text = "The cat is a pet. Cats sleep."
+        tokens = self.client.tokenize(text)
+        expected = utils.get_tokens(-1, text)
+        self.assertEqual(tokens.texts, expected.texts)
+        self.assertEqual(tokens.render({"cat": "xyz"}), expected.render({"cat": "xyz"}))
+        clear_token_cache()
+
+    def test_batching(self):
+        """Requests from concurrent clients are answered in fewer batches."""
+        results = {}
+
+        def vectorize(i):
+            results[i] = NLPClient(self.address, timeout=10).vectorize(["word" + str(i)])
+
+        threads = [threading.Thread(target=vectorize, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 8)
+        self.assertEqual(self.server.stats()["requests"], 8)
+        self.assertLess(self.server.stats()["batches"], 8)
+
+    def test_bad_request_fails_alone(self):
+        """A bad payload batched with other clients' requests only fails its own request."""
+        results = {}
+
+        def vectorize(i):
+            try:
+                results[i] = NLPClient(self.address, timeout=10).vectorize([123] if i == 0 else ["word" + str(i)])
+            except NLPServiceError as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=vectorize, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIsInstance(results[0], NLPServiceError)
+        for i in range(1, 6):
+            self.assertEqual(len(results[i]), 1)
+
+    def test_unknown_op(self):
+        """Errors are raised on the client."""
+        with self.assertRaises(NLPServiceError):
+            self.client.call("parse", ["cat"])
+
+    def test_unreachable(self):
+        """A client without a server raises NLPServiceError."""
+        with self.assertRaises(NLPServiceError):
+            NLPClient(os.path.join(self.directory.name, "missing.sock")).vectorize(["cat"])
+
+    def test_utils_use_service(self):
+        """With NLP_SERVICE_ADDRESS set, scoring and vocabularies go through the service."""
+        clear_vocab_cache()
+        with override_settings(NLP_SERVICE_ADDRESS=self.address):
+            entry = utils.score_guess("a cat", "Cat")
+            vocab = utils.get_vocab({"cat": "xyz", "pet": "abc"}, article_id=-1)
+        clear_vocab_cache()
+
+        self.assertAlmostEqual(entry.title_sim, utils.score_guess("a cat", "Cat").title_sim, places=5)
+        np.testing.assert_allclose(vocab.vectors, utils.get_vocab({"cat": "xyz", "pet": "abc"}).vectors, rtol=1e-6)
+        self.assertGreater(self.server.stats()["requests"], 0)
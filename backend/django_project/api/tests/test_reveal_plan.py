@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+import numpy as np
+
+from api.reveal_plan import RevealPlan, RevealPlanTable, clear_plan_cache, get_plan_table
+
+
+class RevealPlanTest(TestCase):
+    """Test suite for the per-article memo of reveal plans."""
+
+    def setUp(self):
+        clear_plan_cache()
+
+    def test_from_masks(self):
+        """Masks are stored as compact arrays of key ids."""
+        plan = RevealPlan.from_masks(np.array([True, False, True]), np.array([False, True, False]), 0.3, False)
+        self.assertEqual(plan.full.tolist(), [0, 2])
+        self.assertEqual(plan.partial.tolist(), [1])
+        self.assertEqual(plan.full.dtype, np.int32)
+
+    def test_table_lookup(self):
+        """Plans are cached by (title, guess) and counted as hits and misses."""
+        table = RevealPlanTable(["Cat", "pet"])
+        plan = RevealPlan([0], [1], 0.3, False)
+        self.assertIsNone(table.get("Cat", "dog"))
+        table.set("Cat", "dog", plan)
+        self.assertIs(table.get("Cat", "dog"), plan)
+        self.assertIsNone(table.get("Dog", "dog"))  # Same guess, other title
+        self.assertEqual(table.stats(), {"plans": 1, "hits": 1, "misses": 2})
+
+    def test_table_bound(self):
+        """The least recently used plan is evicted beyond max_plans."""
+        table = RevealPlanTable(["Cat"], max_plans=2)
+        for guess in ["a", "b", "c"]:
+            table.set("Cat", guess, RevealPlan([], [], 0.0, False))
+        self.assertEqual(len(table), 2)
+        self.assertIsNone(table.get("Cat", "a"))
+
+    def test_blacklist_built_once(self):
+        """A title's blacklist is built on first use and reused."""
+        table = RevealPlanTable(["Cat", "pet"])
+        calls = []
+
+        def build(keys, title):
+            calls.append(title)
+            return np.array([key in title for key in keys])
+
+        first = table.get_blacklist("Cat", build)
+        second = table.get_blacklist("Cat", build)
+        self.assertIs(first, second)
+        self.assertEqual(first.tolist(), [True, False])
+        self.assertEqual(calls, ["Cat"])
+
+    def test_table_per_article(self):
+        """Each article has one table, which is only handed out for matching keys."""
+        keys = ["Cat", "pet"]
+        table = get_plan_table(1, keys)
+        self.assertIs(get_plan_table(1, list(keys)), table)
+        self.assertIsNone(get_plan_table(1, ["pet", "Cat"]))
+        self.assertIsNot(get_plan_table(2, keys), table)
@@ -0,0 +1,70 @@
+from unittest import TestCase
+
+import numpy as np
+
+from api.reveal_state import REVEAL_STATE_VERSION, LazyWordMapping, decode_reveal_state, encode_reveal_state
+from api.scramble import pack_revealed
+
+
+class RevealStateTest(TestCase):
+    """Test suite for the stored reveal state format."""
+
+    def test_round_trip(self):
+        """A reveal mask decodes back to itself."""
+        revealed = np.array([True, False, True, True, False, False, False, True, True, False])
+        data = encode_reveal_state(revealed)
+        self.assertEqual(data[0], REVEAL_STATE_VERSION)
+        self.assertEqual(len(data), 5 + 2)  # Header plus two bytes of bits
+        self.assertEqual(decode_reveal_state(data, len(revealed)).tolist(), revealed.tolist())
+
+    def test_empty_state(self):
+        """An article without characters still has a valid state."""
+        data = encode_reveal_state(np.zeros(0, dtype=bool))
+        self.assertEqual(len(decode_reveal_state(data, 0)), 0)
+
+    def test_rejects_wrong_count(self):
+        """A state for a different vocabulary is rejected instead of silently misread."""
+        data = encode_reveal_state(np.zeros(10, dtype=bool))
+        with self.assertRaises(ValueError):
+            decode_reveal_state(data, 20)
+
+    def test_rejects_unknown_version(self):
+        """Unknown versions are rejected when encoding and decoding."""
+        data = encode_reveal_state(np.zeros(10, dtype=bool))
+        with self.assertRaises(ValueError):
+            decode_reveal_state(bytes([99]) + data[1:], 10)
+        with self.assertRaises(ValueError):
+            encode_reveal_state(np.zeros(10, dtype=bool), version=99)
+        with self.assertRaises(ValueError):
+            decode_reveal_state(b"\x01", 10)
+
+    def test_rejects_rounded_length(self):
+        """A state's length must match exactly, not just up to the padding of its last byte."""
+        revealed = np.array([True, False, True, False, False, False, False, False, True, True])
+        bits = pack_revealed(revealed)
+        data = bytes([1]) + (len(bits) * 8).to_bytes(4, "little") + bits
+        with self.assertRaises(ValueError):
+            decode_reveal_state(data, len(revealed))
+
+
+class LazyWordMappingTest(TestCase):
+    """Test suite for the lazily built word_mapping."""
+
+    def test_loads_once_on_first_use(self):
+        """The mapping is not built until it is read, and then only once."""
+        calls = []
+
+        def load():
+            calls.append(1)
+            return {"Cat": "Xyz"}
+
+        mapping = LazyWordMapping(load)
+        self.assertFalse(mapping.loaded)
+        self.assertEqual(calls, [])
+
+        self.assertEqual(mapping["Cat"], "Xyz")
+        mapping["Cat"] = "Cat"
+        self.assertEqual(dict(mapping), {"Cat": "Cat"})
+        self.assertEqual(mapping.get("Dog", "Dog"), "Dog")
+        self.assertTrue(mapping.loaded)
+        self.assertEqual(calls, [1])
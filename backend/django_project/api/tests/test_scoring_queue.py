@@ -0,0 +1,162 @@
+import threading
+from unittest import TestCase
+
+import numpy as np
+from django.test import override_settings
+
+from api import scoring_queue, utils
+from api.micro_batch import BatcherClosed, MicroBatcher
+from api.scoring_queue import ScoringQueue, get_scoring_queue
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class MicroBatcherTest(TestCase):
+    """Test suite for coalescing concurrent submissions into batches."""
+
+    def setUp(self):
+        self.calls = []
+
+        def run_batch(key, items):
+            self.calls.append((key, list(items)))
+            if key == "fail":
+                raise ValueError("bad batch")
+            return [key + str(item) for item in items]
+
+        self.batcher = MicroBatcher(run_batch, batch_size=64, batch_wait=0.05)
+
+    def tearDown(self):
+        self.batcher.close()
+
+    def test_results_in_order(self):
+        """Every submission gets its own results, in order."""
+        self.assertEqual(self.batcher.submit("a", [1, 2, 3]).result(timeout=5), ["a1", "a2", "a3"])
+        self.assertEqual(self.batcher.submit("a", []).result(timeout=5), [])
+
+    def test_coalesces(self):
+        """Concurrent submissions are answered in fewer batches, one run_batch call per key."""
+        results = {}
+
+        def submit(i):
+            results[i] = self.batcher.submit("ab"[i % 2], [i]).result(timeout=5)
+
+        run_threads(submit, 8)
+
+        self.assertEqual(results, {i: ["ab"[i % 2] + str(i)] for i in range(8)})
+        self.assertEqual(self.batcher.stats()["requests"], 8)
+        self.assertLess(self.batcher.stats()["batches"], 8)
+        self.assertLess(len(self.calls), 8)
+
+    def test_errors_propagate(self):
+        """A failing batch fails its own submissions only."""
+        failed = self.batcher.submit("fail", [1])
+        ok = self.batcher.submit("a", [1])
+        with self.assertRaises(ValueError):
+            failed.result(timeout=5)
+        self.assertEqual(ok.result(timeout=5), ["a1"])
+
+    def test_bad_submission_fails_alone(self):
+        """A submission that breaks its batch is retried apart, and only it fails."""
+        def run_batch(key, items):
+            if "bad" in items:
+                raise ValueError("bad item")
+            return [item.upper() for item in items]
+
+        batcher = MicroBatcher(run_batch, batch_size=64, batch_wait=0.2)
+        self.addCleanup(batcher.close)
+        futures = [batcher.submit("a", items) for items in (["x"], ["bad"], ["y", "z"])]
+
+        self.assertEqual(futures[0].result(timeout=5), ["X"])
+        with self.assertRaises(ValueError):
+            futures[1].result(timeout=5)
+        self.assertEqual(futures[2].result(timeout=5), ["Y", "Z"])
+        self.assertEqual(batcher.stats(), {"requests": 3, "batches": 1, "largest_batch": 3})
+
+    def test_submit_after_close(self):
+        """Submissions after close fail at once instead of waiting forever."""
+        self.assertEqual(self.batcher.submit("a", [1]).result(timeout=5), ["a1"])
+        self.batcher.close()
+        with self.assertRaises(BatcherClosed):
+            self.batcher.submit("a", [2]).result(timeout=5)
+        self.batcher._thread.join(timeout=5)
+        self.assertFalse(self.batcher._thread.is_alive())
+
+
+class ScoringQueueTest(TestCase):
+    """Test suite for batched guess scoring."""
+
+    def setUp(self):
+        self.queue = ScoringQueue(batch_wait=0.05)
+
+    def tearDown(self):
+        self.queue.close()
+
+    def test_score_matches_inline(self):
+        """Batched scores match the ones computed one guess at a time."""
+        with override_settings(SCORING_BATCH_WAIT=0):
+            expected = {guess: utils.score_guess(guess, "Cat") for guess in ("a cat", "dog", "pet food", "")}
+
+        results = {}
+        guesses = list(expected)
+
+        def score(i):
+            results[guesses[i]] = self.queue.score(guesses[i], "Cat")
+
+        run_threads(score, len(guesses))
+
+        for guess, entry in expected.items():
+            np.testing.assert_allclose(results[guess].vector, entry.vector)
+            self.assertAlmostEqual(results[guess].norm, entry.norm, places=5)
+            self.assertAlmostEqual(results[guess].title_sim, entry.title_sim, places=5)
+        self.assertLess(self.queue.stats()["batches"], len(guesses))
+
+    def test_similarities_match_vocab(self):
+        """Batched similarities match VocabMatrix.similarities, including for a zero vector."""
+        vocab = utils.get_vocab({"cat": "xyz", "pet": "abc", "dog": "def"})
+        vectors = [utils.get_key_vector(text) for text in ("cat", "kitten", "house")]
+        vectors.append(np.zeros(vocab.vectors.shape[1], dtype=np.float32))
+
+        results = {}
+
+        def similarities(i):
+            results[i] = self.queue.similarities(vocab, vectors[i])
+
+        run_threads(similarities, len(vectors))
+
+        for i, vector in enumerate(vectors):
+            np.testing.assert_allclose(results[i], vocab.similarities(vector), rtol=1e-5, atol=1e-6)
+        np.testing.assert_array_equal(results[len(vectors) - 1], np.zeros(len(vocab.keys)))
+
+    def test_get_scoring_queue(self):
+        """Batching is off with a wait of 0, and the shared queue follows the settings."""
+        with override_settings(SCORING_BATCH_WAIT=0):
+            self.assertIsNone(get_scoring_queue())
+        with override_settings(SCORING_BATCH_WAIT=0.01, SCORING_BATCH_SIZE=8):
+            queue = get_scoring_queue()
+            self.assertIs(get_scoring_queue(), queue)
+            self.assertEqual((queue.batcher.batch_size, queue.batcher.batch_wait), (8, 0.01))
+        self.assertIsNot(get_scoring_queue(), queue)
+
+    def test_score_pairs(self):
+        """Pairs sharing texts are parsed once and scored independently."""
+        entries = scoring_queue.score_pairs([("cat", "Cat"), ("dog", "Cat"), ("cat", "Dog")])
+        self.assertEqual(len(entries), 3)
+        self.assertAlmostEqual(entries[0].title_sim, utils.score_guess("cat", "Cat").title_sim, places=5)
+        np.testing.assert_allclose(entries[0].vector, entries[2].vector)
+
+    def test_closed_queue_scores_inline(self):
+        """Guesses reaching a closed queue, or not answered in time, are scored inline instead of hanging."""
+        expected = self.queue.score("a cat", "Cat")
+        self.queue.close()
+        self.assertAlmostEqual(self.queue.score("a cat", "Cat").title_sim, expected.title_sim, places=5)
+
+        stuck = ScoringQueue(batch_wait=0.05, result_timeout=0.1)
+        self.addCleanup(stuck.close)
+        stuck.batcher.run_batch = lambda key, items: threading.Event().wait(1)
+        self.assertAlmostEqual(stuck.score("a cat", "Cat").title_sim, expected.title_sim, places=5)
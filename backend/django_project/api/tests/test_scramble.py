@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+import numpy as np
+
+from api.scramble import ScrambleEngine, make_rng, to_codes, from_codes, get_article_engine, clear_engine_cache
+
+KEYS = ["This", "is", "a", "test", "naïve"]
+LETTERS = ["x", "y", "z"]
+
+
+class ScrambleEngineTest(TestCase):
+    """Test suite for the vectorized scramble engine."""
+
+    def setUp(self):
+        clear_engine_cache()
+
+    def test_codes_round_trip(self):
+        """Strings survive the conversion to code points and back, including non-ASCII."""
+        self.assertEqual(from_codes(to_codes("naïve ☃")), "naïve ☃")
+
+    def test_layout(self):
+        """Every key id maps to its slice of the flat character array."""
+        engine = ScrambleEngine(KEYS)
+        self.assertEqual(engine.index["test"], 3)
+        self.assertEqual(engine.offsets.tolist(), [0, 4, 6, 7, 11, 16])
+        self.assertEqual(engine.owner.tolist()[:7], [0, 0, 0, 0, 1, 1, 2])
+
+    def test_scramble_uses_letter_bag(self):
+        """A fresh scramble keeps every key's length and only uses letters from the bag."""
+        mapping = ScrambleEngine(KEYS).scramble(LETTERS, make_rng(0)).to_mapping()
+        self.assertEqual(list(mapping), KEYS)
+        for key, value in mapping.items():
+            self.assertEqual(len(value), len(key))
+            self.assertTrue(set(value) <= set(LETTERS))
+
+    def test_scramble_is_reproducible(self):
+        """The same seed gives the same scramble."""
+        engine = ScrambleEngine(KEYS)
+        first = engine.scramble(LETTERS, make_rng(42)).to_mapping()
+        second = engine.scramble(LETTERS, make_rng(42)).to_mapping()
+        self.assertEqual(first, second)
+
+    def test_empty_letter_bag_raises(self):
+        """Scrambling needs at least one letter."""
+        with self.assertRaises(IndexError):
+            ScrambleEngine(KEYS).scramble([])
+
+    def test_reveal_full(self):
+        """Fully revealed keys show their original text, the others stay scrambled."""
+        engine = ScrambleEngine(KEYS)
+        state = engine.scramble(LETTERS, make_rng(0))
+        state.reveal_full([0, 3])
+        mapping = state.to_mapping()
+        self.assertEqual(mapping["This"], "This")
+        self.assertEqual(mapping["test"], "test")
+        self.assertNotEqual(mapping["naïve"], "naïve")
+
+    def test_reveal_partial(self):
+        """Partially revealed keys show half of their characters, rounded down."""
+        engine = ScrambleEngine(KEYS)
+        state = engine.scramble(LETTERS, make_rng(0))
+        state.reveal_partial([0, 2, 4], make_rng(1))
+        for key_id, expected in [(0, 2), (1, 0), (2, 0), (4, 2)]:
+            start, end = engine.offsets[key_id], engine.offsets[key_id + 1]
+            self.assertEqual(int(state.revealed[start:end].sum()), expected)
+
+    def test_from_mapping_round_trip(self):
+        """A state rebuilt from its word mapping renders the same and keeps what was revealed."""
+        engine = ScrambleEngine(KEYS)
+        state = engine.scramble(LETTERS, make_rng(0))
+        state.reveal_full([1])
+        mapping = state.to_mapping()
+        rebuilt = engine.from_mapping(mapping)
+        self.assertEqual(rebuilt.to_mapping(), mapping)
+        self.assertTrue(rebuilt.revealed[engine.offsets[1]:engine.offsets[2]].all())
+
+    def test_from_mapping_rejects_wrong_lengths(self):
+        """A word mapping whose values do not match the key lengths is rejected."""
+        engine = ScrambleEngine(["cat"])
+        with self.assertRaises(ValueError):
+            engine.from_mapping({"cat": "ca"})
+
+    def test_article_engine_is_built_once(self):
+        """The article engine is built on first use and reused afterwards."""
+        first = get_article_engine(1, KEYS)
+        self.assertIs(get_article_engine(1, ["other"]), first)
+        self.assertTrue(np.array_equal(first.chars, to_codes("".join(KEYS))))
@@ -1,12 +1,17 @@
 # Created with help from Cursor
 
 from django.test import TestCase
-from unittest.mock import patch
-from api.utils import get_daily_article, get_daily_article_title, generate_game, get_letter_bag, get_user_article, get_user_scores, process_guess, update_user_profile, user_finished_game, get_doc, init_random, stringify_state, guess_update
+from unittest.mock import patch, MagicMock
+from api.utils import get_daily_article, get_daily_article_title, generate_game, get_letter_bag, get_user_article, get_user_scores, get_game_over, get_game_snapshot, get_article_delta, process_guess, update_user_profile, user_finished_game, get_doc, init_random, stringify_state, guess_update, score_guesses, get_tokens, get_article_text
 from django.utils import timezone
-import spacy  # Import spacy
+from django.contrib.auth.models import User
+from django.test import override_settings
+from game.models import ArticleCache, DailyArticle, GameState
+from api.nlp_models import get_nlp  # Shared, lazily loaded spaCy model
+from api.guess_cache import clear_guess_cache, guess_cache_stats
+from api.reveal_plan import clear_plan_cache, get_plan_table
+from api.game_context import GameContext
 
-nlp = spacy.load("en_core_web_lg") # python -m spacy download en_core_web_lg
 FULL_THRESH = 0.7          # Absolute similarity threshold for a word to be completely unscrambled
 PARTIAL_THRESH = 0.4        # Partial similarity threshold for a word to be partially unscrambled
 FULL_MULTIPLIER = 1.2         # Multiplier for full threshold reduction based on how close the guess is to title
@@ -15,39 +20,36 @@ WIN_THRESH = 0.95           # Threshold to pass to win the game
 PUNCT_THRESH = 2            # Length threshold for punctuation to be considered a word instead (for weird formattings)
 
 class UtilsTestCase(TestCase):
-    @patch('api.utils.DailyArticle')
-    @patch('api.utils.ArticleCache')
-    def test_get_daily_article_title(self, MockArticleCache, MockDailyArticle):
+    @patch('api.utils.get_cached_daily_article')
+    def test_get_daily_article_title(self, MockGetCachedDailyArticle):
         """Test that the daily article title is returned correctly."""
-        # Set up the mock for DailyArticle
-        mock_daily_article_instance = MockDailyArticle.return_value
-        mock_daily_article_instance.article.title = 'Mock Daily Article Title'
-        MockDailyArticle.objects.get.return_value = mock_daily_article_instance
-
-        # Set up the mock for ArticleCache
-        mock_article_instance = MockArticleCache.return_value
-        mock_article_instance.content = 'This is the main content of the article.'
-        mock_article_instance.image_urls = ['http://example.com/image.jpg']
-        MockArticleCache.objects.get.return_value = mock_article_instance
+        # Set up the mock for the cached DailyArticle
+        mock_daily_article_instance = MagicMock()
+        mock_daily_article_instance.title = 'Mock Daily Article Title'
+        MockGetCachedDailyArticle.return_value = mock_daily_article_instance
 
         # Call the function to test
         title = get_daily_article_title()
         self.assertEqual(title, 'Mock Daily Article Title')  # Check that the title matches the mock
 
-    @patch('api.utils.DailyArticle')
-    @patch('api.utils.ArticleCache')
-    def test_get_daily_article(self, MockArticleCache, MockDailyArticle):
-        """Test that the daily article is returned correctly."""
-        # Set up the mock for DailyArticle
-        mock_daily_article_instance = MockDailyArticle.return_value
-        mock_daily_article_instance.article.title = 'Mock Daily Article Title'
-        MockDailyArticle.objects.get.return_value = mock_daily_article_instance
+        # Without a daily article the lookup fails like a missing DailyArticle row
+        MockGetCachedDailyArticle.return_value = None
+        with self.assertRaises(DailyArticle.DoesNotExist):
+            get_daily_article_title()
 
-        # Set up the mock for ArticleCache
-        mock_article_instance = MockArticleCache.return_value
+    @patch('api.utils.get_cached_daily_article')
+    def test_get_daily_article(self, MockGetCachedDailyArticle):
+        """Test that the daily article is returned correctly."""
+        # Set up the mock for the article
+        mock_article_instance = MagicMock()
         mock_article_instance.content = 'This is the main content of the article.'
         mock_article_instance.image_urls = ['http://example.com/image.jpg']
-        MockArticleCache.objects.get.return_value = mock_article_instance
+
+        # Set up the mock for the cached DailyArticle, deriving values on the spot
+        mock_daily_article_instance = MagicMock()
+        mock_daily_article_instance.article = mock_article_instance
+        mock_daily_article_instance.derived.side_effect = lambda key, build: build()
+        MockGetCachedDailyArticle.return_value = mock_daily_article_instance
 
         # Call the function to test
         article = get_daily_article()
@@ -56,44 +58,27 @@ class UtilsTestCase(TestCase):
         self.assertIn("image-url", article)  # Check that 'image-url' is in the returned article
         self.assertEqual(article["image-url"], 'http://example.com/image.jpg')  # Check image URL
 
-    @patch('api.utils.User')
-    @patch('api.utils.GameState')
-    @patch('api.utils.ArticleCache')
-    @patch('api.utils.get_daily_article')
-    @patch('api.utils.DailyArticle')
-    def test_get_user_article(self, MockDailyArticle, MockGetDailyArticle, MockArticleCache, MockGameState, MockUser):
+    @patch('api.utils.load_game_context')
+    def test_get_user_article(self, MockLoadGameContext):
         """Test that the user's current article is returned correctly."""
-        # Set up the mock for User
-        mock_user_instance = MockUser.return_value
-        mock_user_instance.id = 1
-        MockUser.objects.get.return_value = mock_user_instance
-
-        # Set up the mock for GameState
-        mock_game_state_instance = MockGameState.return_value
-        mock_game_state_instance.word_mapping = {'This': 'This'}
-        mock_game_state_instance.article.title = 'Mock Daily Article Title'
-        MockGameState.objects.get.return_value = mock_game_state_instance
-
-        # Set up the mock for ArticleCache
-        mock_article_instance = MockArticleCache.return_value
+        # Set up the mock for the game's article
+        mock_article_instance = MagicMock()
+        mock_article_instance.title = 'Mock Daily Article Title'
         mock_article_instance.content = 'This is the main content of the article.'
         mock_article_instance.image_urls = ['http://example.com/image.jpg']
-        MockArticleCache.objects.get.return_value = mock_article_instance
 
-        # Set up the mock for DailyArticle
-        mock_daily_article_instance = MockDailyArticle.return_value
-        mock_daily_article_instance.article.title = 'Mock Daily Article Title'
-        MockDailyArticle.objects.get.return_value = mock_daily_article_instance
+        # Set up the mock for GameState
+        mock_game_state_instance = MagicMock()
+        mock_game_state_instance.word_mapping = {'This': 'This'}
+        mock_game_state_instance.article = mock_article_instance
 
-        # Set up the mock for get_daily_article
-        MockGetDailyArticle.return_value = {
-            "main-text": 'This is the main content of the article.',
-            "image-url": 'http://example.com/image.jpg'
-        }
+        # Set up the request's game context
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), mock_game_state_instance, [], 'Mock Daily Article Title')
 
         # Call the function to test
         user_id = 1
         article = get_user_article(user_id)
+        MockLoadGameContext.assert_called_once_with(user_id)  # Everything comes from one context load
         self.assertIn("request", article)  # Check that 'request' is in the returned article
         self.assertEqual(article["request"], "get_scrambled_article")  # Check request type
         self.assertIn("article", article)  # Check that 'article' is in the returned article
@@ -101,44 +86,38 @@ class UtilsTestCase(TestCase):
         self.assertIn("image-url", article["article"])  # Check that 'image-url' is in the returned article
         self.assertEqual(article["article"]["image-url"], 'http://example.com/image.jpg')  # Check image URL
     
-    @patch('api.utils.User')
     @patch('api.utils.GameState')
     @patch('api.utils.ArticleCache')
-    @patch('api.utils.get_daily_article')
-    @patch('api.utils.DailyArticle')
-    def test_get_user_article_different_article(self, MockDailyArticle, MockGetDailyArticle, MockArticleCache, MockGameState, MockUser):
+    @patch('api.utils.load_game_context')
+    def test_get_user_article_different_article(self, MockLoadGameContext, MockArticleCache, MockGameState):
         """Test that the user's current article is initialized correctly."""
-        # Set up the mock for User
-        mock_user_instance = MockUser.return_value
-        mock_user_instance.id = 1
-        MockUser.objects.get.return_value = mock_user_instance
-
-        # Set up the mock for GameState
-        mock_game_state_instance = MockGameState.return_value
+        # Set up the mock for the user's old game
+        mock_game_state_instance = MagicMock()
         mock_game_state_instance.word_mapping = {'This': 'This'}
         mock_game_state_instance.article.title = 'Mock Daily Article Title'
-        MockGameState.objects.get.return_value = mock_game_state_instance
 
         # Set up the mock for ArticleCache
-        mock_article_instance = MockArticleCache.return_value
-        mock_article_instance.content = 'This is the main content of the article.'
-        mock_article_instance.image_urls = ['http://example.com/image.jpg']
+        mock_article_instance = MagicMock()
+        mock_article_instance.id = 2
+        mock_article_instance.title = 'Different Article Title'
+        mock_article_instance.content = 'This is the main content of the different article.'
+        mock_article_instance.image_urls = ['http://example.com/different-image.jpg']
         MockArticleCache.objects.get.return_value = mock_article_instance
 
-        # Set up the mock for DailyArticle
-        mock_daily_article_instance = MockDailyArticle.return_value
-        mock_daily_article_instance.article.title = 'Different Article Title'
-        MockDailyArticle.objects.get.return_value = mock_daily_article_instance
+        # Set up the mock for the new game
+        mock_new_game_state_instance = MagicMock()
+        mock_new_game_state_instance.word_mapping = {'This': 'This'}
+        mock_new_game_state_instance.article = mock_article_instance
+        MockGameState.objects.create.return_value = mock_new_game_state_instance
 
-        # Set up the mock for get_daily_article
-        MockGetDailyArticle.return_value = {
-            "main-text": 'This is the main content of the different article.',
-            "image-url": 'http://example.com/different-image.jpg'
-        }
+        # Set up the request's game context, today's article is a different one
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), mock_game_state_instance, [], 'Different Article Title')
 
         # Call the function to test
         user_id = 1
         article = get_user_article(user_id)
+        mock_game_state_instance.delete.assert_called_once()  # Old game is flushed
+        MockArticleCache.objects.get.assert_called_once_with(title='Different Article Title')
         self.assertIn("request", article)  # Check that 'request' is in the returned article
         self.assertEqual(article["request"], "get_scrambled_article")  # Check request type
         self.assertIn("article", article)  # Check that 'article' is in the returned article
@@ -147,20 +126,13 @@ class UtilsTestCase(TestCase):
         self.assertEqual(article["article"]["image-url"], 'http://example.com/different-image.jpg')  # Check image URL
 
 
-    @patch('api.utils.User')
-    @patch('api.utils.GameState')
+    @patch('api.utils.load_game_context')
     @patch('api.utils.UserGuess')  # Mock UserGuess to simulate user scores
-    def test_get_user_scores(self, MockUserGuess, MockGameState, MockUser):
+    def test_get_user_scores(self, MockUserGuess, MockLoadGameContext):
         """Test that the user's current scores are returned correctly."""
-        # Set up the mock for User
-        mock_user_instance = MockUser.return_value
-        mock_user_instance.id = 1
-        MockUser.objects.get.return_value = mock_user_instance
-
-        # Set up the mock for GameState
-        mock_game_state_instance = MockGameState.return_value
-        mock_game_state_instance.guesses.all.return_value = None  # No guesses initially
-        MockGameState.objects.get.return_value = mock_game_state_instance
+        # Set up the request's game context, no guesses initially
+        mock_game_state_instance = MagicMock()
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), mock_game_state_instance, None, 'Mock Daily Article Title')
 
         # Call the function to test
         user_id = 1
@@ -174,38 +146,28 @@ class UtilsTestCase(TestCase):
         mock_guess_instance = MockUserGuess.return_value
         mock_guess_instance.guess_text = 'Test Guess'
         mock_guess_instance.score = 500
-        mock_game_state_instance.guesses.all.return_value = [mock_guess_instance]
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), mock_game_state_instance, [mock_guess_instance], 'Mock Daily Article Title')
 
         # Call the function again to test with guesses
         scores = get_user_scores(user_id)
         self.assertIn("scores", scores)  # Check that 'scores' is in the returned scores
         self.assertEqual(scores["scores"], {'Test Guess': 500})  # Check that the score is returned correctly
 
-    @patch('api.utils.User')
-    @patch('api.utils.GameState')
     @patch('api.utils.UserGuess')
-    @patch('api.utils.get_daily_article_title')
+    @patch('api.utils.load_game_context')
     @patch('api.utils.guess_update')
-    def test_process_guess(self, MockGuessUpdate, MockGetDailyArticleTitle, MockUserGuess, MockGameState, MockUser):
+    def test_process_guess(self, MockGuessUpdate, MockLoadGameContext, MockUserGuess):
         """Test that the process_guess function updates the user's guess correctly."""
-        # Set up the mock for User
-        mock_user_instance = MockUser.return_value
-        mock_user_instance.id = 1
-        MockUser.objects.get.return_value = mock_user_instance
-
         # Set up the mock for GameState
-        mock_game_state_instance = MockGameState.return_value
+        mock_game_state_instance = MagicMock()
         mock_game_state_instance.word_mapping = {'This': 'This'}
-        mock_game_state_instance.guesses.all.return_value = None  # No guesses initially
-        MockGameState.objects.get.return_value = mock_game_state_instance
+        guesses = None  # No guesses initially
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), mock_game_state_instance, guesses, 'Mock Daily Article Title')
 
         # Set up the mock for UserGuess
         mock_guess_instance = MockUserGuess.return_value
         MockUserGuess.objects.create.return_value = mock_guess_instance
 
-        # Mock the return value of get_daily_article_title
-        MockGetDailyArticleTitle.return_value = 'Mock Daily Article Title'
-
         # Mock the return value of guess_update
         MockGuessUpdate.return_value = 0.8  # Simulate a similarity score
 
@@ -216,19 +178,14 @@ class UtilsTestCase(TestCase):
         
         # Check that the game state was updated
         mock_game_state_instance.save.assert_called_once()  # Ensure save was called
+        self.assertEqual(MockGuessUpdate.call_args[0][2], 'Mock Daily Article Title')  # Title comes from the context
+        MockUserGuess.objects.create.assert_called_once()  # Guess was recorded
     
-    @patch('api.utils.User')
-    @patch('api.utils.GameState')
     @patch('api.utils.UserGuess')
-    @patch('api.utils.get_daily_article_title')
+    @patch('api.utils.load_game_context')
     @patch('api.utils.guess_update')
-    def test_process_guess_already_guessed(self, MockGuessUpdate, MockGetDailyArticleTitle, MockUserGuess, MockGameState, MockUser):
+    def test_process_guess_already_guessed(self, MockGuessUpdate, MockLoadGameContext, MockUserGuess):
         """Test that the process_guess function updates the user's guess correctly."""
-        # Set up the mock for User
-        mock_user_instance = MockUser.return_value
-        mock_user_instance.id = 1
-        MockUser.objects.get.return_value = mock_user_instance
-
         # Set up mock for a user guess as a class with a guess_text and score attribute
         class MockUserGuess:
             def __init__(self, guess_text, score):
@@ -236,13 +193,10 @@ class UtilsTestCase(TestCase):
                 self.score = score
 
         # Set up the mock for GameState
-        mock_game_state_instance = MockGameState.return_value
+        mock_game_state_instance = MagicMock()
         mock_game_state_instance.word_mapping = {'This': 'This'}
-        mock_game_state_instance.guesses.all.return_value = [MockUserGuess('This is a guess', 500)]  # Same guess
-        MockGameState.objects.get.return_value = mock_game_state_instance
-
-        # Mock the return value of get_daily_article_title
-        MockGetDailyArticleTitle.return_value = 'Mock Daily Article Title'
+        guesses = [MockUserGuess('This is a guess', 500)]  # Same guess
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), mock_game_state_instance, guesses, 'Mock Daily Article Title')
 
         # Mock the return value of guess_update
         MockGuessUpdate.return_value = 0.8  # Simulate a similarity score
@@ -255,18 +209,11 @@ class UtilsTestCase(TestCase):
         # Check that the game state was not updated
         mock_game_state_instance.save.assert_not_called()  # Ensure save was not called
 
-    @patch('api.utils.User')
-    @patch('api.utils.GameState')
     @patch('api.utils.UserGuess')
-    @patch('api.utils.get_daily_article_title')
+    @patch('api.utils.load_game_context')
     @patch('api.utils.guess_update')
-    def test_process_guess_already_won(self, MockGuessUpdate, MockGetDailyArticleTitle, MockUserGuess, MockGameState, MockUser):
+    def test_process_guess_already_won(self, MockGuessUpdate, MockLoadGameContext, MockUserGuess):
         """Test that the process_guess function updates the user's guess correctly."""
-        # Set up the mock for User
-        mock_user_instance = MockUser.return_value
-        mock_user_instance.id = 1
-        MockUser.objects.get.return_value = mock_user_instance
-
         # Set up mock for a user guess as a class with a guess_text and score attribute
         class MockUserGuess:
             def __init__(self, guess_text, score):
@@ -274,13 +221,10 @@ class UtilsTestCase(TestCase):
                 self.score = score
 
         # Set up the mock for GameState
-        mock_game_state_instance = MockGameState.return_value
+        mock_game_state_instance = MagicMock()
         mock_game_state_instance.word_mapping = {'This': 'This'}
-        mock_game_state_instance.guesses.all.return_value = [MockUserGuess('Winning guess', 1000)]  # Winning guess
-        MockGameState.objects.get.return_value = mock_game_state_instance
-
-        # Mock the return value of get_daily_article_title
-        MockGetDailyArticleTitle.return_value = 'Mock Daily Article Title'
+        guesses = [MockUserGuess('Winning guess', 1000)]  # Winning guess
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), mock_game_state_instance, guesses, 'Mock Daily Article Title')
 
         # Mock the return value of guess_update
         MockGuessUpdate.return_value = 0.8  # Simulate a similarity score
@@ -293,18 +237,11 @@ class UtilsTestCase(TestCase):
         # Check that the game state was not updated
         mock_game_state_instance.save.assert_not_called()  # Ensure save was not called
 
-    @patch('api.utils.User')
-    @patch('api.utils.GameState')
     @patch('api.utils.UserGuess')
-    @patch('api.utils.get_daily_article_title')
+    @patch('api.utils.load_game_context')
     @patch('api.utils.guess_update')
-    def test_process_guess_exceeds_max_guesses(self, MockGuessUpdate, MockGetDailyArticleTitle, MockUserGuess, MockGameState, MockUser):
+    def test_process_guess_exceeds_max_guesses(self, MockGuessUpdate, MockLoadGameContext, MockUserGuess):
         """Test that the process_guess function updates the user's guess correctly."""
-        # Set up the mock for User
-        mock_user_instance = MockUser.return_value
-        mock_user_instance.id = 1
-        MockUser.objects.get.return_value = mock_user_instance
-
         # Set up mock for a user guess as a class with a guess_text and score attribute
         class MockUserGuess:
             def __init__(self, guess_text, score):
@@ -312,9 +249,9 @@ class UtilsTestCase(TestCase):
                 self.score = score
 
         # Set up the mock for GameState
-        mock_game_state_instance = MockGameState.return_value
+        mock_game_state_instance = MagicMock()
         mock_game_state_instance.word_mapping = {'This': 'This'}
-        mock_game_state_instance.guesses.all.return_value = [
+        guesses = [
             MockUserGuess('Other guess 1', 500),
             MockUserGuess('Other guess 2', 500),
             MockUserGuess('Other guess 3', 500),
@@ -324,10 +261,7 @@ class UtilsTestCase(TestCase):
             MockUserGuess('Other guess 7', 500),
             MockUserGuess('Other guess 8', 500),
         ]  # Eight guesses
-        MockGameState.objects.get.return_value = mock_game_state_instance
-
-        # Mock the return value of get_daily_article_title
-        MockGetDailyArticleTitle.return_value = 'Mock Daily Article Title'
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), mock_game_state_instance, guesses, 'Mock Daily Article Title')
 
         # Mock the return value of guess_update
         MockGuessUpdate.return_value = 0.8  # Simulate a similarity score
@@ -375,26 +309,15 @@ class UtilsTestCase(TestCase):
         # Check that the user profile was saved
         mock_user_profile_instance.save.assert_called_once()  # Ensure save was called
 
-    @patch('api.utils.User')
-    @patch('api.utils.GameState')
+    @patch('api.utils.load_game_context')
     @patch('api.utils.UserGuess')
-    def test_user_finished_game(self, MockUserGuess, MockGameState, MockUser):
+    def test_user_finished_game(self, MockUserGuess, MockLoadGameContext):
         """Test that the user_finished_game function correctly identifies a winning scenario."""
-        # Set up the mock for User
-        mock_user_instance = MockUser.return_value
-        mock_user_instance.id = 1
-        MockUser.objects.get.return_value = mock_user_instance
-
-        # Set up the mock for GameState
-        mock_game_state_instance = MockGameState.return_value
-        mock_game_state_instance.guesses.all.return_value = []  # No guesses initially
-        MockGameState.objects.get.return_value = mock_game_state_instance
-
         # Set up the mock for UserGuess with a winning score
         mock_guess_instance = MockUserGuess.return_value
         mock_guess_instance.guess_text = 'Winning Guess'
         mock_guess_instance.score = 1000  # Winning score
-        mock_game_state_instance.guesses.all.return_value = [mock_guess_instance]
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), MagicMock(), [mock_guess_instance], 'Mock Daily Article Title')
 
         # Call the function to test
         user_id = 1
@@ -405,12 +328,18 @@ class UtilsTestCase(TestCase):
         self.assertEqual(score, 1000)  # Score should be 1000
 
         # Now test for a scenario where the user has not finished the game
-        mock_game_state_instance.guesses.all.return_value = []  # No guesses
+        MockLoadGameContext.return_value = GameContext(MagicMock(id=1), MagicMock(), [], 'Mock Daily Article Title')  # No guesses
         finished, score = user_finished_game(user_id)
 
         # Check that the user has not finished the game
         self.assertFalse(finished)  # User should not have finished the game
         self.assertEqual(score, 0)  # Score should be 0
+
+        # get_game_over answers from one context load
+        MockLoadGameContext.reset_mock()
+        game_over = get_game_over(user_id)
+        MockLoadGameContext.assert_called_once_with(user_id)
+        self.assertFalse(game_over["game_over"])
         
     # Scrambling/Unscrambling tests
     def test_generate_game(self):
@@ -424,9 +353,21 @@ class UtilsTestCase(TestCase):
         """Test that the get_doc function returns a Spacy doc."""
         text = "This is a test."
         doc = get_doc(text)
-        doc_ground_truth = nlp(text)
+        doc_ground_truth = get_nlp()(text)
         self.assertIsInstance(doc, type(doc_ground_truth))
 
+    def test_get_doc_profiles(self):
+        """Test that get_doc only runs the pipeline components of the requested profile."""
+        text = "This is a test."
+        vectors_doc = get_doc(text, "vectors")
+        tagged_doc = get_doc(text, "tagger")
+        self.assertEqual([t.text for t in vectors_doc], [t.text for t in tagged_doc])  # Same tokens either way
+        self.assertFalse(vectors_doc.has_annotation("TAG"))  # Vectors profile skips the tagger
+        self.assertTrue(tagged_doc.has_annotation("TAG"))  # Tagger profile tags tokens
+        self.assertFalse(tagged_doc.has_annotation("DEP"))  # but skips the parser
+        self.assertEqual(tagged_doc[-1].pos_, "PUNCT")
+        self.assertTrue((vectors_doc.vector == tagged_doc.vector).all())  # Vectors do not depend on the profile
+
     def test_get_letter_bag(self):
         """Test that the get_letter_bag function returns a list of unique letters."""
         text = "This is a test."
@@ -474,3 +415,186 @@ class UtilsTestCase(TestCase):
         self.assertEqual(test_state["a"], "a")  # Check that the word "a" is fully unscrambled
         self.assertEqual(test_state["test"], "test")  # Check that the word "test" is fully unscrambled
 
+    def test_guess_update_shares_scored_guesses(self):
+        """Test that repeating a guess (up to whitespace) reuses its cached vector and title similarity."""
+        clear_guess_cache()
+        text = "This is a test."
+        first_state = generate_game(text, {})
+        second_state = generate_game(text, {})
+        first = guess_update(first_state, "a test", "Test")
+        second = guess_update(second_state, "  a   test ", "Test")
+        self.assertEqual(first, second)
+        stats = guess_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_guess_update_shares_reveal_plans(self):
+        """Test that the same guess on the same article reuses one reveal plan across users."""
+        clear_plan_cache()
+        text = "This is a test."
+        first_state = generate_game(text, {})
+        second_state = generate_game(text, {})
+        init_random(first_state, get_letter_bag(text))
+        init_random(second_state, get_letter_bag(text))
+        guess_update(first_state, "test", "Test", article_id=-1)
+        guess_update(second_state, "test", "Test", article_id=-1)
+        self.assertEqual(first_state["test"], "test")  # Guessed word is fully revealed for both users
+        self.assertEqual(second_state["test"], "test")
+
+        stats = get_plan_table(-1, list(first_state.keys())).stats()
+        self.assertEqual((stats["plans"], stats["hits"], stats["misses"]), (1, 1, 1))
+
+    def test_score_guesses(self):
+        """Test that batch scoring matches guess_update one guess at a time."""
+        text = "This is a test. The cat is a pet."
+        keys = list(generate_game(text, {}).keys())
+        guesses = ["cat", "test", "dog", "Cat"]
+        similarities, full, partial = score_guesses(guesses, "Cat", keys, batch_size=2)
+        self.assertEqual(full.shape, (len(guesses), len(keys)))
+        self.assertTrue(full[3].all())  # Guessing the title unscrambles everything
+        self.assertFalse((full & partial).any())  # A key is never both fully and partially unscrambled
+
+        for row, guess in enumerate(guesses):
+            test_state = {key: "#" * len(key) for key in keys}
+            similarity = guess_update(test_state, guess, "Cat")
+            self.assertAlmostEqual(float(similarities[row]), similarity, places=5)
+            for i, key in enumerate(keys):
+                if full[row, i]:
+                    self.assertEqual(test_state[key], key)
+
+    def test_score_guesses_titles(self):
+        """Test that score_guesses takes one title per guess, and rejects mismatched lengths."""
+        similarities, full, partial = score_guesses(["cat", "Dog"], ["Cat", "Dog"])
+        self.assertEqual(len(similarities), 2)
+        self.assertEqual(similarities[1], 1.0)
+        self.assertIsNone(full)
+        self.assertIsNone(partial)
+        with self.assertRaises(ValueError):
+            score_guesses(["cat", "dog"], ["Cat"])
+
+
+@override_settings(GAME_STATE_STORAGE="seeded")
+class SeededGameTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="seeded", password="password")
+        self.article = ArticleCache.objects.create(article_id="1", title="Cat", content="This is a test. The cat is a pet.")
+        DailyArticle.objects.create(date=timezone.now().date(), article=self.article)
+
+    def test_seeded_game_stores_no_mapping(self):
+        """Test that a seeded game stores only a seed and a reveal state, and renders the same every time."""
+        first = get_user_article(self.user.id)["article"]["main-text"]
+        second = get_user_article(self.user.id)["article"]["main-text"]
+        self.assertEqual(first, second)  # Scramble is derived again identically
+
+        game_state = GameState.objects.get(user=self.user)
+        self.assertEqual(game_state.word_mapping, {})  # No word mapping is stored
+        self.assertIsNotNone(game_state.scramble_seed)
+        self.assertEqual(set(bytes(game_state.reveal_state)[5:]), {0})  # Nothing revealed yet (after the 5 byte header)
+
+    def test_seeded_game_guess(self):
+        """Test that a guess on a seeded game is stored in the reveal state."""
+        get_user_article(self.user.id)
+        process_guess(self.user.id, "test")
+
+        game_state = GameState.objects.get(user=self.user)
+        self.assertEqual(game_state.word_mapping, {})
+        self.assertNotEqual(set(bytes(game_state.reveal_state)[5:]), {0})  # Something was revealed
+        self.assertIn(" test", get_user_article(self.user.id)["article"]["main-text"])
+
+    def test_seeded_game_query_count(self):
+        """Test that a guess reads the game in one round trip and only writes the guess and the reveal state."""
+        get_user_article(self.user.id)
+        get_game_over(self.user.id)  # Warm the per-article caches
+        with self.assertNumQueries(4):  # Game state (+ user, profile, article, title), guesses, update, insert
+            process_guess(self.user.id, "pet")
+        with self.assertNumQueries(2):
+            get_user_article(self.user.id)
+
+    def test_updated_article(self):
+        """Test that a game started after the article's content was updated is played on the new content."""
+        get_user_article(self.user.id)
+        process_guess(self.user.id, "test")
+
+        self.article.content = "Dogs bark loudly at night. The dog is a loyal pet."
+        self.article.save()
+        other = User.objects.create_user(username="other", password="password")
+        get_user_article(other.id)
+        process_guess(other.id, "dog")
+
+        keys = get_tokens(self.article.id, get_article_text(self.article)).keys(PUNCT_THRESH)
+        self.assertIn("loudly", keys)
+        self.assertIn(" dog", get_user_article(other.id)["article"]["main-text"])  # Revealed by the guess
+
+    def test_game_snapshot(self):
+        """Test that the game snapshot matches the separate endpoints and loads the game once."""
+        get_user_article(self.user.id)
+        process_guess(self.user.id, "pet")
+
+        with self.assertNumQueries(2):  # Game state (+ user, profile, article), guesses
+            snapshot = get_game_snapshot(self.user.id)
+        self.assertEqual(snapshot["request"], "get_game_snapshot")
+        self.assertEqual(snapshot["article"], get_user_article(self.user.id)["article"])
+        self.assertEqual(snapshot["scores"], get_user_scores(self.user.id)["scores"])
+        game_over = get_game_over(self.user.id)
+        self.assertEqual(snapshot["game_over"], game_over["game_over"])
+        self.assertEqual(snapshot["score"], game_over["score"])
+        self.assertEqual(snapshot["title"], game_over["title"])
+
+    def test_game_snapshot_creates_game(self):
+        """Test that a snapshot for a user without a game starts one, like get_user_article."""
+        snapshot = get_game_snapshot(self.user.id)
+        self.assertTrue(GameState.objects.filter(user=self.user).exists())
+        self.assertEqual(snapshot["scores"], {})
+        self.assertFalse(snapshot["game_over"])
+
+    def words_from(self, article):
+        """Read the word the user sees for every vocabulary index out of a rendered article, like a client would."""
+        keys = get_tokens(self.article.id, get_article_text(self.article)).keys(PUNCT_THRESH)
+        rendered = article["article"]["main-text"]
+        words = {}
+        position = 0
+        for piece in article["template"]:
+            if isinstance(piece, str):
+                position += len(piece)
+            else:
+                words[piece] = rendered[position + 1:position + 1 + len(keys[piece])]  # After the space before the word
+                position += 1 + len(keys[piece])
+        return words
+
+    def test_article_delta(self):
+        """Test that applying a guess's delta to the previous article gives the new article."""
+        article = get_user_article(self.user.id, template=True)
+        template = article["template"]
+        words = self.words_from(article)
+
+        process_guess(self.user.id, "test")
+        with self.assertNumQueries(2):  # Game state (+ user, profile, article), guesses
+            delta = get_article_delta(self.user.id, article["state"])
+        self.assertFalse(delta["full"])
+        self.assertTrue(delta["revealed"])
+        self.assertLess(len(delta["revealed"]), len(words))  # Only the changed words are sent
+        for key_id, word in delta["revealed"]:
+            words[key_id] = word
+
+        new_article = get_user_article(self.user.id)
+        rendered = "".join(piece if isinstance(piece, str) else " " + words[piece] for piece in template)
+        self.assertEqual(rendered, new_article["article"]["main-text"])
+        self.assertEqual(delta["state"], new_article["state"])
+
+        # Nothing changed since the latest version
+        self.assertEqual(get_article_delta(self.user.id, delta["state"])["revealed"], [])
+
+    def test_article_delta_full(self):
+        """Test that a state token of another version or game gets the whole article and its template."""
+        article = get_user_article(self.user.id)
+        game_id = GameState.objects.get(user=self.user).id
+        for since in [None, "", "garbage", str(game_id) + ".5", str(game_id + 1) + ".0"]:
+            delta = get_article_delta(self.user.id, since)
+            self.assertTrue(delta["full"])
+            self.assertEqual(delta["article"], article["article"])
+            self.assertEqual(delta["state"], article["state"])
+            self.assertIn("template", delta)
+
+        # Guesses from before revealed keys were recorded cannot be replayed
+        process_guess(self.user.id, "test")
+        GameState.objects.get(user=self.user).guesses.update(revealed_keys=None)
+        self.assertTrue(get_article_delta(self.user.id, article["state"])["full"])
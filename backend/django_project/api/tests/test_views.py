@@ -4,7 +4,10 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from unittest.mock import patch
+from game.daily_article_cache import invalidate_daily_article
+from game.models import ArticleCache, DailyArticle, GameState, UserGuess
 
 User = get_user_model()
 
@@ -111,3 +114,141 @@ class ApiViewsTestCase(APITestCase):
         response_data = response.json()
         self.assertEqual(response_data['request'], "process_guess")
         self.assertEqual(response_data['guess'], 'This is a guess')
+
+    @patch('api.views.utils.get_game_snapshot')
+    @patch('api.views.utils.process_guess')
+    def test_process_guess_snapshot(self, mock_process_guess, mock_get_game_snapshot):
+        """Test that process_guess returns the updated game when asked for a snapshot."""
+        mock_process_guess.return_value = None
+        mock_get_game_snapshot.return_value = {"request": "get_game_snapshot", "scores": {"This is a guess": 100}}
+
+        url = reverse('process_guess')  # URL name matches urls.py
+        response = self.client.post(url, {'guess': 'This is a guess', 'snapshot': True})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_data = response.json()
+        self.assertEqual(response_data['guess'], 'This is a guess')
+        self.assertEqual(response_data['snapshot']['scores'], {"This is a guess": 100})
+
+        # Without the flag the response stays as it was
+        response = self.client.post(url, {'guess': 'Another guess'})
+        self.assertNotIn('snapshot', response.json())
+        self.assertEqual(mock_get_game_snapshot.call_count, 1)
+
+    @patch('api.views.utils.get_game_snapshot')
+    def test_get_game_snapshot(self, mock_get_game_snapshot):
+        """Test the get_game_snapshot view."""
+        mock_get_game_snapshot.return_value = {
+            "request": "get_game_snapshot",
+            "article": {"main-text": "This is a scrambled article."},
+            "scores": {"guess1": 100},
+            "game_over": False,
+            "score": "",
+            "title": ""
+        }
+
+        url = reverse('game_snapshot')  # URL name matches urls.py
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_data = response.json()
+        self.assertEqual(response_data['request'], "get_game_snapshot")
+        self.assertEqual(response_data['article']['main-text'], "This is a scrambled article.")
+        self.assertEqual(response_data['scores']['guess1'], 100)
+        self.assertFalse(response_data['game_over'])
+
+    def test_get_game_snapshot_unauthorized(self):
+        """Test that get_game_snapshot requires a logged in user."""
+        self.client.logout()
+        response = self.client.get(reverse('game_snapshot'))
+        self.assertEqual(response.status_code, 401)
+
+    @patch('api.views.utils.get_article_delta')
+    def test_get_article_delta(self, mock_get_article_delta):
+        """Test the get_article_delta view."""
+        mock_get_article_delta.return_value = {
+            "request": "get_article_delta",
+            "state": "1.2",
+            "full": False,
+            "revealed": [[3, "cat"]]
+        }
+
+        url = reverse('article_delta')  # URL name matches urls.py
+        response = self.client.get(url, {'since': '1.1'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response_data = response.json()
+        self.assertEqual(response_data['state'], "1.2")
+        self.assertEqual(response_data['revealed'], [[3, "cat"]])
+        mock_get_article_delta.assert_called_once_with(self.user.id, '1.1')
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='etaguser', password='testpassword')
+        self.client.login(username='etaguser', password='testpassword')
+        self.article = ArticleCache.objects.create(article_id="1", title="Cat", content="The cat is a pet.")
+        DailyArticle.objects.create(date=timezone.now().date(), article=self.article)
+        invalidate_daily_article()
+        self.game_state = GameState.objects.create(user=self.user, article=self.article)
+
+    @patch('api.views.utils.get_user_scores')
+    def test_not_modified(self, mock_get_user_scores):
+        """Test that a request with the current ETag gets a 304 without building the response."""
+        mock_get_user_scores.return_value = {"request": "get_guess_scoreboard", "scores": {}}
+        url = reverse('guess_scoreboard')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(mock_get_user_scores.call_count, 1)  # Not called for the 304
+
+    @patch('api.views.utils.get_user_scores')
+    def test_etag_changes_with_game(self, mock_get_user_scores):
+        """Test that a new guess changes the ETag."""
+        mock_get_user_scores.return_value = {"request": "get_guess_scoreboard", "scores": {}}
+        url = reverse('guess_scoreboard')
+        etag = self.client.get(url)['ETag']
+
+        UserGuess.objects.create(game_state=self.game_state, guess_text="dog", score=300)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @patch('api.views.utils.get_game_over')
+    @patch('api.views.utils.get_user_article')
+    def test_etag_per_endpoint(self, mock_get_user_article, mock_get_game_over):
+        """Test that endpoints and query strings of the same game get different ETags."""
+        mock_get_user_article.return_value = {"request": "get_scrambled_article", "article": {}}
+        mock_get_game_over.return_value = {"request": "get_game_over", "game_over": False, "score": "", "title": ""}
+
+        etags = {
+            self.client.get(reverse('scrambled_article'))['ETag'],
+            self.client.get(reverse('scrambled_article'), {'template': '1'})['ETag'],
+            self.client.get(reverse('game_over'))['ETag'],
+        }
+        self.assertEqual(len(etags), 3)
+
+    @patch('api.views.utils.get_user_article')
+    def test_no_etag_without_game(self, mock_get_user_article):
+        """Test that a user without a game gets no ETag, since the response creates the game."""
+        mock_get_user_article.return_value = {"request": "get_scrambled_article", "article": {}}
+        self.game_state.delete()
+
+        response = self.client.get(reverse('scrambled_article'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_profile_not_modified(self):
+        """Test that the profile view answers a matching If-None-Match with 304 until the profile changes."""
+        etag = self.client.get('/profile/')['ETag']
+        self.assertEqual(self.client.get('/profile/', HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.user.profile.total_games_played = 1
+        self.user.profile.save()
+        response = self.client.get('/profile/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['total_games_played'], 1)
@@ -0,0 +1,79 @@
+from unittest import TestCase
+
+import numpy as np
+
+from api.vocab import VocabMatrix, build_vocab_matrix, get_article_vocab, clear_vocab_cache
+
+VECTORS = {
+    "cat": [1.0, 0.0, 0.0],
+    "dog": [0.0, 2.0, 0.0],
+    "kitten": [3.0, 3.0, 0.0],
+    "zzz": [0.0, 0.0, 0.0],  # Out-of-vocabulary words have no vector
+}
+
+
+class VocabMatrixTest(TestCase):
+    """Test suite for the per-article vocabulary matrix."""
+
+    def setUp(self):
+        clear_vocab_cache()
+
+    def test_rows_are_unit_normalized(self):
+        """Every row with a vector has length 1, rows without one stay zero."""
+        vocab = build_vocab_matrix(VECTORS.keys(), VECTORS.get)
+        norms = np.linalg.norm(vocab.vectors, axis=1)
+        np.testing.assert_allclose(norms, [1.0, 1.0, 1.0, 0.0], atol=1e-6)
+        self.assertTrue(vocab.vectors.flags["C_CONTIGUOUS"])
+        self.assertEqual(vocab.vectors.dtype, np.float32)
+
+    def test_index_maps_keys_to_rows(self):
+        """The index maps each key to its row in the matrix."""
+        vocab = build_vocab_matrix(VECTORS.keys(), VECTORS.get)
+        self.assertEqual(vocab.index["dog"], 1)
+        self.assertEqual(list(vocab.rows(["zzz", "cat"])), [3, 0])
+        self.assertIn("kitten", vocab)
+        self.assertTrue(vocab.covers({"cat": "xyz", "dog": "abc"}))
+        self.assertFalse(vocab.covers({"cat": "xyz", "bird": "abcd"}))
+
+    def test_similarities_are_cosine(self):
+        """Similarities match cosine similarity computed by hand."""
+        vocab = build_vocab_matrix(VECTORS.keys(), VECTORS.get)
+        sims = vocab.similarities([2.0, 0.0, 0.0])
+        np.testing.assert_allclose(sims, [1.0, 0.0, np.sqrt(0.5), 0.0], atol=1e-6)
+
+    def test_zero_guess_vector_scores_zero(self):
+        """A guess without a vector scores 0 against every key."""
+        vocab = build_vocab_matrix(VECTORS.keys(), VECTORS.get)
+        self.assertEqual(list(vocab.similarities([0.0, 0.0, 0.0])), [0.0] * 4)
+
+    def test_empty_vocab(self):
+        """An empty vocabulary still has the requested vector width."""
+        vocab = build_vocab_matrix([], VECTORS.get, width=3)
+        self.assertEqual(len(vocab), 0)
+        self.assertEqual(vocab.vectors.shape, (0, 3))
+        self.assertEqual(len(vocab.similarities([1.0, 0.0, 0.0])), 0)
+
+    def test_mismatched_vectors_raise(self):
+        """Building a matrix with the wrong number of rows is rejected."""
+        with self.assertRaises(ValueError):
+            VocabMatrix(["cat", "dog"], np.zeros((3, 3)))
+
+    def test_article_vocab_is_built_once(self):
+        """The article vocabulary is built on first use and reused afterwards."""
+        calls = []
+
+        def vectorize(key):
+            calls.append(key)
+            return VECTORS[key]
+
+        first = get_article_vocab(1, ["cat", "dog"], vectorize)
+        second = get_article_vocab(1, ["cat", "dog"], vectorize)
+        self.assertIs(first, second)
+        self.assertEqual(calls, ["cat", "dog"])
+
+    def test_article_vocab_evicts_old_articles(self):
+        """Rolling over to new articles evicts the oldest cached vocabulary."""
+        first = get_article_vocab(1, ["cat"], VECTORS.get)
+        get_article_vocab(2, ["dog"], VECTORS.get)
+        get_article_vocab(3, ["kitten"], VECTORS.get)
+        self.assertIsNot(get_article_vocab(1, ["cat"], VECTORS.get), first)
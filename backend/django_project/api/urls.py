@@ -2,19 +2,22 @@
 urls.py
 
 This module contains the logic for the URL endpoints for the backend API
+
+With ASYNC_GAME_VIEWS set, the game endpoints are served by the async views of async_views.py.
 """
 
+from django.conf import settings
 from django.urls import path
+from . import async_views, views
 from .views import (
     get_user_info,
-    get_scrambled_article,
-    get_guess_scoreboard,
     get_friend_scoreboard,
-    process_guess,
-    get_game_over,
     example_view
 )
 
+# Game endpoints, sync or async (see async_views.py)
+game_views = async_views if getattr(settings, "ASYNC_GAME_VIEWS", False) else views
+
 urlpatterns = [
     path(
         'user_info/',
@@ -22,11 +25,15 @@ urlpatterns = [
         name='user_info'),
     path(
         'scrambled_article/',
-        get_scrambled_article,
+        game_views.get_scrambled_article,
         name='scrambled_article'),
+    path(
+        'article_delta/',
+        game_views.get_article_delta,
+        name='article_delta'),
     path(
         'guess_scoreboard/',
-        get_guess_scoreboard,
+        game_views.get_guess_scoreboard,
         name='guess_scoreboard'),
     path(
         'friend_scoreboard/',
@@ -34,12 +41,16 @@ urlpatterns = [
         name='friend_scoreboard'),
     path(
         'process_guess/',
-        process_guess,
+        game_views.process_guess,
         name='process_guess'),
     path(
         'game_over/',
-        get_game_over,
+        game_views.get_game_over,
         name='game_over'),
+    path(
+        'game_snapshot/',
+        game_views.get_game_snapshot,
+        name='game_snapshot'),
     path(
         'example/',
         example_view,
@@ -7,14 +7,25 @@ This module contains the functions for game logic and NLP libraries, supporting
 *Possibly use an image editing library if needed down the line.
 """
 
-import spacy
-import random
+import secrets
+import numpy as np
+from api import nlp_models, nlp_service, scoring_queue
+from api.nlp_models import PROFILE_VECTORS, PROFILE_TAGGER
+from api.article_tokens import TokenizedArticle, get_article_tokens
+from api.game_context import GameContext, load_game_context
+from api.guess_cache import GuessEntry, get_guess_cache, normalize_guess
+from api.json_render import EncodedFields
+from api.reveal_plan import RevealPlan, get_plan_table
+from api.reveal_state import LazyWordMapping, decode_reveal_state, encode_reveal_state
+from api.scramble import ScrambleEngine, get_article_engine, make_rng
+from api.vocab import build_vocab_matrix, get_article_vocab
+from game.daily_article_cache import get_cached_daily_article
 from game.models import ArticleCache, DailyArticle, GameState, UserGuess, UserProfile
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
 
-nlp = spacy.load("en_core_web_lg") # python -m spacy download en_core_web_lg
 FULL_THRESH = 0.7          # Absolute similarity threshold for a word to be completely unscrambled
 PARTIAL_THRESH = 0.4        # Partial similarity threshold for a word to be partially unscrambled
 FULL_MULTIPLIER = 1.2         # Multiplier for full threshold reduction based on how close the guess is to title
@@ -43,15 +54,20 @@ def get_daily_article():
         }
     }
     """
-    # Get the name of the daily article from the database
-    article_title = get_daily_article_title()
+    # Get the daily article, from the database once per day
+    daily = get_daily_entry()
 
-    # Use the name of the article to get the article data from the database
-    article_data = ArticleCache.objects.get(title=article_title)
+    # Return the article data in proper JSON format, formatted once per day
+    return daily.derived("article", lambda: format_daily_article(daily.article)).copy()
 
-    # Return the article data in proper JSON format
+def format_article(article_data):
+    """
+    format_article returns an ArticleCache entry in the article format of get_daily_article.
+
+    For UTIL use, NOT USER.
+    """
     output = {
-        "main-text" : article_data.content[:1000],       # Cap characters at 1000 for testing
+        "main-text" : get_article_text(article_data),
     }
 
     if (len(article_data.image_urls) > 0):
@@ -59,22 +75,52 @@ def get_daily_article():
 
     return output
 
+def format_daily_article(article_data):
+    """
+    format_daily_article returns format_article's output with everything but the text pre-encoded (see api/json_render.py),
+    since every user of the daily article gets the same image and metadata.
+
+    For UTIL use, NOT USER.
+    """
+    article = format_article(article_data)
+    return EncodedFields(article, [key for key in article if key != "main-text"])
+
+def get_article_text(article):
+    """
+    get_article_text returns the part of an article's content that the game is played on.
+
+    For UTIL use, NOT USER.
+    """
+    return article.content[:1000]       # Cap characters at 1000 for testing
+
 def get_daily_article_title():
     """
     get_daily_article_title returns the current daily article title from the database
 
     For UTIL use, NOT USER.
     """
-    today = timezone.now().date()
-    daily_article = DailyArticle.objects.get(date=today)
-    title = daily_article.article.title
-    return title
+    return get_daily_entry().title
+
+def get_daily_entry():
+    """
+    get_daily_entry returns today's cached daily article (see game/daily_article_cache.py).
 
-def get_user_article(user_id):
+    For UTIL use, NOT USER. Raises DailyArticle.DoesNotExist if no article is set for today.
+    """
+    daily = get_cached_daily_article()
+    if daily is None:
+        raise DailyArticle.DoesNotExist("No daily article for " + str(timezone.now().date()))
+    return daily
+
+def get_user_article(user_id, context: GameContext = None, template: bool = False):
     """
     get_user_article formats and returns the user's current article with appropriate scrambling.
 
-    For API/USER use.
+    For API/USER use. Pass context (see api/game_context.py) to reuse data the request already loaded.
+
+    "state" identifies the returned version of the game, pass it to get_article_delta to only get what changed
+    since. With template set, the response also holds the article's template (see TokenizedArticle.template),
+    which clients apply deltas to.
 
     Format is JSON:
     {
@@ -89,32 +135,25 @@ def get_user_article(user_id):
                 "caption1" : <caption 1 - if image url>,
                 ...
             }
-        }
+        },
+        "state" : <state token>,
+        "template" : [<text or vocabulary index>, ...] # only with template
     }
     """
-    user = User.objects.get(id=user_id)
+    if context is None:
+        context = load_game_context(user_id)
+    title = context.title
 
     # Access user state
-    game_state = None
-    try: # Look into logic further later
-        game_state = GameState.objects.get(user=user)
-    except: # pragma: no cover
+    game_state = context.game_state
+    if game_state is None:
         # User has no initialized game, initialize a game for them and update database
         print("LOG: Generating game for UID: " + str(user_id))
-        article_text = get_daily_article()["main-text"]
-        new_state = generate_game(article_text) # TESTING behavior
-        init_random(new_state, get_letter_bag(article_text))
-
-        # Create new game state
-        GameState.objects.create(
-            user=user,
-            article=ArticleCache.objects.get(title=get_daily_article_title()),
-            word_mapping=new_state
-        )
-        game_state = GameState.objects.get(user=user) # pragma: no cover
+        article = get_context_article(context)
+        context.set_game_state(create_game(context.user, article, get_article_text(article)))
 
     # IF ARTICLE HAS CHANGED, FLUSH ALL CURRENT STATE AND SCORES FOR USER AND CREATE NEW GAME STATE
-    if (get_daily_article_title() != game_state.article.title):
+    elif (title != game_state.article.title):
         print("LOG: Article has changed, flushing state and scores for UID: " + str(user_id))
         game_state.delete()
         game_state = None
@@ -122,35 +161,134 @@ def get_user_article(user_id):
         # Create new game state
         # We can consider keeping the game state in the database later for the user to track progress in a more detailed manner
         print("LOG: Generating game for UID: " + str(user_id))
-        article_text = get_daily_article()["main-text"]
-        new_state = generate_game(article_text) # TESTING behavior
-        init_random(new_state, get_letter_bag(article_text))
+        article = get_context_article(context)
+        context.set_game_state(create_game(context.user, article, get_article_text(article)))
+
+    # The game's article is today's article now, formatted once per day when it comes from the daily cache
+    game_state = context.game_state
+    daily = context.daily_article
+    if daily is not None and daily.article.pk == game_state.article.pk:
+        article_out = daily.derived("article", lambda: format_daily_article(daily.article)).copy()
+    else:
+        article_out = format_article(game_state.article)
+    article_text = article_out["main-text"]
 
-        GameState.objects.create(
-            user=user,
-            article=ArticleCache.objects.get(title=get_daily_article_title()),
-            word_mapping=new_state
-        )
-        game_state = GameState.objects.get(user=user)
-        
-    # Scramble output text based on state
-    user_state = game_state.word_mapping
-    maintext_out = stringify_state(get_daily_article()["main-text"], user_state)
+    # Scramble output text based on state, reusing the article's cached token stream
+    user_state = get_word_mapping(game_state)
+    tokens = get_tokens(game_state.article.id, article_text)
+    article_out["main-text"] = tokens.render(user_state)
 
-    # Format output
-    article_out = get_daily_article()
-    article_out["main-text"] = maintext_out
+    response = {
+        "request": "get_scrambled_article",
+        "article": article_out,
+        "state": get_state_token(context)
+    }
+    if template:
+        response["template"] = tokens.template(PUNCT_THRESH)
+    return response
+
+def get_state_token(context: GameContext):
+    """
+    get_state_token returns the token of the game's current version, "<game id>.<number of guesses>".
+
+    For UTIL use, NOT USER.
+    """
+    return str(context.game_state.id) + "." + str(len(context.guesses))
+
+def get_article_delta(user_id, since: str, context: GameContext = None):
+    """
+    get_article_delta returns the words of the user's article that changed after the version since (a state token
+    from get_user_article or an earlier delta), with what the user now sees for each.
+
+    For API/USER use. Pass context (see api/game_context.py) to reuse data the request already loaded.
+
+    If since is not a version of the current game (e.g. the daily article changed) or what changed is unknown,
+    the whole article is returned instead, with its template.
+
+    Format is JSON:
+    {
+        "request" : "get_article_delta",
+        "state" : <state token>,
+        "full" : <bool>,
+        "revealed" : [[<vocabulary index>, <word>], ...],    # if not full
+        "article" : { <as in get_user_article> },           # if full
+        "template" : [<text or vocabulary index>, ...]      # if full
+    }
+    """
+    if context is None:
+        context = load_game_context(user_id)
+
+    game_state = context.game_state
+    version = parse_state_token(since, game_state)
+    if version is not None and version <= len(context.guesses) and game_state.article.title == context.title:
+        changes = [guess.revealed_keys for guess in context.guesses[version:]]
+    else:
+        changes = [None]
+
+    if None in changes:
+        article = get_user_article(user_id, context, template=True)
+        return {
+            "request" : "get_article_delta",
+            "state" : article["state"],
+            "full" : True,
+            "article" : article["article"],
+            "template" : article["template"]
+        }
+
+    # Only look up the changed words, the article is not rendered again
+    keys = get_tokens(game_state.article.id, get_article_text(game_state.article)).keys(PUNCT_THRESH)
+    user_state = get_word_mapping(game_state)
+    key_ids = sorted(set(key_id for change in changes for key_id in change))
 
     return {
-        "request": "get_scrambled_article",
-        "article": article_out
+        "request" : "get_article_delta",
+        "state" : get_state_token(context),
+        "full" : False,
+        "revealed" : [[key_id, user_state[keys[key_id]]] for key_id in key_ids]
     }
 
-def get_user_scores(user_id):
+def parse_state_token(token, game_state):
+    """
+    parse_state_token returns the number of guesses of the state token, or None if it is not a version of game_state.
+
+    For UTIL use, NOT USER.
+    """
+    if game_state is None or not token:
+        return None
+    try:
+        game_id, version = (int(part) for part in str(token).split("."))
+    except ValueError:
+        return None
+    if game_id != game_state.id or version < 0:
+        return None
+    return version
+
+def get_vocab_ids(article, keys):
+    """
+    get_vocab_ids returns the sorted vocabulary indices (see TokenizedArticle.key_ids) of keys in article.
+
+    For UTIL use, NOT USER.
+    """
+    if not keys:
+        return []
+    key_ids = get_tokens(article.id, get_article_text(article)).key_ids(PUNCT_THRESH)
+    return sorted(key_ids[key] for key in keys if key in key_ids)
+
+def get_context_article(context: GameContext):
+    """
+    get_context_article returns today's ArticleCache entry, from the context's cached daily article when it has one.
+
+    For UTIL use, NOT USER.
+    """
+    if context.daily_article is not None:
+        return context.daily_article.article
+    return ArticleCache.objects.get(title=context.title)
+
+def get_user_scores(user_id, context: GameContext = None):
     """
     get_user_scores formats and returns the user's current scores.
 
-    For API/USER use.
+    For API/USER use. Pass context (see api/game_context.py) to reuse data the request already loaded.
 
     Format is JSON:
     {
@@ -162,89 +300,125 @@ def get_user_scores(user_id):
         }
     }
     """
-    user = User.objects.get(id=user_id)
-
-    # Acess user scores
-    scores = {}
-    try:
-        game_state = GameState.objects.get(user=user)
-        for guess in game_state.guesses.all():
-            scores[guess.guess_text] = guess.score
-    except:
-        pass
+    if context is None:
+        context = load_game_context(user_id)
 
     return {
         "request" : "get_guess_scoreboard",
-        "scores" : scores
+        "scores" : context.scores
     }
 
-def process_guess(user_id, guess: str):
+def process_guess(user_id, guess: str, context: GameContext = None):
     """
     process_guess processes guess for the user identified by user_id and updates their information in the database.
 
-    For UTIL use, NOT USER.
+    For UTIL use, NOT USER. Pass context (see api/game_context.py) to reuse data the request already loaded.
+    See api/async_game.py for the async version.
     """
     print("Processing guess: " + guess + " for id = " + str(user_id))
     
     # Acess user state and scores
-    user = User.objects.get(id=user_id)
-    game_state = GameState.objects.get(user=user)
-    user_state = GameState.objects.get(user=user).word_mapping
-    user_scores = {}
-    try:
-        for g in game_state.guesses.all():
-            print("LOG: Found guess: " + g.guess_text)
-            user_scores[g.guess_text] = g.score
-    except:
-        pass
+    if context is None:
+        context = load_game_context(user_id)
+    game_state = context.game_state
+    if game_state is None:
+        raise GameState.DoesNotExist("No game for user " + str(user_id))
+    if not can_guess(context, guess):
+        return
+
+    # Update user state and scores with game logic
+    changed_fields, guess_fields = play_guess(context, guess)
+
+    # Update database with new state and scores, writing only the changed column
+    game_state.save(update_fields=changed_fields)
+    context.add_guess(UserGuess.objects.create(game_state=game_state, **guess_fields)) # Add a guess
+
+    # If the user finished the game, update the user's profile
+    for score in get_final_scores(context):
+        update_user_profile(user_id, score, context.profile)
+
+def can_guess(context: GameContext, guess: str):
+    """
+    can_guess returns whether guess may be played in the context's game: it is new, and the game is not over.
+
+    For UTIL use, NOT USER.
+    """
+    user_scores = context.scores
+    for g in user_scores:
+        print("LOG: Found guess: " + g)
 
     # If the guess has already been made, don't process it
     if guess in user_scores:
         print("LOG: Guess already made, skipping")
-        return
+        return False
 
     # If the guess exceeds the maximum number of guesses, don't process it
     if len(user_scores) >= MAX_GUESSES:
         print("LOG: Guess exceeds maximum number of guesses, skipping")
-        return
+        return False
 
     # If a guess is made after the user has already won the game, don't process it
     # We know the user has won if the last guess has a score of 1000
     if len(user_scores) > 0 and user_scores[list(user_scores.keys())[-1]] == 1000:
         print("LOG: Guess made after user has already won, skipping")
-        return
+        return False
 
-    # Update user state and scores with game logic
-    similarity = guess_update(user_state, guess, get_daily_article_title())
+    return True
+
+def play_guess(context: GameContext, guess: str):
+    """
+    play_guess applies guess to the context's game state without saving anything.
+
+    Returns the game state fields that changed (for game_state.save(update_fields=...)) and the fields of the
+    UserGuess to record. No database access, except loading the article if the context does not hold it.
+
+    For UTIL use, NOT USER.
+    """
+    game_state = context.game_state
+    user_state = get_word_mapping(game_state)
+    revealed = []
+    similarity = guess_update(user_state, guess, context.title, game_state.article.id, revealed=revealed)
     score = similarity * 1000
     score = int(score)
     print("Score: " + str(score))
     if score < 0:
         score = 0
-    user_scores[guess] = score
 
-    # Update database with new state and scores
-    game_state = GameState.objects.get(user=user)
-    game_state.word_mapping = user_state # Update wordmapping in database
-    game_state.save()
-    UserGuess.objects.create(game_state=game_state, guess_text=guess, score=score, similarity_score=similarity) # Add a guess
+    changed_fields = save_word_mapping(game_state, user_state) # Update wordmapping in database
+    guess_fields = {
+        "guess_text": guess,
+        "score": score,
+        "similarity_score": similarity,
+        "revealed_keys": get_vocab_ids(game_state.article, revealed),
+    }
+    return changed_fields, guess_fields
+
+def get_final_scores(context: GameContext):
+    """
+    get_final_scores returns the scores to record in the user's profile after the context's latest guess
+    (see update_user_profile), none while the game goes on.
 
-    # If the user finished the game, update the user's profile
-    if score == 1000:
-        update_user_profile(user_id, score)
+    For UTIL use, NOT USER.
+    """
+    user_scores = context.scores
+    final_scores = []
+    if user_scores[context.guesses[-1].guess_text] == 1000:
+        final_scores.append(1000)
     if len(user_scores) >= MAX_GUESSES:
         # Use user's maximum score as the score for the game if they hit the max number of guesses
-        update_user_profile(user_id, max(user_scores.values()))
+        final_scores.append(max(user_scores.values()))
+    return final_scores
 
-def update_user_profile(user_id, score: int):
+def update_user_profile(user_id, score: int, user_profile: UserProfile = None):
     """
     update_user_profile updates the user's profile after they have completed a game.
 
-    For UTIL use, NOT USER.
+    For UTIL use, NOT USER. Pass user_profile when it is already loaded.
     """
     # Get user profile
-    user = User.objects.get(id=user_id)
-    user_profile = UserProfile.objects.get(user=user)
+    if user_profile is None:
+        user = User.objects.get(id=user_id)
+        user_profile = UserProfile.objects.get(user=user)
 
     # Update total games played and won
     user_profile.total_games_played += 1
@@ -287,24 +461,20 @@ def update_user_profile(user_id, score: int):
     print("Best score: " + str(user_profile.best_score))
 
 
-def user_finished_game(user_id):
+def user_finished_game(user_id, context: GameContext = None):
     """
     user_won_today checks if the user has won today.
 
     returns a tuple of (bool, int) where the first element is a boolean indicating if the user has won today and the second element is the score of the user's last guess.
 
-    For UTIL use, NOT USER.
+    For UTIL use, NOT USER. Pass context (see api/game_context.py) to reuse data the request already loaded.
     """
     print("DEBUG: Checking if user has finished game for id: " + str(user_id))
-    user = User.objects.get(id=user_id)
-    game_state = GameState.objects.get(user=user)
-    user_scores = {}
-    try:
-        for g in game_state.guesses.all():
-            print("LOG: Found guess: " + g.guess_text)
-            user_scores[g.guess_text] = g.score
-    except:
-        pass
+    if context is None:
+        context = load_game_context(user_id)
+    user_scores = context.scores
+    for g in user_scores:
+        print("LOG: Found guess: " + g)
     
     # Check if user won the game
     if len(user_scores) > 0 and user_scores[list(user_scores.keys())[-1]] == 1000:
@@ -317,11 +487,11 @@ def user_finished_game(user_id):
     # Otherwise, they have not finished the game
     return False, 0
 
-def get_game_over(user_id):
+def get_game_over(user_id, context: GameContext = None):
     """
     get_game_over returns whether or not the game is over, and if so, the user's score and the article title
 
-    For API/USER use.
+    For API/USER use. Pass context (see api/game_context.py) to reuse data the request already loaded.
 
     Format is JSON:
     {
@@ -331,10 +501,12 @@ def get_game_over(user_id):
         "title" : <title>        # empty if game is not over
     }
     """
-    game_over, score = user_finished_game(user_id)      # Get game over status and score
-    score = str(score)                                  # Convert score to string
-    title = get_daily_article_title()                   # Get title of daily article    
-    if not game_over:                                   # If game is not over, set score and title to empty strings
+    if context is None:
+        context = load_game_context(user_id)
+    game_over, score = user_finished_game(user_id, context)     # Get game over status and score
+    score = str(score)                                          # Convert score to string
+    title = context.title                                       # Get title of daily article    
+    if not game_over:                                           # If game is not over, set score and title to empty strings
         score = ""
         title = ""
 
@@ -347,8 +519,137 @@ def get_game_over(user_id):
         "title" : title
     }
 
+def get_game_snapshot(user_id, context: GameContext = None):
+    """
+    get_game_snapshot returns the user's scrambled article, scores and game over status together, from one game context.
+
+    For API/USER use. Replaces calling get_user_article, get_user_scores and get_game_over separately,
+    each of which would load the game again. Pass context (see api/game_context.py) to reuse data the request already loaded.
+
+    Format is JSON:
+    {
+        "request" : "get_game_snapshot",
+        "article" : { <as in get_user_article> },
+        "scores" : { <as in get_user_scores> },
+        "game_over" : <bool>,
+        "score" : <final_score>, # empty if game is not over
+        "title" : <title>        # empty if game is not over
+    }
+    """
+    if context is None:
+        context = load_game_context(user_id)
+
+    # The article comes first, it creates the user's game if they have none yet
+    article = get_user_article(user_id, context)
+    game_over = get_game_over(user_id, context)
+
+    return {
+        "request" : "get_game_snapshot",
+        "article" : article["article"],
+        "scores" : get_user_scores(user_id, context)["scores"],
+        "game_over" : game_over["game_over"],
+        "score" : game_over["score"],
+        "title" : game_over["title"]
+    }
+
     
 
+##### GAME STATE STORAGE #####
+def create_game(user, article, article_text: str):
+    """
+    create_game creates a fully scrambled GameState for user on article.
+
+    With GAME_STATE_STORAGE = "seeded" only a random seed and an empty reveal state are stored, and the
+    scramble is derived from (article, user, seed) whenever it is needed. With "mapping" the whole scrambled
+    word_mapping is stored.
+
+    For UTIL use, NOT USER.
+    """
+    if settings.GAME_STATE_STORAGE == "seeded":
+        engine = get_seeded_engine(article)
+        get_vocab(dict.fromkeys(engine.keys), article.id) # Build the article's vocabulary matrix before the first guess
+
+        return GameState.objects.create(
+            user=user,
+            article=article,
+            scramble_seed=secrets.randbits(63),
+            reveal_state=encode_reveal_state(np.zeros(len(engine.chars), dtype=np.bool_))
+        )
+
+    new_state = new_game_state(get_tokens(article.id, article_text), article_text)
+    get_vocab(new_state, article.id) # Build the article's vocabulary matrix before the first guess
+
+    return GameState.objects.create(
+        user=user,
+        article=article,
+        word_mapping=new_state
+    )
+
+def is_seeded(game_state):
+    """
+    is_seeded returns whether game_state stores a seed and reveal state instead of a word_mapping.
+    """
+    return game_state.scramble_seed is not None and not game_state.word_mapping
+
+def get_seeded_engine(article):
+    """
+    get_seeded_engine returns the ScrambleEngine seeded games on article are derived from.
+
+    Its keys are the article's vocabulary in order of first appearance, so the same seed gives the same
+    scramble in every process.
+    """
+    global PUNCT_THRESH
+
+    keys = get_tokens(article.id, get_article_text(article)).keys(PUNCT_THRESH)
+    engine = get_article_engine(article.id, keys)
+    if engine.keys != keys: # Cached from a game state with a different key order
+        engine = ScrambleEngine(keys)
+    return engine
+
+def get_scramble_rng(article_id, user_id, seed):
+    """
+    get_scramble_rng returns the random generator a seeded game's scramble is drawn from.
+    """
+    return make_rng([seed, article_id, user_id])
+
+def load_scramble_state(game_state):
+    """
+    load_scramble_state rebuilds the ScrambleState of a seeded game: the scramble is derived again from
+    (article, user, seed) and the stored reveal state is applied to it.
+    """
+    article = game_state.article
+    engine = get_seeded_engine(article)
+    rng = get_scramble_rng(game_state.article_id, game_state.user_id, game_state.scramble_seed)
+
+    state = engine.scramble(get_letter_bag(get_article_text(article)), rng)
+    if game_state.reveal_state:
+        state.revealed = decode_reveal_state(game_state.reveal_state, len(engine.chars))
+    return state
+
+def get_word_mapping(game_state):
+    """
+    get_word_mapping returns the game's word_mapping.
+
+    For seeded games this is a LazyWordMapping, derived from the seed and reveal state only when first used.
+    """
+    if is_seeded(game_state):
+        return LazyWordMapping(lambda: load_scramble_state(game_state).to_mapping())
+    return game_state.word_mapping
+
+def save_word_mapping(game_state, word_mapping: dict):
+    """
+    save_word_mapping stores word_mapping on game_state (without saving it); seeded games only keep the reveal state.
+
+    Returns the fields that changed, for game_state.save(update_fields=...).
+    """
+    if is_seeded(game_state):
+        engine = get_seeded_engine(game_state.article)
+        game_state.reveal_state = encode_reveal_state(engine.from_mapping(word_mapping).revealed)
+        return ["reveal_state", "updated_at"]
+
+    game_state.word_mapping = word_mapping
+    return ["word_mapping", "updated_at"]
+
 ##### SCRAMBLING/UNSCRAMBLING LOGIC #####
 def generate_game(text: str, game_state: dict = {}):
     """
@@ -358,7 +659,7 @@ def generate_game(text: str, game_state: dict = {}):
     """
     global PUNCT_THRESH
 
-    doc = get_doc(text)
+    doc = get_doc(text, PROFILE_TAGGER) # Only POS is needed to skip SPACE/PUNCT tokens
 
     for token in doc:
         if token.pos_ == "SPACE":
@@ -373,12 +674,36 @@ def generate_game(text: str, game_state: dict = {}):
 
     return game_state
 
-def get_doc(text: str):
+def get_tokens(article_id, text: str):
+    """
+    get_tokens returns the TokenizedArticle for article_id, parsing text only the first time the article is seen.
+
+    The text is parsed by the NLP service when one is configured (see api/nlp_service.py).
+    """
+    client = nlp_service.get_client()
+    if client is not None:
+        return get_article_tokens(article_id, text, client.tokenize)
+    return get_article_tokens(article_id, text, lambda t: get_doc(t, PROFILE_TAGGER))
+
+def new_game_state(tokens: TokenizedArticle, text: str):
+    """
+    new_game_state returns a fully scrambled game state for an article that has already been tokenized.
+
+    Same keys as generate_game(text), without parsing the text again.
+    """
+    global PUNCT_THRESH
+
+    game_state = {key: key for key in tokens.keys(PUNCT_THRESH)}
+    init_random(game_state, get_letter_bag(text))
+    return game_state
+
+def get_doc(text: str, profile: str = PROFILE_TAGGER):
     """
     get_doc converts a string into a Spacy doc
+
+    profile selects which pipeline components run (see api/nlp_models.py), tokenizer and tagger by default.
     """
-    global nlp
-    return nlp(text)
+    return nlp_models.get_doc(text, profile)
 
 def get_letter_bag(text: str):
     """
@@ -389,80 +714,255 @@ def get_letter_bag(text: str):
     letter_bag = set(text)
     letter_exclude = {'\n', '\t', '\"', '\'', '.', ',', '(', ')', '[', ']', '{', '}', '\\', '/', ' ', '*', '!', '?', ':', ' '}
     letter_bag = letter_bag.difference(letter_exclude)
-    letter_bag = list(letter_bag)
+    letter_bag = sorted(letter_bag) # Sorted so a seeded scramble is the same in every process
     return letter_bag
 
-def init_random(game_state: dict, letter_bag: list):
+def init_random(game_state: dict, letter_bag: list, rng=None):
     """
     init_random takes a game state and randomizes it completely.
 
-    This directly modifies the game_state dictionary.
+    This directly modifies the game_state dictionary. Pass rng (see api.scramble.make_rng) for a reproducible scramble.
     """
-    for key in game_state:
-        temp = ""
-        for i in range(len(key)):
-            temp += random.choice(letter_bag)
-        game_state[key] = temp
+    engine = ScrambleEngine(game_state.keys())
+    game_state.update(engine.scramble(letter_bag, rng).to_mapping())
 
 def stringify_state(text: str, game_state: dict):
     """
     stringify_state takes some text and a game state dictionary and re-renders it with appropriate scrambling.
+
+    This parses text every call; to render an article use get_tokens(...).render(game_state), which parses it once.
     """
-    doc = get_doc(text)
-    text = ""
+    doc = get_doc(text, PROFILE_TAGGER) # Only POS is needed to pass SPACE/PUNCT tokens through
+    return TokenizedArticle.from_doc(doc).render(game_state)
 
-    for token in doc:
-        if (token.pos_ == "SPACE" and len(token.pos_) <= 2) or (token.pos_ == "PUNCT"):
-            text += token.text
+def get_key_vector(key: str):
+    """
+    get_key_vector returns the word vector spaCy would use for key when computing doc similarity.
 
-        else:
-            if token.text in game_state:
-                text += " " + game_state[token.text]
-            else:
-                text += " " + token.text
+    Only the tokenizer runs, since en_core_web_lg vectors are static lookups.
+    """
+    return get_doc(key, PROFILE_VECTORS).vector
+
+def get_vocab(game_state: dict, article_id=None):
+    """
+    get_vocab returns a VocabMatrix with a row for every key in game_state.
+
+    With an article_id the matrix is built once per article and shared by every user's guesses.
+    With an NLP service configured (see api/nlp_service.py), every key is vectorized in one request to it.
+    """
+    client = nlp_service.get_client()
+    if client is not None:
+        width, vectorize, batched = client.vectors_length(), client.vectorize, True
+    else:
+        width, vectorize, batched = nlp_models.get_nlp().vocab.vectors_length, get_key_vector, False
 
-    return text
+    if article_id is not None:
+        vocab = get_article_vocab(article_id, game_state.keys(), vectorize, width, batched)
+        if vocab.covers(game_state):
+            return vocab
 
-def guess_update(game_state: dict, guess: str, title: str):
+    # Game state does not match the cached article vocabulary, score it on its own
+    return build_vocab_matrix(game_state.keys(), vectorize, width, batched)
+
+def get_engine(game_state: dict, article_id=None):
+    """
+    get_engine returns a ScrambleEngine whose keys are exactly the keys of game_state.
+
+    With an article_id the engine is built once per article and shared by every user's guesses.
+    """
+    if article_id is not None:
+        engine = get_article_engine(article_id, list(game_state.keys()))
+        if len(engine) == len(game_state) and all(key in engine.index for key in game_state):
+            return engine
+
+    # Game state does not match the cached article engine, build one for it
+    return ScrambleEngine(game_state.keys())
+
+def guess_update(game_state: dict, guess: str, title: str, article_id=None, rng=None, revealed: list = None):
     """
     guess_update updates the game_state based on the guess vs. title and returns the similairty between the two
 
     If the similarity of an individual word in the article passes the thresh_full, it is fully unscrambled.
     If the similarity of an individual word in the article passes the thresh_partial, it is half unscrambled.
+
+    Word similarities come from the article's VocabMatrix (see get_vocab) and unscrambling is done by its
+    ScrambleEngine (see get_engine), both cached under article_id when given. Pass rng for reproducible reveals.
+
+    The guess is scored with its whitespace normalized. Its vector and title similarity are shared with every
+    other user making the same guess (see api/guess_cache.py), and so is the set of keys it unscrambles when
+    article_id is given (see api/reveal_plan.py); only the partially revealed positions are drawn per user.
+
+    Pass a list as revealed to have the keys whose letters changed appended to it.
+    """
+    guess = normalize_guess(guess)
+    engine = get_engine(game_state, article_id)
+    plan = get_reveal_plan(game_state, engine, guess, title, article_id)
+    print("Full Unscrambling " + str(len(plan.full)) + " words, Partial Unscrambling " + str(len(plan.partial)) + " words")
+
+    state = engine.from_mapping(game_state)
+    before = state.revealed.copy() if revealed is not None else None
+    state.reveal_full(plan.full)
+    state.reveal_partial(plan.partial, rng)
+    game_state.update(state.to_mapping())
+
+    # Keys with a newly revealed letter, letters already shown by chance render the same either way
+    if revealed is not None:
+        changed = np.unique(engine.owner[state.revealed & ~before])
+        revealed.extend(engine.keys[key_id] for key_id in changed.tolist())
+    
+    # If the user has won, set the similarity score to 1.0
+    if plan.win:
+        return 1.0
+    
+    # If the user has not won, return the similarity score
+    return plan.title_sim
+
+def get_reveal_plan(game_state: dict, engine: ScrambleEngine, guess: str, title: str, article_id=None):
+    """
+    get_reveal_plan returns the RevealPlan of a normalized guess against title, over engine's key ids.
+
+    With an article_id the plan is computed once per (article, title, guess) and shared by every user's games.
     """
-    global nlp, FULL_THRESH, FULL_MULTIPLIER, PARTIAL_THRESH, PARTIAL_MULTIPLIER, WIN_THRESH
+    table = get_plan_table(article_id, engine.keys) if article_id is not None else None
+    if table is None:
+        return make_reveal_plan(game_state, engine, guess, title, article_id, get_title_blacklist(engine.keys, title))
 
-    guess_spacy = nlp(guess)
-    title_spacy = nlp(title)
+    plan = table.get(title, guess)
+    if plan is None:
+        plan = make_reveal_plan(game_state, engine, guess, title, article_id, table.get_blacklist(title, get_title_blacklist))
+        table.set(title, guess, plan)
+    return plan
+
+def make_reveal_plan(game_state: dict, engine: ScrambleEngine, guess: str, title: str, article_id, blacklist):
+    """
+    make_reveal_plan runs the threshold pass of a normalized guess against every key of engine.
+    """
+    global WIN_THRESH
+
+    scored = get_guess_cache().get_or_score(title, guess, score_guess)
+    win = scored.title_sim > WIN_THRESH # Check if player has won
+
+    # Score the guess against every word at once
+    vocab = get_vocab(game_state, article_id)
+    queue = scoring_queue.get_scoring_queue()
+    if queue is not None:
+        sims = queue.similarities(vocab, scored.vector, scored.norm) # Batched with concurrent guesses on this article
+    else:
+        sims = vocab.similarities(scored.vector, scored.norm)
+    if guess in vocab:
+        sims[vocab.index[guess]] = 1.0 # spaCy treats identical text as a perfect match, even without a vector
+
+    if vocab.keys != engine.keys:
+        sims = sims[vocab.rows(engine.keys)] # Line similarities up with the engine's key ids
+
+    full, partial = get_reveal_masks(sims, scored.title_sim, blacklist)
+    return RevealPlan.from_masks(full, partial, scored.title_sim, win)
+
+def score_guess(guess: str, title: str):
+    """
+    score_guess parses guess and returns its GuessEntry: document vector, vector norm and similarity to title.
+
+    This is the uncached work behind guess_update; use get_guess_cache().get_or_score to share it.
+    With an NLP service configured (see api/nlp_service.py), the guess is scored by it. Otherwise, with
+    SCORING_BATCH_WAIT set, it is scored together with concurrent guesses (see api/scoring_queue.py).
+    """
+    client = nlp_service.get_client()
+    if client is not None:
+        return client.score(guess, title)
+
+    queue = scoring_queue.get_scoring_queue()
+    if queue is not None:
+        return queue.score(guess, title)
+
+    # Similarity only needs word vectors, so skip the tagger/parser/NER
+    guess_spacy = get_doc(guess, PROFILE_VECTORS)
+    title_spacy = get_doc(title, PROFILE_VECTORS)
     title_sim = guess_spacy.similarity(title_spacy)
 
+    vector = np.array(guess_spacy.vector, dtype=np.float32)
+    return GuessEntry(vector, float(np.linalg.norm(vector)), title_sim)
+
+def get_title_blacklist(keys, title: str):
+    """
+    get_title_blacklist returns a mask of the keys that appear in title, which a guess never fully unscrambles unless it wins.
+    """
+    return np.fromiter((key in title for key in keys), dtype=np.bool_, count=len(keys))
+
+def get_reveal_masks(sims, title_sim, blacklist):
+    """
+    get_reveal_masks returns the (full, partial) unscramble masks for word similarities sims, given the guess's title similarity.
+
+    Works on one guess (sims of shape (keys,), a float title_sim) or on a batch (sims of shape (guesses, keys),
+    title_sim of shape (guesses,), blacklist of either shape).
+    """
+    global FULL_THRESH, FULL_MULTIPLIER, PARTIAL_THRESH, PARTIAL_MULTIPLIER, WIN_THRESH
+
+    title_sim = np.asarray(title_sim, dtype=np.float32)[..., np.newaxis]
     thresh_full = FULL_THRESH - title_sim*FULL_MULTIPLIER
     thresh_partial = PARTIAL_THRESH - title_sim*PARTIAL_MULTIPLIER
+    if title_sim.ndim == 1: # Single guess
+        print("thresh_full: " + str(thresh_full.item()) + ", thresh_partial: " + str(thresh_partial.item()))
 
-    win = title_sim > WIN_THRESH # Check if player has won
-
-    print("thresh_full: " + str(thresh_full) + ", thresh_partial: " + str(thresh_partial))
+    win = title_sim > WIN_THRESH # Winning unscrambles everything
+    full = win | ((sims >= thresh_full) & ~blacklist) # Skip full unscramble if the key is in the title unless win
+    partial = ~full & (sims >= thresh_partial)
+    return full, partial
 
-    for key in game_state:
-        key_spacy = nlp(key)
-        sim = guess_spacy.similarity(key_spacy)
+##### BATCH SCORING #####
+def score_guesses(guesses, titles, keys=None, article_id=None, batch_size: int = nlp_models.DEFAULT_BATCH_SIZE, n_process: int = 1):
+    """
+    score_guesses scores many guesses at once, the way guess_update would, without touching any game state.
 
-        blacklist = key in title # Skip full unscramble if the key is in the title unless win
+    For UTIL use (replays, analytics, backfills), NOT USER.
 
-        if win or (sim >= thresh_full and not blacklist):
-            print("Full Unscrambling " + key)
-            game_state[key] = key
+    titles is either one title for every guess or a list with one title per guess. Every distinct text is parsed
+    once, in batches of batch_size through nlp.pipe with n_process processes.
 
-        elif sim >= thresh_partial:
-            print("Partial Unscrambling " + key)
-            targets = random.sample(range(len(key)), int(len(key)/2))
-            for i in targets:
-                game_state[key] = game_state[key][:i] + key[i] + game_state[key][i+1:]
-    
-    # If the user has won, set the similarity score to 1.0
-    if win:
-        return 1.0
-    
-    # If the user has not won, return the similarity score
-    return title_sim
-    
\ No newline at end of file
+    Returns (similarities, full, partial). similarities holds guess_update's return value for each guess.
+    With keys (an article's vocabulary, cached under article_id when given) full and partial are
+    (guesses x keys) masks of the keys each guess would fully and partially unscramble; without keys they are None.
+    """
+    guesses = list(guesses)
+    titles = [titles] * len(guesses) if isinstance(titles, str) else list(titles)
+    if len(titles) != len(guesses):
+        raise ValueError("Expected one title per guess, got " + str(len(titles)) + " titles for " + str(len(guesses)) + " guesses")
+
+    # Parse every distinct text once; similarity only needs word vectors
+    texts = list(dict.fromkeys(guesses + titles))
+    text_ids = {text: i for i, text in enumerate(texts)}
+    width = nlp_models.get_nlp().vocab.vectors_length
+    vectors = np.zeros((len(texts), width), dtype=np.float32)
+    orths = []
+    for i, doc in enumerate(nlp_models.pipe_docs(texts, PROFILE_VECTORS, batch_size, n_process)):
+        if len(doc):
+            vectors[i] = doc.vector
+        orths.append(tuple(token.orth for token in doc))
+
+    norms = np.linalg.norm(vectors, axis=1)
+    unit = np.divide(vectors, norms[:, np.newaxis], out=np.zeros_like(vectors), where=norms[:, np.newaxis] > 0)
+
+    # Same rules as spaCy's Doc.similarity: identical tokens score 1, a doc without a vector scores 0
+    guess_ids = np.fromiter((text_ids[guess] for guess in guesses), dtype=np.intp, count=len(guesses))
+    title_ids = np.fromiter((text_ids[title] for title in titles), dtype=np.intp, count=len(titles))
+    title_sims = np.einsum("ij,ij->i", unit[guess_ids], unit[title_ids])
+    same = np.fromiter((orths[g] == orths[t] for g, t in zip(guess_ids.tolist(), title_ids.tolist())), dtype=np.bool_, count=len(guesses))
+    title_sims[same] = 1.0
+
+    win = title_sims > WIN_THRESH
+    similarities = np.where(win, np.float32(1.0), title_sims)
+    if keys is None:
+        return similarities, None, None
+
+    keys = list(keys)
+    vocab = get_vocab(dict.fromkeys(keys), article_id)
+    key_vectors = vocab.vectors if vocab.keys == keys else vocab.vectors[vocab.rows(keys)]
+    sims = unit[guess_ids] @ key_vectors.T
+    key_ids = {key: i for i, key in enumerate(keys)}
+    for row, guess in enumerate(guesses):
+        if guess in key_ids:
+            sims[row, key_ids[guess]] = 1.0 # spaCy treats identical text as a perfect match, even without a vector
+
+    blacklists = {title: get_title_blacklist(keys, title) for title in dict.fromkeys(titles)}
+    blacklist = np.stack([blacklists[title] for title in titles]) if titles else np.zeros((0, len(keys)), dtype=np.bool_)
+    full, partial = get_reveal_masks(sims, title_sims, blacklist)
+    return similarities, full, partial
@@ -10,9 +10,14 @@ from rest_framework.response import Response
 # from rest_framework import status
 # from allauth.account.decorators import login_required
 from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.http import condition
 from django.middleware.csrf import get_token
 from django.http import JsonResponse
+from game.daily_article_cache import get_cached_daily_article
 from . import utils
+from .game_context import load_game_version
+from .json_render import JSONResponse
+import hashlib
 # IMPORT MODEL FROM DATABASE (IF NEEDED)
 # IMPORT SERIALIZER FROM DATABASE OR API (IF NEEDED)
 
@@ -51,6 +56,34 @@ def example_view(request):
 
     return Response(response_data)
 
+def game_etag(request):
+    """
+    game_etag returns the ETag of a game read endpoint's response for the requesting user.
+
+    It only depends on the game's version (see load_game_version), today's article and the requested URL, so a
+    matching If-None-Match is answered with 304 before the game is loaded, scrambled or scored.
+    Returns None (no conditional handling) for anonymous users and users without a game.
+    """
+    if not request.user.is_authenticated:
+        return None
+
+    return make_game_etag(request, load_game_version(request.user.id), get_cached_daily_article())
+
+def make_game_etag(request, version, daily):
+    """
+    make_game_etag returns the ETag of request's response for the game version (None if the user has no game)
+    and today's CachedDailyArticle.
+
+    For UTIL use, shared with the async views.
+    """
+    if version is None:
+        return None     # The response creates a game
+
+    game_id, article_id, updated_at, guess_count = version
+    parts = [request.path, request.META.get("QUERY_STRING", ""), game_id, article_id, updated_at.isoformat(),
+             guess_count, daily.article.pk if daily is not None else ""]
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+
 ### API PATHS ###
 @api_view(['GET'])
 def get_user_info(request):
@@ -87,6 +120,7 @@ def get_user_info(request):
     return JsonResponse(user_info)
 
 @api_view(['GET'])
+@condition(etag_func=game_etag)
 def get_scrambled_article(request):
     """
     get_scrambled_article(request)
@@ -106,7 +140,9 @@ def get_scrambled_article(request):
                 "caption1" : <caption 1 - if image url>,
                 ...
             }
-        }
+        },
+        "state" : <state token>,
+        "template" : [<text or vocabulary index>, ...] # only with ?template=1
     }
     """
     user = request.user  # Access the authenticated user
@@ -127,10 +163,40 @@ def get_scrambled_article(request):
 
     print("get_scrambled_article request for user: " + str(user.id))
     
-    return JsonResponse(utils.get_user_article(user.id))
+    template = request.GET.get('template') in ('1', 'true')
+    return JSONResponse(utils.get_user_article(user.id, template=template))
+
+
+@api_view(['GET'])
+def get_article_delta(request):
+    """
+    get_article_delta(request)
+
+    This function responds with the words of the scrambled article that changed since the state token in ?since=,
+    or with the whole article and its template if they cannot be given as a delta
+
+    JSON Format:
+    response_data = {
+        "request" : "get_article_delta",
+        "state" : <state token>,
+        "full" : <bool>,
+        "revealed" : [[<vocabulary index>, <word>], ...],    # if not full
+        "article" : { <as in get_scrambled_article> },      # if full
+        "template" : [<text or vocabulary index>, ...]      # if full
+    }
+    """
+    user = request.user  # Access the authenticated user
+
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    print("get_article_delta request for user: " + str(user.id))
+
+    return JSONResponse(utils.get_article_delta(user.id, request.GET.get('since')))
 
 
 @api_view(['GET'])
+@condition(etag_func=game_etag)
 def get_guess_scoreboard(request):
     """
     get_guess_scoreboard(request)
@@ -154,7 +220,7 @@ def get_guess_scoreboard(request):
 
     print("get_guess_scoreboard request for user: " + str(user.id))
 
-    return JsonResponse(utils.get_user_scores(user.id))
+    return JSONResponse(utils.get_user_scores(user.id))
 
 
 @api_view(['GET'])
@@ -200,16 +266,31 @@ def process_guess(request):
     This function processes a guess given a user's session token and a guess
 
     request must contain field "token" and "guess"
+
+    If the request also sets "snapshot", the response carries the updated game under "snapshot"
+    (same format as get_game_snapshot), so the client does not have to fetch it again.
+
+    The response carries the article words the guess changed under "delta" (same format as get_article_delta).
+    Set "since" to a state token to get every change since that version instead.
     """
     if not request.user.is_authenticated:
         return JsonResponse({"error": "Unauthorized"}, status=401)
 
+    user = request.user  # Access the authenticated user
+    context = None
+    delta = None
+
     # Read guess parameter from post
     guess = request.data.get('guess')
     if guess:
-        user = request.user  # Access the authenticated user
         print("Received guess: " + guess + " for user: " + str(user.id))
-        utils.process_guess(user.id, guess)
+        context = utils.load_game_context(user.id)
+        since = request.data.get('since')
+        if since is None and context.game_state is not None:
+            since = utils.get_state_token(context)  # Version before this guess
+        utils.process_guess(user.id, guess, context)
+        if context.game_state is not None:
+            delta = utils.get_article_delta(user.id, since, context)
     else:
         print("Unable to parse guess")
 
@@ -218,10 +299,17 @@ def process_guess(request):
         "request": "process_guess",
         "guess" : guess
     }
+    if delta is not None:
+        response_data["delta"] = delta
 
-    return Response(response_data)
+    # Reuse the game loaded for the guess to return the new state
+    if request.data.get('snapshot'):
+        response_data["snapshot"] = utils.get_game_snapshot(user.id, context)
+
+    return JSONResponse(response_data)
 
 @api_view(['GET'])
+@condition(etag_func=game_etag)
 def get_game_over(request):
     """
     get_game_over(request)
@@ -236,4 +324,31 @@ def get_game_over(request):
 
     print("get_game_over request for user: " + str(user.id))
 
-    return JsonResponse(utils.get_game_over(user.id))
+    return JSONResponse(utils.get_game_over(user.id))
+
+
+@api_view(['GET'])
+def get_game_snapshot(request):
+    """
+    get_game_snapshot(request)
+
+    This function returns the user's scrambled article, guess scores and game over status in one response
+
+    JSON Format:
+    response_data = {
+        "request" : "get_game_snapshot",
+        "article" : { <as in get_scrambled_article> },
+        "scores" : { <as in get_guess_scoreboard> },
+        "game_over" : <bool>,
+        "score" : <final_score>,
+        "title" : <title>
+    }
+    """
+    user = request.user  # Access the authenticated user
+
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    print("get_game_snapshot request for user: " + str(user.id))
+
+    return JSONResponse(utils.get_game_snapshot(user.id))
@@ -0,0 +1,105 @@
+"""
+vocab.py
+
+This module contains the per-article vocabulary embedding matrix used to score guesses.
+
+Every key of an article's word mapping gets one unit-normalized row, so scoring a guess
+against the whole vocabulary is a single matrix-vector product instead of one spaCy call per key.
+"""
+
+import numpy as np
+from api.article_cache import PerArticleCache
+
+MAX_CACHED_ARTICLES = 2     # Number of article vocabularies kept in memory (today's and the one being rolled over)
+
+
+class VocabMatrix:
+    """
+    VocabMatrix holds the unit-normalized word vectors of an article's vocabulary.
+
+    Row i of vectors belongs to keys[i], and index maps a key back to its row.
+    Keys without a vector keep an all-zero row so they always score 0, matching spaCy's Doc.similarity.
+    """
+
+    def __init__(self, keys, vectors):
+        self.keys = list(keys)
+        self.index = {key: row for row, key in enumerate(self.keys)}
+
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(self.keys):
+            raise ValueError("Expected one vector per key, got shape " + str(vectors.shape))
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+        self.vectors = np.ascontiguousarray(unit)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def covers(self, keys):
+        """
+        covers returns whether every key in keys has a row in the matrix.
+        """
+        return all(key in self.index for key in keys)
+
+    def rows(self, keys):
+        """
+        rows returns the row indices of keys as an integer array, in the order given.
+        """
+        return np.fromiter((self.index[key] for key in keys), dtype=np.intp)
+
+    def similarities(self, vector, norm=None):
+        """
+        similarities returns the cosine similarity of vector against every row, in key order.
+
+        Pass norm when the vector's norm is already known. A zero vector (e.g. an out-of-vocabulary guess)
+        scores 0 against everything.
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        if norm is None:
+            norm = np.linalg.norm(vector)
+        if norm == 0:
+            return np.zeros(len(self.keys), dtype=np.float32)
+        return self.vectors @ (vector / norm)
+
+
+def build_vocab_matrix(keys, vectorize, width: int = 0, batched: bool = False):
+    """
+    build_vocab_matrix builds a VocabMatrix from keys, calling vectorize(key) once per key.
+
+    With batched, vectorize is called once with the list of keys and returns one row per key instead
+    (e.g. NLPClient.vectorize, one round trip to the NLP service). width is only used to shape the matrix
+    when keys is empty.
+    """
+    keys = list(keys)
+    if not keys:
+        return VocabMatrix([], np.zeros((0, width), dtype=np.float32))
+
+    if batched:
+        vectors = np.asarray(vectorize(keys), dtype=np.float32)
+    else:
+        vectors = np.stack([np.asarray(vectorize(key), dtype=np.float32) for key in keys])
+    return VocabMatrix(keys, vectors)
+
+
+_cache = PerArticleCache(MAX_CACHED_ARTICLES)
+
+
+def get_article_vocab(article_id, keys, vectorize, width: int = 0, batched: bool = False):
+    """
+    get_article_vocab returns the VocabMatrix for article_id, building it from keys on first use.
+
+    Only the most recent MAX_CACHED_ARTICLES articles are kept, so rolling over to a new daily
+    article evicts the old matrices on its own.
+    """
+    return _cache.get_or_build(article_id, lambda: build_vocab_matrix(keys, vectorize, width, batched))
+
+
+def clear_vocab_cache():
+    """
+    clear_vocab_cache drops every cached article vocabulary.
+    """
+    _cache.clear()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -121,6 +122,32 @@ DATABASES = {
     }
 }
 
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Hot game data (daily article, articles, leaderboards, profile summaries) goes through Django's cache
+# (see game/cache_service.py). CACHE_BACKEND picks where it lives:
+#   "locmem" - per process, the default
+#   "file"   - a directory shared by every worker on the machine (CACHE_LOCATION, default BASE_DIR/.cache)
+#   "redis"  - a Redis-compatible server shared by every worker (CACHE_LOCATION, default redis://127.0.0.1:6379/1),
+#              needs the redis package (pip install redis)
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "wikipedle"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".cache")),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND][0],
+        "LOCATION": os.environ.get("CACHE_LOCATION", CACHE_BACKENDS[CACHE_BACKEND][1]),
+        "TIMEOUT": 300,
+        "KEY_PREFIX": "wikipedle",
+    }
+}
+
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 # Password validation
@@ -163,3 +190,69 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# spaCy model and the pipeline components each NLP profile runs (see api/nlp_models.py)
+NLP_MODEL = "en_core_web_lg"  # python -m spacy download en_core_web_lg
+# Load the model when wsgi.py is imported instead of on first use, for servers that fork after loading the app
+NLP_PRELOAD = os.environ.get("NLP_PRELOAD", "") == "1"
+NLP_PROFILES = {
+    "vectors": [],
+    "tagger": ["tok2vec", "tagger", "attribute_ruler"],
+    "full": None,
+}
+
+# How per-user game progress is stored (see api/utils.py create_game):
+#   "seeded"  - a seed plus one bit per vocabulary character, the scramble is re-derived from (article, user, seed)
+#   "mapping" - the full scrambled word_mapping as JSON
+GAME_STATE_STORAGE = "seeded"
+
+# Unix socket of the NLP worker (python manage.py run_nlp_worker, see api/nlp_service.py). When set, web workers
+# send their scoring, vectorizing and tokenizing to it instead of loading the spaCy model themselves.
+NLP_SERVICE_ADDRESS = os.environ.get("NLP_SERVICE_ADDRESS") or None
+NLP_SERVICE_TIMEOUT = 30
+
+# Serve the game endpoints with the async views (see api/async_views.py), for running under ASGI
+ASYNC_GAME_VIEWS = os.environ.get("ASYNC_GAME_VIEWS", "") == "1"
+# Worker processes the async views score guesses in, each with its own spaCy model (0 scores on a thread instead)
+NLP_POOL_WORKERS = int(os.environ.get("NLP_POOL_WORKERS", "2"))
+
+# HTTP client of the Wikipedia services (see game/http_client.py): (connect, read) timeout in seconds, retries of
+# failed connections and 429/5xx answers with exponential backoff, and pooled connections per host
+WIKIPEDIA_USER_AGENT = "Wikipedle/1.0"
+WIKIPEDIA_HTTP_TIMEOUT = (5, 30)
+WIKIPEDIA_HTTP_RETRIES = 3
+WIKIPEDIA_HTTP_BACKOFF = 0.5
+WIKIPEDIA_HTTP_POOL_SIZE = 16
+
+# On-disk cache of Wikipedia API responses (see game/http_cache.py), off unless a directory is given: seconds an
+# entry is kept, bytes before the least recently used entries are dropped, and mode, "cache", "record" (random
+# listings too) or "replay" (cache only, never the network; for offline tests and CI)
+WIKIPEDIA_HTTP_CACHE_DIR = os.environ.get("WIKIPEDIA_HTTP_CACHE_DIR") or None
+WIKIPEDIA_HTTP_CACHE_TTL = 60 * 60 * 24 * 7
+WIKIPEDIA_HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+WIKIPEDIA_HTTP_CACHE_MODE = os.environ.get("WIKIPEDIA_HTTP_CACHE_MODE", "cache")
+
+# Concurrent article ingestion (fetch_wikipedia_articles --workers, see game/ingest_pipeline.py): threads per
+# network stage, and how many items a stage can get ahead of the next one
+WIKIPEDIA_INGEST_WORKERS = 8
+WIKIPEDIA_INGEST_QUEUE_SIZE = 32
+
+# Asyncio article fetching (fetch_wikipedia_articles --async, see game/async_wikipedia_service.py): requests in
+# flight at once, and requests started per second to one host (0 for no limit)
+WIKIPEDIA_ASYNC_CONCURRENCY = 32
+WIKIPEDIA_RATE_LIMIT = 50
+
+# Coalesce guesses scored at the same moment by different threads into one spaCy call and one matrix
+# multiplication (see api/scoring_queue.py): a guess waits at most SCORING_BATCH_WAIT seconds for others to
+# join its batch, of at most SCORING_BATCH_SIZE guesses. 0 (the default) scores every guess inline; set it
+# (e.g. 0.002) only for threaded web processes, as the NLP worker batches on its own and pool workers score alone.
+SCORING_BATCH_WAIT = float(os.environ.get("SCORING_BATCH_WAIT", "0"))
+SCORING_BATCH_SIZE = 64
+
+# Bounds of the per-process cache of scored guesses, shared by every user (see api/guess_cache.py)
+GUESS_CACHE_MAX_ENTRIES = 10000
+GUESS_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Seconds a process trusts its cached daily article before reading it again (see game/daily_article_cache.py).
+# Changes made in the same process are picked up immediately.
+DAILY_ARTICLE_CACHE_TTL = 300
@@ -1,5 +1,6 @@
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
+from django.views.decorators.http import condition
 from django.middleware.csrf import get_token
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, login
@@ -7,25 +8,19 @@ from django.utils import timezone
 from django.contrib.auth import logout
 
 from game.models import UserProfile
+from game import cache_service
+import hashlib
 import json
 
-def profile_view(request):
-        if request.method == 'GET':
-            if not request.user.is_authenticated:
-                return JsonResponse({"error": "Unauthorized"}, status=401)
-
-        user = request.user
-        print("profile_view request for user: " + str(user.id))
-        print(user.__dict__)
-        # Log the session ID
-        session_id = request.COOKIES.get('sessionid')
-        print("Session ID:", session_id)  # This will print to the console or log file
+def get_profile_summary(user):
+    """Profile fields shown by profile_view, read through the shared cache (see game/cache_service.py)"""
+    def build():
         profile = user.profile
         win_rate = 0
         if profile.total_games_played > 0:
             win_rate = (profile.total_wins / profile.total_games_played) * 100
 
-        return JsonResponse({
+        return {
             "username": user.username,
             "email": user.email,
             "total_games_played": profile.total_games_played,
@@ -36,9 +31,37 @@ def profile_view(request):
             "average_score": profile.average_score,
             "best_score": profile.best_score,
             "last_played": profile.last_played_date.isoformat() if profile.last_played_date else None,
-            "is_authenticated": True,
-            
-        }, status=200)  
+        }
+
+    return cache_service.get_or_set(
+        cache_service.profile_summary_key(user.id), build, cache_service.PROFILE_SUMMARY_TIMEOUT
+    )
+
+def profile_etag(request):
+    """ETag of profile_view's response, from the user's account fields and profile updated_at (None for anonymous users)"""
+    user = request.user
+    if not user.is_authenticated:
+        return None
+
+    updated_at = UserProfile.objects.filter(user_id=user.id).values_list("updated_at", flat=True).first()
+    parts = [user.id, user.username, user.email, updated_at.isoformat() if updated_at else ""]
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:32]
+
+@condition(etag_func=profile_etag)
+def profile_view(request):
+        if request.method == 'GET':
+            if not request.user.is_authenticated:
+                return JsonResponse({"error": "Unauthorized"}, status=401)
+
+        user = request.user
+        print("profile_view request for user: " + str(user.id))
+        print(user.__dict__)
+        # Log the session ID
+        session_id = request.COOKIES.get('sessionid')
+        print("Session ID:", session_id)  # This will print to the console or log file
+        summary = dict(get_profile_summary(user))
+        summary["is_authenticated"] = True
+        return JsonResponse(summary, status=200)  
         
         return JsonResponse({"error": "Invalid request method"}, status=400)
 
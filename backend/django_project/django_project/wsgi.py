@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "django_project.settings")
 
 application = get_wsgi_application()
+
+# Load the spaCy model before the server forks its workers (e.g. gunicorn --preload), so they share it
+from django.conf import settings  # noqa: E402
+
+if settings.NLP_PRELOAD:
+    from api.nlp_models import preload  # noqa: E402
+
+    preload()
@@ -3,6 +3,8 @@ from datetime import timedelta
 import logging
 import random
 from .models import ArticleCache, DailyArticle
+from .daily_article_cache import invalidate_daily_article
+from . import cache_service
 
 logger = logging.getLogger(__name__)
 
@@ -24,11 +26,14 @@ class ArticleService:
         Returns:
             ArticleCache or None: The cached article if found
         """
-        try:
-            return ArticleCache.objects.get(article_id=article_id)
-        except ArticleCache.DoesNotExist:
+        article = cache_service.get_or_set(
+            cache_service.article_key(article_id),
+            lambda: ArticleCache.objects.filter(article_id=article_id).first(),
+            cache_service.ARTICLE_TIMEOUT,
+        )
+        if article is None:
             logger.info(f"Article {article_id} not found in cache")
-            return None
+        return article
 
     @staticmethod
     def cache_article(article_id, title, content, image_urls=None):
@@ -118,6 +123,7 @@ class ArticleService:
         daily_article, created = DailyArticle.objects.update_or_create(
             date=date, defaults={"article": article}
         )
+        invalidate_daily_article(date)  # Game endpoints pick up the new article on their next request
 
         if created:
             logger.info(f"Set new daily article for {date}: {article.title}")
@@ -0,0 +1,297 @@
+"""
+async_wikipedia_service.py
+
+This module contains AsyncWikipediaService, an asyncio version of NewWikipediaService for large backfills
+(fetch_wikipedia_articles --async): one process keeps hundreds of API requests in flight without threads.
+
+It uses aiohttp for HTTP. Requests are bounded by a concurrency semaphore and spaced by a per-host rate limiter, and are retried on failed connections and 429/5xx answers like the
+sync services' (see http_client.py), through the same on-disk response cache (see http_cache.py). Articles
+are stored through the ORM on Django's sync thread.
+"""
+
+import asyncio
+import json
+import logging
+import math
+from urllib.parse import urlparse
+
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from . import http_cache, http_client
+from .article_service import ArticleService
+from .mediawiki_batch import MAX_IMAGES, is_content_image
+from .models import ArticleCache
+from .new_wikipedia_service import NewWikipediaService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 32        # Requests in flight at once
+DEFAULT_RATE_LIMIT = 50         # Requests started per second and host, 0 for no limit
+RANDOM_BATCH = 20               # Most random ids the API lists per request
+
+
+class RateLimiter:
+    """
+    RateLimiter spaces the requests to one host at least 1/rate seconds apart.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate else 0
+        self._next = 0
+
+    async def wait(self):
+        """
+        wait returns once the caller may start its request.
+        """
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next)
+        self._next = start + self.interval     # Claim a slot before sleeping, so callers are spaced out
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class AsyncWikipediaService:
+    """
+    Asyncio Wikipedia service, with the get_random_articles / get_article_content /
+    fetch_and_cache_random_articles interface of NewWikipediaService.
+
+    Use it as an async context manager, which opens and closes its HTTP session:
+
+        async with AsyncWikipediaService(concurrency=64) as service:
+            articles = await service.fetch_and_cache_random_articles(1000)
+    """
+
+    BASE_API_URL = NewWikipediaService.BASE_API_URL
+
+    def __init__(self, concurrency: int = None, rate_limit: float = None):
+        self.concurrency = concurrency or getattr(settings, "WIKIPEDIA_ASYNC_CONCURRENCY", DEFAULT_CONCURRENCY)
+        self.rate_limit = rate_limit if rate_limit is not None else getattr(settings, "WIKIPEDIA_RATE_LIMIT", DEFAULT_RATE_LIMIT)
+        self.retries = getattr(settings, "WIKIPEDIA_HTTP_RETRIES", http_client.DEFAULT_RETRIES)
+        self.backoff = getattr(settings, "WIKIPEDIA_HTTP_BACKOFF", http_client.DEFAULT_BACKOFF)
+        self.requests = 0
+        self._semaphore = None
+        self._limiters = {}
+        self._session = None
+
+    async def __aenter__(self):
+        connect, read = http_client.get_timeout()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = aiohttp.ClientSession(
+            headers={"User-Agent": http_client.get_user_agent()},
+            timeout=aiohttp.ClientTimeout(sock_connect=connect, sock_read=read),
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        self._session = None
+
+    def _get_limiter(self, url):
+        host = urlparse(url).netloc
+        if host not in self._limiters:
+            self._limiters[host] = RateLimiter(self.rate_limit)
+        return self._limiters[host]
+
+    async def get_json(self, params):
+        """
+        Send one API request and return its JSON, retrying failed connections and 429/5xx answers.
+
+        Args:
+            params (dict): Query parameters
+
+        Returns:
+            dict: The decoded response
+        """
+        # Cache file I/O (and the directory walk of an eviction) runs on a thread, off the event loop
+        cached = await asyncio.to_thread(http_cache.lookup, self.BASE_API_URL, params)
+        if cached is not None:
+            return json.loads(cached[2])
+
+        limiter = self._get_limiter(self.BASE_API_URL)
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt
+            try:
+                async with self._semaphore:
+                    await limiter.wait()
+                    self.requests += 1
+                    async with self._session.get(self.BASE_API_URL, params=params) as response:
+                        if response.status not in http_client.RETRY_STATUSES or attempt == self.retries:
+                            response.raise_for_status()
+                            body = await response.read()
+                            await asyncio.to_thread(http_cache.store, self.BASE_API_URL, params, response.status,
+                                                    dict(response.headers), body)
+                            return json.loads(body)
+                        retry_after = response.headers.get("Retry-After", "")
+                        if retry_after.isdigit():
+                            delay = int(retry_after)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+
+            # Back off outside the semaphore, so other requests keep going
+            await asyncio.sleep(delay)
+
+    async def get_random_articles(self, count=1):
+        """
+        Fetch random articles from Wikipedia API.
+
+        Args:
+            count (int): Number of random articles to fetch
+
+        Returns:
+            list: List of article data dictionaries
+        """
+        params = {
+            "action": "query",
+            "format": "json",
+            "list": "random",
+            "rnlimit": min(count * 2, RANDOM_BATCH),  # Double the requested count, up to API limit
+            "rnnamespace": 0,
+        }
+
+        try:
+            data = await self.get_json(params)
+        except Exception as e:
+            logger.error(f"Error fetching random articles from Wikipedia: {e}")
+            return []
+
+        if "query" in data and "random" in data["query"]:
+            return data["query"]["random"]
+        logger.error(f"Unexpected response format from Wikipedia API: {data}")
+        return []
+
+    async def get_article_content(self, pageid):
+        """
+        Fetch an article's title, categories, plain text and images in two API requests.
+
+        Args:
+            pageid (int): Wikipedia page ID
+
+        Returns:
+            dict: Article data in the format of NewWikipediaService.get_article_content
+        """
+        params = {
+            "action": "query",
+            "format": "json",
+            "pageids": pageid,
+            "prop": "info|categories|extracts|images",
+            "inprop": "url|displaytitle",
+            "cllimit": 50,
+            "imlimit": 20,
+            "explaintext": 1,
+            "exsectionformat": "plain"
+        }
+
+        try:
+            data = await self.get_json(params)
+            page_data = data.get("query", {}).get("pages", {}).get(str(pageid))
+            if page_data is None or "missing" in page_data:
+                logger.error(f"Error getting page extract: {data}")
+                return None
+
+            content = page_data.get("extract", "")
+            image_titles = [image["title"] for image in page_data.get("images", []) if is_content_image(image["title"])]
+            return {
+                "pageid": str(pageid),
+                "title": page_data["title"],
+                "content": content,
+                "images": await self._get_image_urls(image_titles[:MAX_IMAGES]),
+                "is_stub": NewWikipediaService._is_article_stub(page_data, content)
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting article content: {e}")
+            return None
+
+    async def _get_image_urls(self, image_titles):
+        """
+        Get the URLs of image_titles, in one API request.
+        """
+        if not image_titles:
+            return []
+
+        params = {
+            "action": "query",
+            "format": "json",
+            "titles": "|".join(image_titles),
+            "prop": "imageinfo",
+            "iiprop": "url"
+        }
+
+        try:
+            data = await self.get_json(params)
+        except Exception as e:
+            logger.error(f"Error getting images: {e}")
+            return []
+
+        image_urls = []
+        for page_data in data.get("query", {}).get("pages", {}).values():
+            if page_data.get("imageinfo"):
+                image_urls.append(page_data["imageinfo"][0]["url"])
+        return image_urls
+
+    async def fetch_and_cache_random_articles(self, count=5):
+        """
+        Fetch random articles concurrently and cache them in the database.
+        Filters out stub articles and skips articles that are already cached.
+
+        Args:
+            count (int): Number of articles to fetch and cache
+
+        Returns:
+            list: List of cached ArticleCache objects
+        """
+        cached_articles = []
+        seen = set()
+        candidates_left = count * 4     # Bounds the work when many candidates are stubs
+
+        while len(cached_articles) < count and candidates_left > 0:
+            # List about twice as many candidates as still needed, all listing requests at once
+            wanted = min((count - len(cached_articles)) * 2, candidates_left)
+            listings = await asyncio.gather(*(
+                self.get_random_articles(RANDOM_BATCH // 2) for _ in range(math.ceil(wanted / RANDOM_BATCH))
+            ))
+            pageids = [str(article["id"]) for listing in listings for article in listing]
+            pageids = [pageid for pageid in dict.fromkeys(pageids) if pageid not in seen][:candidates_left]
+            if not pageids:
+                break
+            seen.update(pageids)
+            candidates_left -= len(pageids)
+
+            known = await sync_to_async(set)(ArticleCache.objects.filter(article_id__in=pageids).values_list("article_id", flat=True))
+            results = await asyncio.gather(*(self.get_article_content(pageid) for pageid in pageids if pageid not in known))
+
+            for article_data in results:
+                if len(cached_articles) >= count:
+                    break
+                if not article_data:
+                    continue
+                if article_data.get("is_stub", False):
+                    logger.info(f"Skipping stub article: {article_data['title']}")
+                    continue
+
+                cached = await sync_to_async(ArticleService.cache_article)(
+                    article_id=article_data["pageid"],
+                    title=article_data["title"],
+                    content=article_data["content"],
+                    image_urls=article_data["images"]
+                )
+                cached_articles.append(cached)
+                logger.info(f"Cached article {len(cached_articles)}/{count}: {article_data['title']}")
+
+        return cached_articles
+
+
+def fetch_and_cache_random_articles(count=5, concurrency=None):
+    """
+    Run AsyncWikipediaService.fetch_and_cache_random_articles from sync code (e.g. a management command).
+    """
+    async def run():
+        async with AsyncWikipediaService(concurrency=concurrency) as service:
+            return await service.fetch_and_cache_random_articles(count)
+
+    return asyncio.run(run())
@@ -0,0 +1,90 @@
+"""
+cache_service.py
+
+This module contains the shared cache layer for hot game data, on top of Django's cache API.
+
+Which backend holds the data (per-process memory, a shared directory or a Redis-compatible server) is
+configured by CACHES in settings; this module only knows the keys, the timeouts and how to invalidate.
+Every entry is also dropped explicitly when its source row changes (see the signals in models.py).
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_TIMEOUT = 60 * 60               # Articles are only updated by fetches
+LEADERBOARD_TIMEOUT = 60 * 10           # Leaderboards are rebuilt by update_leaderboard
+PROFILE_SUMMARY_TIMEOUT = 60 * 10       # Profiles change when a game is finished
+
+# Bump to drop every entry written by an older version of this module
+CACHE_VERSION = 2
+
+
+def get_cache():
+    """
+    get_cache returns the Django cache game data is stored in, GAME_CACHE_ALIAS in settings ("default" by default).
+    """
+    return caches[getattr(settings, "GAME_CACHE_ALIAS", "default")]
+
+
+def daily_article_key(date):
+    return f"game:daily:{date}"
+
+
+def article_key(article_id):
+    return f"game:article:{article_id}"
+
+
+def leaderboard_key(date):
+    return f"game:leaderboard:{date}"
+
+
+def profile_summary_key(user_id):
+    return f"game:profile:{user_id}"
+
+
+def get_cached(key):
+    """
+    get_cached returns the value cached under key, or None. Cache backend errors count as a miss.
+    """
+    try:
+        return get_cache().get(key, version=CACHE_VERSION)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+
+def set_cached(key, value, timeout):
+    """
+    set_cached caches value under key for timeout seconds. Cache backend errors are logged and ignored.
+    """
+    try:
+        get_cache().set(key, value, timeout, version=CACHE_VERSION)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+def delete_cached(*keys):
+    """
+    delete_cached drops the values cached under keys. Cache backend errors are logged and ignored.
+    """
+    try:
+        get_cache().delete_many(list(keys), version=CACHE_VERSION)
+    except Exception as e:
+        logger.warning(f"Cache delete failed for {keys}: {e}")
+
+
+def get_or_set(key, build, timeout):
+    """
+    get_or_set returns the value cached under key, calling build() and caching its result on a miss.
+
+    A None result is returned but not cached, so missing rows are looked up again next time.
+    """
+    value = get_cached(key)
+    if value is None:
+        value = build()
+        if value is not None:
+            set_cached(key, value, timeout)
+    return value
@@ -0,0 +1,133 @@
+"""
+daily_article_cache.py
+
+This module contains the process-level cache of each day's DailyArticle, so game endpoints do not
+query the database for data that only changes once a day.
+
+Entries are keyed by date and hold the article row plus any data derived from it. The row itself is
+read through the shared cache (see cache_service.py), so with a shared backend only one worker queries
+the database per DAILY_ARTICLE_CACHE_TTL. Entries are dropped explicitly when the day's article changes
+(ArticleService.set_daily_article and the DailyArticle / ArticleCache signals in models.py). Other
+processes only see such a change once their entry expires, at most DAILY_ARTICLE_CACHE_TTL seconds after
+the row was read from the database: the shared copy carries its read time, and entries built from it
+expire with it (with the per-process "locmem" backend the signals never reach the other processes' copies).
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from . import cache_service
+
+DEFAULT_TTL = 300           # Seconds before an entry is loaded again, for changes made by other processes
+MAX_CACHED_DATES = 2        # Number of days kept in memory (today's and the one being rolled over)
+
+
+class CachedDailyArticle:
+    """
+    CachedDailyArticle is one day's DailyArticle with its article, plus memoized derived data.
+    """
+
+    def __init__(self, daily_article):
+        self.date = daily_article.date
+        self.daily_article = daily_article
+        self.article = daily_article.article
+        self.title = self.article.title
+        self.loaded_at = time.monotonic()
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def derived(self, key, build):
+        """
+        derived returns the value stored under key, calling build() to create it on first use.
+
+        Use it for anything computed from the article (formatted output, truncated text, ...), so it is
+        computed once per day and dropped along with the entry.
+        """
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+
+        value = build()
+        with self._lock:
+            return self._derived.setdefault(key, value)
+
+
+_entries = {}
+_lock = threading.Lock()
+
+
+def get_ttl():
+    """
+    get_ttl returns how long an entry is trusted, from DAILY_ARTICLE_CACHE_TTL in settings.
+    """
+    return getattr(settings, "DAILY_ARTICLE_CACHE_TTL", DEFAULT_TTL)
+
+
+def get_cached_daily_article(date=None):
+    """
+    get_cached_daily_article returns the CachedDailyArticle for date (today by default), or None if no article is set.
+
+    Only the first call after an invalidation or expiry reads the row, from the shared cache or the database;
+    a missing article is not cached, so setting one is picked up immediately.
+    """
+    # Import here to avoid circular imports
+    from .models import DailyArticle
+
+    if date is None:
+        date = timezone.now().date()
+
+    ttl = get_ttl()
+    with _lock:
+        entry = _entries.get(date)
+    if entry is not None and time.monotonic() - entry.loaded_at < ttl:
+        return entry
+
+    # The shared copy is (read time, row); one older than the TTL is read again like a missing one
+    key = cache_service.daily_article_key(date)
+    cached = cache_service.get_cached(key)
+    if cached is None or time.time() - cached[0] >= ttl:
+        daily_article = DailyArticle.objects.select_related("article").filter(date=date).first()
+        if daily_article is None:
+            invalidate_daily_article(date)
+            return None
+        cached = (time.time(), daily_article)
+        cache_service.set_cached(key, cached, ttl)
+
+    read_at, daily_article = cached
+    entry = CachedDailyArticle(daily_article)
+    entry.loaded_at -= max(0.0, time.time() - read_at)     # Expire along with the shared copy
+    with _lock:
+        _entries[date] = entry
+        for old_date in sorted(_entries)[:-MAX_CACHED_DATES]:
+            del _entries[old_date]
+    return entry
+
+
+def invalidate_daily_article(date=None):
+    """
+    invalidate_daily_article drops the cached entry for date, or every entry when date is None.
+    """
+    with _lock:
+        if date is None:
+            dates = set(_entries) | {timezone.now().date()}
+            _entries.clear()
+        else:
+            dates = {date}
+            _entries.pop(date, None)
+    cache_service.delete_cached(*[cache_service.daily_article_key(date) for date in dates])
+
+
+def invalidate_article(article_id):
+    """
+    invalidate_article drops every cached day whose article is article_id (the ArticleCache primary key).
+    """
+    with _lock:
+        dates = [date for date, entry in _entries.items() if entry.article.pk == article_id]
+        for date in dates:
+            del _entries[date]
+
+    # Other processes may hold days this one never loaded, today's is the one that matters
+    dates.append(timezone.now().date())
+    cache_service.delete_cached(*[cache_service.daily_article_key(date) for date in dates])
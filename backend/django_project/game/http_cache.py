@@ -0,0 +1,294 @@
+"""
+http_cache.py
+
+This module contains the on-disk cache of Wikipedia API responses, so re-running an ingest (or a test suite)
+does not fetch everything from the network again.
+
+Responses are stored under the sha256 of their normalized request: URL with its query parameters sorted,
+so the same request made with parameters in another order is the same entry. Entries expire after
+WIKIPEDIA_HTTP_CACHE_TTL seconds, and once the cache outgrows WIKIPEDIA_HTTP_CACHE_MAX_BYTES the least
+recently used entries are dropped. The cache is off unless WIKIPEDIA_HTTP_CACHE_DIR is set.
+
+WIKIPEDIA_HTTP_CACHE_MODE says what is cached:
+    "cache"  - every successful response except random article listings, which must stay random
+    "record" - every successful response, random listings included, to capture a replayable run
+    "replay" - nothing new: responses only come from the cache and a miss fails without touching
+               the network, for offline tests and CI
+MediaWiki errors (maxlag, ratelimited, ...) come back as 200s with an "error" key, and are never cached.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60 * 60 * 24 * 7             # Articles rarely change within a week
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+EVICT_TO = 0.9                              # Evicting frees space down to this fraction of the maximum
+
+MODE_CACHE = "cache"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+class CacheMiss(requests.exceptions.ConnectionError):
+    """
+    CacheMiss is raised in replay mode for a request that is not in the cache.
+    """
+
+
+def normalize_request(url, params=None):
+    """
+    normalize_request returns url with params merged into its query string and every parameter sorted.
+    """
+    if params:
+        url = requests.Request("GET", url, params=params).prepare().url
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+
+
+def cache_key(url, params=None):
+    """
+    cache_key returns the key a request is stored under, the sha256 of its normalized form.
+    """
+    return hashlib.sha256(normalize_request(url, params).encode()).hexdigest()
+
+
+def is_random_listing(url):
+    """
+    is_random_listing says whether a normalized request lists random articles.
+    """
+    return ("list", "random") in parse_qsl(urlsplit(url).query)
+
+
+class ResponseCache:
+    """
+    ResponseCache stores responses as files in directory, one per key, with TTL expiry and LRU eviction.
+
+    A file holds a JSON header line (status, headers, normalized URL) followed by the raw body. Its
+    modification time is when it was stored and its access time when it was last read.
+    """
+
+    def __init__(self, directory, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES, mode: str = MODE_CACHE):
+        self.directory = str(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def should_store(self, url):
+        """
+        should_store says whether a successful response to the normalized request url is cached in this mode.
+        """
+        return self.mode == MODE_RECORD or (self.mode == MODE_CACHE and not is_random_listing(url))
+
+    def get(self, url, params=None):
+        """
+        get returns the cached (status, headers, body) of a request, or None if it is missing or expired.
+        """
+        path = self._path(cache_key(url, params))
+        try:
+            stat = os.stat(path)
+            if self.ttl and self.mode != MODE_REPLAY and time.time() - stat.st_mtime > self.ttl:
+                self._remove(path)
+                self.misses += 1
+                return None
+            with open(path, "rb") as f:
+                header, body = f.read().split(b"\n", 1)
+            os.utime(path, (time.time(), stat.st_mtime))   # Mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        meta = json.loads(header)
+        return meta["status"], meta["headers"], body
+
+    def set(self, url, params, status, headers, body):
+        """
+        set stores a response, then evicts the least recently used entries if the cache is over its size.
+        """
+        normalized = normalize_request(url, params)
+        path = self._path(cache_key(normalized))
+        header = json.dumps({"url": normalized, "status": status, "headers": dict(headers)}).encode()
+        data = header + b"\n" + body
+
+        try:
+            old_size = os.path.getsize(path)   # Overwriting an entry only changes the size by the difference
+        except OSError:
+            old_size = 0
+
+        # Write to a temporary file first, so readers never see half an entry
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data) - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def clear(self):
+        """
+        clear removes every entry.
+        """
+        with self._lock:
+            for path, _, _ in self._entries():
+                self._remove(path)
+            self._size = 0
+
+    def _entries(self):
+        """
+        _entries returns (path, size, last access time) of every entry.
+        """
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue    # Removed by another process
+                entries.append((path, stat.st_size, stat.st_atime))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(size for _, size, _ in entries)
+        for path, entry_size, _ in entries:
+            if size <= self.max_bytes * EVICT_TO:
+                break
+            self._remove(path)
+            size -= entry_size
+        logger.info(f"HTTP cache evicted down to {size} bytes")
+        self._size = size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    get_response_cache returns the shared ResponseCache configured in settings, or None if caching is off.
+    """
+    global _cache
+    directory = getattr(settings, "WIKIPEDIA_HTTP_CACHE_DIR", None)
+    if not directory:
+        return None
+
+    config = (
+        str(directory),
+        getattr(settings, "WIKIPEDIA_HTTP_CACHE_TTL", DEFAULT_TTL),
+        getattr(settings, "WIKIPEDIA_HTTP_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES),
+        getattr(settings, "WIKIPEDIA_HTTP_CACHE_MODE", MODE_CACHE),
+    )
+    with _cache_lock:
+        if _cache is None or (_cache.directory, _cache.ttl, _cache.max_bytes, _cache.mode) != config:
+            _cache = ResponseCache(*config)
+        return _cache
+
+
+def lookup(url, params=None):
+    """
+    lookup returns the cached (status, headers, body) of a request, or None if it has to be sent.
+
+    Raises CacheMiss instead of returning None in replay mode.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return None
+
+    cached = cache.get(url, params)
+    if cached is None and cache.mode == MODE_REPLAY:
+        raise CacheMiss("Not in the HTTP cache (replay mode): " + normalize_request(url, params))
+    return cached
+
+
+def is_api_error(body):
+    """
+    is_api_error says whether body is a MediaWiki error payload, which the API sends with a 200 status.
+    """
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return False
+    return isinstance(data, dict) and "error" in data
+
+
+def store(url, params, status, headers, body):
+    """
+    store caches a response to a request, if it succeeded and the cache mode keeps such responses.
+    """
+    cache = get_response_cache()
+    if cache is None or status != 200 or not cache.should_store(normalize_request(url, params)):
+        return
+    if is_api_error(body):
+        return      # Usually transient (maxlag, ratelimited), must not be replayed for the whole TTL
+    try:
+        cache.set(url, params, status, headers, body)
+    except OSError as e:
+        logger.warning(f"Could not write to the HTTP cache: {e}")
+
+
+class CachingAdapter(HTTPAdapter):
+    """
+    CachingAdapter is an HTTPAdapter answering GET requests from the response cache when it can.
+    """
+
+    def send(self, request, **kwargs):
+        if request.method != "GET":
+            return super().send(request, **kwargs)
+
+        cached = lookup(request.url)
+        if cached is not None:
+            return self._build_cached_response(request, *cached)
+
+        response = super().send(request, **kwargs)
+        store(request.url, None, response.status_code, response.headers, response.content)
+        return response
+
+    @staticmethod
+    def _build_cached_response(request, status, headers, body):
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = "OK"
+        response.url = request.url
+        response.request = request
+        response._content = body
+        response.from_cache = True
+        return response
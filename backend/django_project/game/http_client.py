@@ -0,0 +1,102 @@
+"""
+http_client.py
+
+This module contains the shared HTTP client of the Wikipedia services.
+
+Every request goes through one pooled requests.Session, so connections (and their TLS handshakes) are
+reused across requests and threads. Requests time out instead of hanging, and failed connections and
+429/5xx answers are retried with exponential backoff, honouring the Retry-After header Wikipedia sends
+when rate limiting. Tuned by WIKIPEDIA_HTTP_* in settings. With WIKIPEDIA_HTTP_CACHE_DIR set, GET requests
+are answered from the on-disk response cache when they can be (see http_cache.py).
+"""
+
+import threading
+
+import requests
+from django.conf import settings
+from urllib3.util.retry import Retry
+
+from .http_cache import CachingAdapter
+
+DEFAULT_USER_AGENT = "Wikipedle/1.0"    # https://meta.wikimedia.org/wiki/User-Agent_policy
+DEFAULT_POOL_SIZE = 16                  # Connections kept open per host, at least the ingest worker count
+DEFAULT_TIMEOUT = (5, 30)               # Seconds to connect, and to wait for each read
+DEFAULT_RETRIES = 3                     # Retries of a failed request
+DEFAULT_BACKOFF = 0.5                   # Retries wait 0.5s, 1s, 2s, ... unless told otherwise by Retry-After
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_user_agent():
+    """
+    get_user_agent returns the User-Agent sent to Wikipedia, WIKIPEDIA_USER_AGENT in settings.
+    """
+    return getattr(settings, "WIKIPEDIA_USER_AGENT", DEFAULT_USER_AGENT)
+
+
+def get_timeout():
+    """
+    get_timeout returns the (connect, read) timeout of a request, WIKIPEDIA_HTTP_TIMEOUT in settings.
+    """
+    return getattr(settings, "WIKIPEDIA_HTTP_TIMEOUT", DEFAULT_TIMEOUT)
+
+
+def make_adapter():
+    """
+    make_adapter returns an HTTPAdapter with the configured pool size and retry policy, reading through the response cache.
+    """
+    retry = Retry(
+        total=getattr(settings, "WIKIPEDIA_HTTP_RETRIES", DEFAULT_RETRIES),
+        backoff_factor=getattr(settings, "WIKIPEDIA_HTTP_BACKOFF", DEFAULT_BACKOFF),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+        raise_on_status=False,      # Hand the last answer back, raise_for_status decides what to do with it
+    )
+    pool_size = getattr(settings, "WIKIPEDIA_HTTP_POOL_SIZE", DEFAULT_POOL_SIZE)
+    return CachingAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+
+def configure_session(session):
+    """
+    configure_session mounts the pooled, retrying adapter on session and sets the User-Agent. Returns session.
+    """
+    adapter = make_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = get_user_agent()
+    return session
+
+
+def get_session():
+    """
+    get_session returns the shared session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = configure_session(requests.Session())
+    return _session
+
+
+def reset_session():
+    """
+    reset_session closes the shared session. The next request opens a new one, e.g. after changing settings.
+    """
+    global _session
+    with _session_lock:
+        session, _session = _session, None
+    if session is not None:
+        session.close()
+
+
+def get(url, params=None, **kwargs):
+    """
+    get sends a GET request through the shared session, with the configured timeout unless one is given.
+    """
+    kwargs.setdefault("timeout", get_timeout())
+    return get_session().get(url, params=params, **kwargs)
@@ -0,0 +1,200 @@
+"""
+ingest_pipeline.py
+
+This module contains the concurrent article ingest pipeline, for filling the article cache with many new
+Wikipedia articles at once (see NewWikipediaService.ingest_random_articles).
+
+Each article goes through five stages, connected by bounded queues:
+    list    - one thread lists random page ids, skipping articles that are already cached
+    content - `workers` threads fetch each page's title, categories and text
+    stubs   - one thread drops stub articles
+    images  - `workers` threads resolve each article's image URLs
+    write   - the calling thread stores the articles, so the database is only used from one thread
+
+The network stages overlap, so ingesting runs about `workers` times faster than fetching articles one by
+one. Once enough articles are stored, listing stops and work still queued is dropped.
+"""
+
+import logging
+import queue
+import threading
+from collections import Counter
+
+from django.conf import settings
+from .article_service import ArticleService
+from .models import ArticleCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 8             # Threads per network stage (content and images)
+DEFAULT_QUEUE_SIZE = 32         # Items a stage can get ahead of the next one
+LIST_BATCH = 10                 # Random ids requested per listing call (get_random_articles returns twice as many)
+MAX_EMPTY_LISTS = 3             # Listing calls in a row returning nothing before listing gives up
+
+_DONE = object()                # Sent down a queue once every worker of the stage feeding it has finished
+
+
+class IngestPipeline:
+    """
+    IngestPipeline fetches and caches new random articles with service (NewWikipediaService or a subclass).
+
+    The service provides get_random_articles, get_article_extract and _get_image_urls; pointing its
+    BASE_API_URL elsewhere (e.g. a local stand-in server) points the whole pipeline there.
+    """
+
+    def __init__(self, service, workers: int = None, queue_size: int = None):
+        self.service = service
+        self.workers = max(1, workers or getattr(settings, "WIKIPEDIA_INGEST_WORKERS", DEFAULT_WORKERS))
+        self.queue_size = queue_size or getattr(settings, "WIKIPEDIA_INGEST_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._done = threading.Event()
+
+    def run(self, count: int, max_candidates: int = None):
+        """
+        run ingests up to count new articles and returns their ArticleCache rows, in the order they were stored.
+
+        At most max_candidates random ids are listed (count * 4 by default), which bounds the work when
+        many of them turn out to be stubs or fail to fetch.
+        """
+        if count <= 0:
+            return []
+        if max_candidates is None:
+            max_candidates = count * 4
+
+        self._done.clear()
+        self.stats.clear()
+        known = set(ArticleCache.objects.values_list("article_id", flat=True))
+
+        ids = queue.Queue(self.queue_size)
+        pages = queue.Queue(self.queue_size)
+        articles = queue.Queue(self.queue_size)
+        finished = queue.Queue(self.queue_size)
+
+        self._start_stage("list", 1, lambda: self._list(ids, known, max_candidates), ids, self.workers)
+        self._start_worker_stage("content", self.workers, self._fetch_content, ids, pages, 1)
+        self._start_worker_stage("stubs", 1, self._filter_stub, pages, articles, self.workers)
+        self._start_worker_stage("images", self.workers, self._resolve_images, articles, finished, 1)
+        return self._write(finished, count)
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    def _start_stage(self, name, workers, target, outbox, downstream):
+        """
+        _start_stage runs target on workers threads, then tells each of the downstream workers reading outbox
+        that the stage has finished.
+        """
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def run():
+            try:
+                target()
+            except Exception as e:
+                logger.error(f"Ingest stage {name} failed: {e}")
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    for _ in range(downstream):
+                        outbox.put(_DONE)
+
+        for i in range(workers):
+            threading.Thread(target=run, name=f"ingest-{name}-{i}", daemon=True).start()
+
+    def _start_worker_stage(self, name, workers, work, inbox, outbox, downstream):
+        """
+        _start_worker_stage runs work(item) on every item of inbox, putting what it returns (unless None) on outbox.
+        """
+        def target():
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    return
+                if self._done.is_set():
+                    continue    # Enough articles already, drain so upstream stages can finish
+
+                try:
+                    result = work(item)
+                except Exception as e:
+                    logger.error(f"Ingest stage {name} failed on {item}: {e}")
+                    self._count(name + "_failed")
+                    continue
+                if result is not None:
+                    outbox.put(result)
+
+        self._start_stage(name, workers, target, outbox, downstream)
+
+    def _list(self, ids, known, max_candidates):
+        listed = 0
+        empty = 0
+        while listed < max_candidates and not self._done.is_set() and empty < MAX_EMPTY_LISTS:
+            batch = self.service.get_random_articles(LIST_BATCH)
+            empty = empty + 1 if not batch else 0
+
+            for article in batch:
+                pageid = str(article["id"])
+                if pageid in known:
+                    self._count("skipped")
+                    continue
+                known.add(pageid)       # Random listings can repeat ids
+
+                ids.put(article["id"])
+                listed += 1
+                self._count("listed")
+                if listed >= max_candidates or self._done.is_set():
+                    break
+
+    def _fetch_content(self, pageid):
+        article_data = self.service.get_article_extract(pageid)
+        if article_data is None:
+            self._count("content_failed")
+            return None
+        self._count("fetched")
+        return article_data
+
+    def _filter_stub(self, article_data):
+        if article_data.get("is_stub", False):
+            logger.info(f"Skipping stub article: {article_data['title']}")
+            self._count("stubs")
+            return None
+        return article_data
+
+    def _resolve_images(self, article_data):
+        article_data["images"] = self.service._get_image_urls(article_data["title"])
+        return article_data
+
+    def _write(self, finished, count):
+        """
+        _write stores articles from finished until count are stored, then drains the pipeline.
+        """
+        cached_articles = []
+        while True:
+            article_data = finished.get()
+            if article_data is _DONE:
+                break
+            if self._done.is_set():
+                continue
+
+            try:
+                cached = ArticleService.cache_article(
+                    article_id=article_data["pageid"],
+                    title=article_data["title"],
+                    content=article_data["content"],
+                    image_urls=article_data["images"]
+                )
+            except Exception as e:
+                logger.error(f"Error caching article {article_data['title']}: {e}")
+                self._count("write_failed")
+                continue
+
+            cached_articles.append(cached)
+            self._count("cached")
+            logger.info(f"Cached article {len(cached_articles)}/{count}: {article_data['title']}")
+            if len(cached_articles) >= count:
+                self._done.set()
+
+        return cached_articles
@@ -0,0 +1,42 @@
+import logging
+from .models import GlobalLeaderboard
+from . import cache_service
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderboardService:
+    """
+    Service class for reading leaderboards.
+    Leaderboards are rebuilt by GlobalLeaderboard.update_leaderboard and read through the shared cache.
+    """
+
+    @staticmethod
+    def get_leaderboard(date):
+        """
+        Get the global leaderboard for a specific day
+
+        Args:
+            date (datetime.date): The date to get the leaderboard for
+
+        Returns:
+            GlobalLeaderboard or None: The leaderboard if one was built for that day
+        """
+        leaderboard = cache_service.get_or_set(
+            cache_service.leaderboard_key(date),
+            lambda: GlobalLeaderboard.objects.filter(date=date).first(),
+            cache_service.LEADERBOARD_TIMEOUT,
+        )
+        if leaderboard is None:
+            logger.info(f"No leaderboard for {date}")
+        return leaderboard
+
+    @staticmethod
+    def invalidate_leaderboard(date):
+        """
+        Drop the cached leaderboard for a specific day
+
+        Args:
+            date (datetime.date): The date of the leaderboard
+        """
+        cache_service.delete_cached(cache_service.leaderboard_key(date))
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand
+import logging
+from api import nlp_models
+from api.utils import score_guesses
+from ...models import UserGuess
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Recompute UserGuess.similarity_score in bulk, scoring guesses in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rescore every guess instead of only those without a similarity score'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=nlp_models.DEFAULT_BATCH_SIZE,
+            help='Number of texts per nlp.pipe batch'
+        )
+        parser.add_argument(
+            '--n-process',
+            type=int,
+            default=1,
+            help='Number of processes to parse texts with'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Number of guesses scored and saved at a time'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Score guesses without saving the results'
+        )
+
+    def handle(self, *args, **options):
+        guesses = UserGuess.objects.select_related('game_state__article').order_by('id')
+        if not options['all']:
+            guesses = guesses.filter(similarity_score=0.0)
+
+        total = guesses.count()
+        if total == 0:
+            self.stdout.write(self.style.WARNING("No guesses to score"))
+            return
+
+        self.stdout.write(f"Scoring {total} guesses...")
+        updated_count = 0
+        chunk = []
+        for guess in guesses.iterator(chunk_size=options['chunk_size']):
+            chunk.append(guess)
+            if len(chunk) >= options['chunk_size']:
+                updated_count += self._score_chunk(chunk, options)
+                chunk = []
+        if chunk:
+            updated_count += self._score_chunk(chunk, options)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"Scored {total} guesses, {updated_count} would change (dry run)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Scored {total} guesses, updated {updated_count}"))
+
+    def _score_chunk(self, chunk, options):
+        """Score a chunk of guesses against their game's article title and save the changed ones"""
+        similarities, _, _ = score_guesses(
+            [guess.guess_text for guess in chunk],
+            [guess.game_state.article.title for guess in chunk],
+            batch_size=options['batch_size'],
+            n_process=options['n_process'],
+        )
+
+        changed = []
+        for guess, similarity in zip(chunk, similarities.tolist()):
+            if guess.similarity_score != similarity:
+                guess.similarity_score = similarity
+                changed.append(guess)
+
+        if changed and not options['dry_run']:
+            UserGuess.objects.bulk_update(changed, ['similarity_score'])
+        logger.info(f"Scored {len(chunk)} guesses, {len(changed)} changed")
+        return len(changed)
@@ -3,6 +3,7 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 import json
 from ...models import GlobalLeaderboard, DailyScore
+from ...leaderboard_service import LeaderboardService
 
 
 class Command(BaseCommand):
@@ -61,7 +62,9 @@ class Command(BaseCommand):
     def _display_leaderboard_for_date(self, date, top_n, output_format, username=None):
         """Display leaderboard for a specific date"""
         try:
-            leaderboard = GlobalLeaderboard.objects.get(date=date)
+            leaderboard = LeaderboardService.get_leaderboard(date)
+            if leaderboard is None:
+                raise GlobalLeaderboard.DoesNotExist
 
             if not leaderboard.leaderboard_data:
                 self.stdout.write(self.style.WARNING(f"Leaderboard data for {date} is empty"))
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 import logging
 from ...wikipedia_service import WikipediaService
 from ...new_wikipedia_service import NewWikipediaService  # Import the new service
+from ... import async_wikipedia_service
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,24 @@ class Command(BaseCommand):
             action="store_true",
             help="Use the old Wikipedia service implementation instead of the new one",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Fetch articles concurrently with this many threads per stage (default: 0, one at a time)",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="use_async",
+            help="Fetch articles with the asyncio service",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=None,
+            help="Requests in flight at once with --async (default: WIKIPEDIA_ASYNC_CONCURRENCY in settings)",
+        )
 
     def handle(self, *args, **options):
         count = options["count"]
@@ -37,7 +56,14 @@ class Command(BaseCommand):
             service = NewWikipediaService
 
         # Use the selected service to fetch articles
-        cached_articles = service.fetch_and_cache_random_articles(count)
+        if options["use_async"] and not use_old_service:
+            self.stdout.write("Fetching with the asyncio service...")
+            cached_articles = async_wikipedia_service.fetch_and_cache_random_articles(count, options["concurrency"])
+        elif options["workers"] > 0 and not use_old_service:
+            self.stdout.write(f"Ingesting concurrently with {options['workers']} workers per stage...")
+            cached_articles = service.ingest_random_articles(count, workers=options["workers"])
+        else:
+            cached_articles = service.fetch_and_cache_random_articles(count)
 
         self.stdout.write(
             self.style.SUCCESS(
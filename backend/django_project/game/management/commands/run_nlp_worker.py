@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from api import nlp_models
+from api.nlp_service import DEFAULT_BATCH_SIZE, DEFAULT_BATCH_WAIT, NLPServer
+
+
+class Command(BaseCommand):
+    help = 'Run the NLP worker: load the spaCy model once and serve scoring for the web workers over a Unix socket'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--address',
+            default=None,
+            help='Unix socket path to listen on (defaults to NLP_SERVICE_ADDRESS in settings)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help='Most requests answered by one batch'
+        )
+        parser.add_argument(
+            '--batch-wait-ms',
+            type=float,
+            default=DEFAULT_BATCH_WAIT * 1000,
+            help='Milliseconds a batch waits for more requests after the first one'
+        )
+
+    def handle(self, *args, **options):
+        address = options['address'] or getattr(settings, 'NLP_SERVICE_ADDRESS', None)
+        if not address:
+            raise CommandError("No socket address, pass --address or set NLP_SERVICE_ADDRESS")
+
+        self.stdout.write("Loading spaCy model...")
+        nlp_models.preload()
+
+        server = NLPServer(address, options['batch_size'], options['batch_wait_ms'] / 1000)
+        self.stdout.write(self.style.SUCCESS(f"NLP worker listening on {address}"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            stats = server.stats()
+            self.stdout.write(f"Answered {stats['requests']} requests in {stats['batches']} batches")
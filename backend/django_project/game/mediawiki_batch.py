@@ -0,0 +1,129 @@
+"""
+mediawiki_batch.py
+
+This module contains the batched MediaWiki fetcher: titles, categories and image URLs of many articles
+in a handful of API requests, instead of three requests per article.
+
+The API takes up to 50 page ids or titles per query. Pages are queried 50 at a time for their info,
+categories and image lists, then every image they use is resolved to its URL, again 50 titles per query.
+Long lists come back in several parts, which are followed through the API's "continue" parameters.
+Only article text is still fetched one page at a time, since the API only returns one full extract
+per request.
+"""
+
+import logging
+from collections import Counter
+
+from . import http_client
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH = 50              # Page ids or titles per query, the API's limit for regular clients
+MAX_IMAGES = 10             # Images resolved per article, as in NewWikipediaService._get_image_urls
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+
+
+def is_content_image(image_title):
+    """
+    is_content_image says whether an image used by an article is worth showing (a photo or drawing, not an icon).
+    """
+    return image_title.lower().endswith(IMAGE_EXTENSIONS) and not image_title.startswith("File:Icon")
+
+
+def chunks(items, size=MAX_BATCH):
+    """
+    chunks splits items into lists of at most size items.
+    """
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class MediaWikiBatchFetcher:
+    """
+    MediaWikiBatchFetcher fetches article metadata from the MediaWiki API at api_url, many articles per request.
+
+    stats counts the requests made, by kind.
+    """
+
+    def __init__(self, api_url: str, max_images: int = MAX_IMAGES):
+        self.api_url = api_url
+        self.max_images = max_images
+        self.stats = Counter()
+
+    def query(self, params):
+        """
+        query runs one API query, following continuations, and yields the "query" part of every response.
+        """
+        params = dict(params, action="query", format="json")
+        while True:
+            response = http_client.get(self.api_url, params=params)
+            response.raise_for_status()
+            data = response.json()
+            self.stats["requests"] += 1
+
+            if "error" in data:
+                raise ValueError(f"MediaWiki API error: {data['error']}")
+            yield data.get("query", {})
+
+            if "continue" not in data:
+                return
+            params.update(data["continue"])
+
+    def fetch_pages(self, pageids):
+        """
+        fetch_pages returns the metadata of every page in pageids, keyed by page id (as a string):
+            {"pageid", "title", "categories": [{"title": ...}, ...], "images": [url, ...], "missing": bool}
+
+        categories are in the format NewWikipediaService._is_article_stub expects.
+        """
+        pages = {}
+        for chunk in chunks(dict.fromkeys(str(pageid) for pageid in pageids)):
+            params = {
+                "pageids": "|".join(chunk),
+                "prop": "info|categories|images",
+                "inprop": "url|displaytitle",
+                "cllimit": "max",
+                "imlimit": "max",
+            }
+            for query in self.query(params):
+                for pageid, page_data in query.get("pages", {}).items():
+                    page = pages.setdefault(pageid, {
+                        "pageid": pageid,
+                        "title": page_data.get("title"),
+                        "categories": [],
+                        "image_titles": [],
+                        "missing": "missing" in page_data or "invalid" in page_data,
+                    })
+                    # Continued responses repeat the page with the next part of its lists
+                    page["categories"].extend(page_data.get("categories", []))
+                    page["image_titles"].extend(image["title"] for image in page_data.get("images", []))
+        self.stats["pages"] += len(pages)
+
+        # Resolve every page's images at once; pages often share images
+        for page in pages.values():
+            page["image_titles"] = [title for title in page["image_titles"] if is_content_image(title)][:self.max_images]
+        urls = self.fetch_image_urls(title for page in pages.values() for title in page["image_titles"])
+
+        for page in pages.values():
+            page["images"] = [urls[title] for title in page.pop("image_titles") if title in urls]
+        return pages
+
+    def fetch_image_urls(self, image_titles):
+        """
+        fetch_image_urls returns the URL of every image title (e.g. "File:Cat.jpg") that has one, keyed by title.
+        """
+        urls = {}
+        for chunk in chunks(dict.fromkeys(image_titles)):
+            params = {
+                "titles": "|".join(chunk),
+                "prop": "imageinfo",
+                "iiprop": "url",
+            }
+            for query in self.query(params):
+                # Titles are answered in their normalized form, map them back to the ones asked for
+                renamed = {item["to"]: item["from"] for item in query.get("normalized", [])}
+                for page_data in query.get("pages", {}).values():
+                    if page_data.get("imageinfo"):
+                        title = renamed.get(page_data["title"], page_data["title"])
+                        urls[title] = page_data["imageinfo"][0]["url"]
+        return urls
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("game", "0002_gamestate_userguess"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamestate",
+            name="reveal_state",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="gamestate",
+            name="scramble_seed",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("game", "0003_gamestate_seeded_scramble"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userguess",
+            name="revealed_keys",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
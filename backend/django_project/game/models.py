@@ -1,6 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils import timezone
 import uuid
@@ -264,6 +264,25 @@ class GlobalLeaderboard(models.Model):
         self.save()
 
 
+# Signals to drop cached leaderboards and profile summaries when they change (see cache_service.py)
+@receiver(post_save, sender=GlobalLeaderboard)
+@receiver(post_delete, sender=GlobalLeaderboard)
+def invalidate_cached_leaderboard(sender, instance, **kwargs):
+    """Drop the cached leaderboard for the GlobalLeaderboard's date"""
+    from . import cache_service
+
+    cache_service.delete_cached(cache_service.leaderboard_key(instance.date))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_profile_summary(sender, instance, **kwargs):
+    """Drop the cached profile summary of the UserProfile's user"""
+    from . import cache_service
+
+    cache_service.delete_cached(cache_service.profile_summary_key(instance.user_id))
+
+
 class ArticleCache(models.Model):
     """Cache for Wikipedia articles to reduce API calls"""
 
@@ -294,6 +313,30 @@ class DailyArticle(models.Model):
         return f"Article for {self.date}: {self.article.title}"
 
 
+# Signals to drop cached daily articles when the day's article or its content changes
+@receiver(post_save, sender=DailyArticle)
+@receiver(post_delete, sender=DailyArticle)
+def invalidate_cached_daily_article(sender, instance, **kwargs):
+    """Drop the cached entry for the DailyArticle's date (see daily_article_cache.py)"""
+    from .daily_article_cache import invalidate_daily_article
+
+    invalidate_daily_article(instance.date)
+
+
+@receiver(post_save, sender=ArticleCache)
+@receiver(post_delete, sender=ArticleCache)
+def invalidate_cached_article(sender, instance, **kwargs):
+    """Drop the cached ArticleCache, daily entries showing it and data derived from its content (see api/article_cache.py)"""
+    from api.article_cache import discard_article
+
+    from . import cache_service
+    from .daily_article_cache import invalidate_article
+
+    cache_service.delete_cached(cache_service.article_key(instance.article_id))
+    invalidate_article(instance.pk)
+    discard_article(instance.pk)
+
+
 class GameState(models.Model):
     """Stores a user's game session state for a specific article"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='game_states')
@@ -301,6 +344,10 @@ class GameState(models.Model):
     date = models.DateField(auto_now_add=True)  # Date when the game was created
     # Use JSONField to store the word scrambling mapping
     word_mapping = models.JSONField(default=dict)
+    # Seeded games leave word_mapping empty: the scramble is re-derived from (article, user, scramble_seed)
+    # and only which characters have been revealed is stored, in the versioned format of api/reveal_state.py
+    scramble_seed = models.BigIntegerField(null=True, blank=True)
+    reveal_state = models.BinaryField(null=True, blank=True)
     max_guesses = models.IntegerField(default=6)  # Maximum number of allowed guesses
     is_completed = models.BooleanField(default=False)  # Whether the game is completed
     best_score = models.IntegerField(default=0)  # Best score achieved
@@ -322,6 +369,7 @@ class UserGuess(models.Model):
     guess_text = models.CharField(max_length=255)  # The user's guess text
     score = models.IntegerField(default=0)  # Score for this guess
     similarity_score = models.FloatField(default=0.0)  # Similarity to the correct answer
+    revealed_keys = models.JSONField(null=True, blank=True)  # Vocabulary indices the guess changed, None if unknown
     timestamp = models.DateTimeField(auto_now_add=True)
 
     class Meta:
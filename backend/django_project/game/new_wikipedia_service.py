@@ -2,7 +2,11 @@ import logging
 import wikipediaapi
 import requests
 import re
+import threading
 from .article_service import ArticleService
+from . import http_client
+from .mediawiki_batch import MediaWikiBatchFetcher, is_content_image
+from .ingest_pipeline import IngestPipeline
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +20,36 @@ class NewWikipediaService:
 
     BASE_API_URL = "https://en.wikipedia.org/w/api.php"
 
+    _wiki = None
+    _wiki_lock = threading.Lock()
+
     def __init__(self):
         """Initialize the Wikipedia API client"""
-        self.wiki = wikipediaapi.Wikipedia(
-            language='en',
-            extract_format=wikipediaapi.ExtractFormat.WIKI,
-            user_agent='YourAppName/1.0'  # Replace with your actual application name
-        )
+        self.wiki = self.get_wiki()
+
+    @classmethod
+    def get_wiki(cls):
+        """
+        Get the Wikipedia API client shared by every request, created on first use.
+
+        Returns:
+            wikipediaapi.Wikipedia: The shared client
+        """
+        if NewWikipediaService._wiki is None:
+            with NewWikipediaService._wiki_lock:
+                if NewWikipediaService._wiki is None:
+                    wiki = wikipediaapi.Wikipedia(
+                        language='en',
+                        extract_format=wikipediaapi.ExtractFormat.WIKI,
+                        user_agent=http_client.get_user_agent(),
+                        timeout=http_client.get_timeout()
+                    )
+                    # Wikipedia-API keeps its own session, give it the same pooling and retries as ours
+                    session = getattr(wiki, "_session", None)
+                    if session is not None:
+                        http_client.configure_session(session)
+                    NewWikipediaService._wiki = wiki
+        return NewWikipediaService._wiki
 
     @classmethod
     def get_random_articles(cls, count=1):
@@ -48,7 +75,7 @@ class NewWikipediaService:
         }
 
         try:
-            response = requests.get(cls.BASE_API_URL, params=params)
+            response = http_client.get(cls.BASE_API_URL, params=params)
             response.raise_for_status()
             data = response.json()
 
@@ -63,12 +90,14 @@ class NewWikipediaService:
             return []
 
     @classmethod
-    def get_article_content(cls, pageid):
+    def get_article_content(cls, pageid, page_data=None):
         """
         Use Wikipedia-API to fetch more complete article content.
 
         Args:
             pageid (int): Wikipedia page ID
+            page_data (dict): The page's metadata from get_article_batch, if already fetched.
+                Only the text is fetched then.
 
         Returns:
             dict: Article data with keys:
@@ -78,10 +107,10 @@ class NewWikipediaService:
                 - images: List of image URLs
                 - is_stub: Boolean indicating if article is a stub
         """
-        # Create a service instance to access the wiki property
-        service = cls()
-
         try:
+            if page_data is not None:
+                return cls._get_batched_article_content(pageid, page_data)
+
             # First get the page title via API
             params = {
                 "action": "query",
@@ -92,7 +121,7 @@ class NewWikipediaService:
                 "cllimit": 50  # Get up to 50 categories
             }
 
-            response = requests.get(cls.BASE_API_URL, params=params)
+            response = http_client.get(cls.BASE_API_URL, params=params)
             response.raise_for_status()
             data = response.json()
 
@@ -104,7 +133,7 @@ class NewWikipediaService:
             title = page_data["title"]
 
             # Use Wikipedia-API to get full content
-            page = service.wiki.page(title)
+            page = cls.get_wiki().page(title)
 
             if not page.exists():
                 logger.error(f"Page does not exist: {title}")
@@ -128,6 +157,94 @@ class NewWikipediaService:
             logger.error(f"Error getting article content: {e}")
             return None
 
+    @classmethod
+    def _get_batched_article_content(cls, pageid, page_data):
+        """
+        Fetch the text of an article whose metadata came from get_article_batch, in get_article_content's format.
+        """
+        if page_data["missing"]:
+            logger.error(f"Page does not exist: {pageid}")
+            return None
+
+        # The page can be deleted between the batch query and now
+        page = cls.get_wiki().page(page_data["title"])
+        if not page.exists():
+            logger.error(f"Page does not exist: {page_data['title']}")
+            return None
+
+        content = page.text
+        return {
+            "pageid": str(pageid),
+            "title": page_data["title"],
+            "content": content,
+            "images": page_data["images"],
+            "is_stub": cls._is_article_stub(page_data, content)
+        }
+
+    @classmethod
+    def get_article_batch(cls, pageids):
+        """
+        Fetch the title, categories and image URLs of many articles in a few API requests
+        (see mediawiki_batch.py).
+
+        Args:
+            pageids (list): Wikipedia page IDs
+
+        Returns:
+            dict: Page metadata keyed by page ID (as a string), empty if the requests failed
+        """
+        try:
+            return MediaWikiBatchFetcher(cls.BASE_API_URL).fetch_pages(pageids)
+        except Exception as e:
+            logger.error(f"Error getting article batch: {e}")
+            return {}
+
+    @classmethod
+    def get_article_extract(cls, pageid):
+        """
+        Fetch an article's title, categories and plain text in a single API request.
+        Used by the ingest pipeline, which resolves images separately.
+
+        Args:
+            pageid (int): Wikipedia page ID
+
+        Returns:
+            dict: Article data in the format of get_article_content, with "images" empty
+        """
+        params = {
+            "action": "query",
+            "format": "json",
+            "pageids": pageid,
+            "prop": "info|categories|extracts",
+            "inprop": "url|displaytitle",
+            "cllimit": 50,
+            "explaintext": 1,
+            "exsectionformat": "plain"  # Section titles on their own line, like Wikipedia-API's text
+        }
+
+        try:
+            response = http_client.get(cls.BASE_API_URL, params=params)
+            response.raise_for_status()
+            data = response.json()
+
+            page_data = data.get("query", {}).get("pages", {}).get(str(pageid))
+            if page_data is None or "missing" in page_data:
+                logger.error(f"Error getting page extract: {data}")
+                return None
+
+            content = page_data.get("extract", "")
+            return {
+                "pageid": str(pageid),
+                "title": page_data["title"],
+                "content": content,
+                "images": [],
+                "is_stub": cls._is_article_stub(page_data, content)
+            }
+
+        except Exception as e:
+            logger.error(f"Error getting article extract: {e}")
+            return None
+
     @staticmethod
     def _is_article_stub(page_data, content):
         """
@@ -141,11 +258,8 @@ class NewWikipediaService:
             bool: True if article is a stub, False otherwise
         """
         # Check categories for stub indicators
-        if "categories" in page_data:
-            for category in page_data["categories"]:
-                category_title = category.get("title", "")
-                if "stub" in category_title.lower():
-                    return True
+        if NewWikipediaService._has_stub_category(page_data):
+            return True
 
         # Check content for stub templates
         stub_patterns = [
@@ -164,6 +278,22 @@ class NewWikipediaService:
 
         return False
 
+    @staticmethod
+    def _has_stub_category(page_data):
+        """
+        Determine if an article is in a stub category.
+
+        Args:
+            page_data (dict): Page data from the API
+
+        Returns:
+            bool: True if one of the article's categories marks it as a stub
+        """
+        for category in page_data.get("categories", []):
+            if "stub" in category.get("title", "").lower():
+                return True
+        return False
+
     @classmethod
     def _get_image_urls(cls, title):
         """
@@ -185,7 +315,7 @@ class NewWikipediaService:
                 "imlimit": 20  # Increased limit to get more images
             }
 
-            response = requests.get(cls.BASE_API_URL, params=params)
+            response = http_client.get(cls.BASE_API_URL, params=params)
             data = response.json()
 
             image_titles = []
@@ -193,10 +323,8 @@ class NewWikipediaService:
                 for page_id in data["query"]["pages"]:
                     if "images" in data["query"]["pages"][page_id]:
                         for image in data["query"]["pages"][page_id]["images"]:
-                            image_title = image["title"]
-                            if any(image_title.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.gif']):
-                                if not image_title.startswith("File:Icon"):
-                                    image_titles.append(image_title)
+                            if is_content_image(image["title"]):
+                                image_titles.append(image["title"])
 
             # Get image URLs
             if not image_titles:
@@ -210,7 +338,7 @@ class NewWikipediaService:
                 "iiprop": "url"
             }
 
-            response = requests.get(cls.BASE_API_URL, params=params)
+            response = http_client.get(cls.BASE_API_URL, params=params)
             data = response.json()
 
             image_urls = []
@@ -241,6 +369,9 @@ class NewWikipediaService:
         cached_articles = []
         processed_count = 0
 
+        # Titles, categories and images of every candidate at once, only the text is fetched per article
+        batch = cls.get_article_batch([article["id"] for article in random_articles]) if random_articles else {}
+
         for article in random_articles:
             # Check if we've reached the requested count
             if len(cached_articles) >= count:
@@ -252,8 +383,14 @@ class NewWikipediaService:
                 cached_articles.append(existing)
                 continue
 
+            # Skip stubs known from their categories before fetching their text
+            page_data = batch.get(str(article["id"]))
+            if page_data is not None and cls._has_stub_category(page_data):
+                logger.info(f"Skipping stub article: {page_data['title']}")
+                continue
+
             # Fetch full content
-            article_data = cls.get_article_content(article["id"])
+            article_data = cls.get_article_content(article["id"], page_data=page_data)
             if not article_data:
                 continue
 
@@ -277,3 +414,19 @@ class NewWikipediaService:
             logger.info(f"Cached article {processed_count}/{count}: {article_data['title']}")
 
         return cached_articles
+
+    @classmethod
+    def ingest_random_articles(cls, count=5, workers=None):
+        """
+        Fetch and cache count new random articles concurrently (see ingest_pipeline.py).
+        Filters out stub articles. Unlike fetch_and_cache_random_articles, articles
+        that are already cached are skipped rather than returned.
+
+        Args:
+            count (int): Number of articles to fetch and cache
+            workers (int): Threads per network stage, WIKIPEDIA_INGEST_WORKERS in settings by default
+
+        Returns:
+            list: List of cached ArticleCache objects
+        """
+        return IngestPipeline(cls, workers).run(count)
@@ -0,0 +1,125 @@
+import asyncio
+import tempfile
+import time
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from game import async_wikipedia_service
+from game.async_wikipedia_service import AsyncWikipediaService, RateLimiter
+from game.models import ArticleCache
+from game.tests.test_http_client import FlakyServer
+from game.tests.wikipedia_stand_in import WikipediaStandIn
+
+
+class RateLimiterTest(SimpleTestCase):
+    """Test suite for the per-host rate limiter."""
+
+    def test_spaces_requests(self):
+        """Concurrent callers start at least 1/rate seconds apart."""
+        starts = []
+
+        async def request(limiter):
+            await limiter.wait()
+            starts.append(time.monotonic())
+
+        async def run(rate):
+            limiter = RateLimiter(rate)
+            await asyncio.gather(*(request(limiter) for _ in range(5)))
+
+        asyncio.run(run(50))
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        self.assertGreaterEqual(min(gaps), 0.015)
+
+        starts.clear()
+        began = time.monotonic()
+        asyncio.run(run(0))
+        self.assertLess(starts[-1] - began, 0.015)
+
+
+class AsyncCommandTest(SimpleTestCase):
+    """Test suite for fetch_wikipedia_articles --async."""
+
+    @patch("game.async_wikipedia_service.fetch_and_cache_random_articles")
+    def test_command(self, mock_fetch):
+        """--async uses the asyncio service with the given concurrency."""
+        mock_fetch.return_value = [MagicMock(title="Async Article")]
+        out = StringIO()
+        call_command("fetch_wikipedia_articles", count=1, use_async=True, concurrency=8, stdout=out)
+
+        mock_fetch.assert_called_once_with(1, 8)
+        self.assertIn("Async Article", out.getvalue())
+
+
+@override_settings(WIKIPEDIA_HTTP_RETRIES=0)
+class AsyncWikipediaServiceTest(TransactionTestCase):
+    """Test suite for the asyncio Wikipedia service, against a local stand-in for the MediaWiki API."""
+
+    def make_service(self, stand_in, **kwargs):
+        service = AsyncWikipediaService(**kwargs)
+        service.BASE_API_URL = stand_in.url
+        return service
+
+    def test_get_article_content(self):
+        """Articles come back in NewWikipediaService's format."""
+        async def run(stand_in):
+            async with self.make_service(stand_in) as service:
+                return await service.get_article_content(4), await service.get_article_content(5)
+
+        with WikipediaStandIn() as stand_in:
+            article, stub = asyncio.run(run(stand_in))
+
+        self.assertEqual(article["title"], "Article 4")
+        self.assertEqual(article["images"], ["http://upload.test/4.jpg"])
+        self.assertFalse(article["is_stub"])
+        self.assertTrue(stub["is_stub"])
+
+    def test_fetch_and_cache(self):
+        """Articles are fetched concurrently, within the concurrency limit, and cached."""
+        ArticleCache.objects.create(article_id="1", title="Cached", content="Cached text")
+
+        async def run(stand_in):
+            async with self.make_service(stand_in, concurrency=4, rate_limit=0) as service:
+                return await service.fetch_and_cache_random_articles(count=10)
+
+        with WikipediaStandIn(delay=0.02, missing={3}) as stand_in:
+            articles = asyncio.run(run(stand_in))
+
+        ids = [article.article_id for article in articles]
+        self.assertEqual(len(articles), 10)
+        self.assertNotIn("1", ids)
+        self.assertNotIn("3", ids)
+        self.assertFalse(any(int(pageid) % 5 == 0 for pageid in ids))
+        self.assertEqual(ArticleCache.objects.count(), 11)
+        self.assertGreater(stand_in.max_in_flight, 1)
+        self.assertLessEqual(stand_in.max_in_flight, 4)
+
+    @override_settings(WIKIPEDIA_HTTP_RETRIES=3, WIKIPEDIA_HTTP_BACKOFF=0)
+    def test_retries(self):
+        """429 and 5xx answers are retried."""
+        async def run(server):
+            async with self.make_service(server) as service:
+                return await service.get_json({"action": "query"}), service.requests
+
+        with FlakyServer([(503, {}, 0), (429, {"Retry-After": "0"}, 0)]) as server:
+            data, requests = asyncio.run(run(server))
+
+        self.assertEqual(data, {"ok": True})
+        self.assertEqual(requests, 3)
+        self.assertEqual(server.requests, 3)
+
+    def test_response_cache(self):
+        """Responses go through the same on-disk cache as the sync services'."""
+        async def run(server):
+            async with self.make_service(server) as service:
+                return [await service.get_json({"action": "query", "pageids": 1}) for _ in range(2)], service.requests
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(WIKIPEDIA_HTTP_CACHE_DIR=directory):
+            with FlakyServer() as server:
+                results, requests = asyncio.run(run(server))
+
+        self.assertEqual(results, [{"ok": True}, {"ok": True}])
+        self.assertEqual(requests, 1)
+        self.assertEqual(server.requests, 1)
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from unittest.mock import patch
+
+from game import cache_service
+from game.article_service import ArticleService
+from game.leaderboard_service import LeaderboardService
+from game.models import ArticleCache, GlobalLeaderboard
+
+
+class CacheServiceTest(TestCase):
+    """Test the shared cache layer for hot game data"""
+
+    def setUp(self):
+        cache.clear()
+        self.today = timezone.now().date()
+
+    def test_get_or_set(self):
+        """Values are built once, None results are not cached"""
+        calls = []
+        self.assertEqual(cache_service.get_or_set("k", lambda: calls.append(1) or "v", 60), "v")
+        self.assertEqual(cache_service.get_or_set("k", lambda: calls.append(1) or "v", 60), "v")
+        self.assertEqual(calls, [1])
+
+        self.assertIsNone(cache_service.get_or_set("missing", lambda: None, 60))
+        self.assertIsNone(cache_service.get_cached("missing"))
+
+    def test_backend_errors_are_misses(self):
+        """A failing cache backend falls back to building the value"""
+        with patch("game.cache_service.get_cache", side_effect=ConnectionError("down")):
+            self.assertEqual(cache_service.get_or_set("k", lambda: "v", 60), "v")
+            cache_service.delete_cached("k")
+
+    def test_article_by_id_cached(self):
+        """Articles are read once, and dropped from the cache when they are updated"""
+        ArticleCache.objects.create(article_id="a1", title="Cat", content="Cats purr.")
+        ArticleService.get_article_by_id("a1")
+        with self.assertNumQueries(0):
+            self.assertEqual(ArticleService.get_article_by_id("a1").content, "Cats purr.")
+
+        ArticleService.cache_article("a1", "Cat", "Cats meow.")
+        self.assertEqual(ArticleService.get_article_by_id("a1").content, "Cats meow.")
+
+    def test_leaderboard_cached(self):
+        """Leaderboards are read once, and dropped from the cache when they are rebuilt"""
+        self.assertIsNone(LeaderboardService.get_leaderboard(self.today))
+        leaderboard = GlobalLeaderboard.objects.create(date=self.today, leaderboard_data={"scores": []})
+        LeaderboardService.get_leaderboard(self.today)
+        with self.assertNumQueries(0):
+            self.assertEqual(LeaderboardService.get_leaderboard(self.today).leaderboard_data, {"scores": []})
+
+        leaderboard.update_leaderboard()
+        self.assertEqual(LeaderboardService.get_leaderboard(self.today).leaderboard_data["total_players"], 0)
+
+    def test_profile_summary_cached(self):
+        """The profile view reads the summary from the cache until the profile changes"""
+        user = User.objects.create_user(username="cached", password="password")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get("/profile/").json()["total_games_played"], 0)
+        self.assertIsNotNone(cache_service.get_cached(cache_service.profile_summary_key(user.id)))
+
+        user.profile.total_games_played = 3
+        user.profile.save()
+        response = self.client.get("/profile/").json()
+        self.assertEqual(response["total_games_played"], 3)
+        self.assertTrue(response["is_authenticated"])
@@ -0,0 +1,108 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+import datetime
+from unittest.mock import patch
+
+from game import cache_service
+from game.article_service import ArticleService
+from game.daily_article_cache import get_cached_daily_article, invalidate_daily_article
+from game.models import ArticleCache, DailyArticle
+
+
+class DailyArticleCacheTest(TestCase):
+    """Test the process-level cache of the daily article"""
+
+    def setUp(self):
+        invalidate_daily_article()
+        self.today = timezone.now().date()
+        self.article1 = ArticleCache.objects.create(article_id="1", title="Cat", content="The cat is a pet.")
+        self.article2 = ArticleCache.objects.create(article_id="2", title="Dog", content="The dog is a pet.")
+        DailyArticle.objects.create(date=self.today, article=self.article1)
+
+    def tearDown(self):
+        invalidate_daily_article()
+
+    def test_loaded_once(self):
+        """Today's article is queried once and then served from memory"""
+        with self.assertNumQueries(1):
+            first = get_cached_daily_article()
+            second = get_cached_daily_article(self.today)
+        self.assertIs(first, second)
+        self.assertEqual(first.title, "Cat")
+        self.assertEqual(first.article, self.article1)
+
+    def test_shared_between_processes(self):
+        """A process without its own entry reads the row from the shared cache instead of the database"""
+        get_cached_daily_article()
+        with patch("game.daily_article_cache._entries", {}):  # Like a freshly started worker
+            with self.assertNumQueries(0):
+                self.assertEqual(get_cached_daily_article().title, "Cat")
+
+    def test_missing_article_not_cached(self):
+        """A day without an article returns None, and a later article is picked up"""
+        tomorrow = self.today + datetime.timedelta(days=1)
+        self.assertIsNone(get_cached_daily_article(tomorrow))
+        DailyArticle.objects.create(date=tomorrow, article=self.article2)
+        self.assertEqual(get_cached_daily_article(tomorrow).title, "Dog")
+
+    def test_set_daily_article_invalidates(self):
+        """Changing the day's article through ArticleService drops the cached entry"""
+        self.assertEqual(get_cached_daily_article().title, "Cat")
+        ArticleService.set_daily_article(self.article2)
+        self.assertEqual(get_cached_daily_article().title, "Dog")
+
+    def test_article_change_invalidates(self):
+        """Updating or deleting the cached article drops the entry"""
+        self.assertEqual(get_cached_daily_article().article.content, "The cat is a pet.")
+        ArticleService.cache_article("1", "Cat", "Cats purr.")
+        self.assertEqual(get_cached_daily_article().article.content, "Cats purr.")
+
+        DailyArticle.objects.all().delete()
+        self.assertIsNone(get_cached_daily_article())
+
+    def test_derived_data_built_once(self):
+        """Derived data is computed once per entry"""
+        calls = []
+        entry = get_cached_daily_article()
+        for _ in range(2):
+            value = entry.derived("text", lambda: calls.append(1) or entry.article.content[:7])
+        self.assertEqual(value, "The cat")
+        self.assertEqual(calls, [1])
+
+    @override_settings(DAILY_ARTICLE_CACHE_TTL=0)
+    def test_ttl(self):
+        """Entries older than the TTL are read again, for changes made by other processes"""
+        first = get_cached_daily_article()
+        # Another process changes the article: the shared entry is dropped, but this process gets no signal
+        DailyArticle.objects.filter(date=self.today).update(article=self.article2)
+        cache_service.delete_cached(cache_service.daily_article_key(self.today))
+        self.assertIsNot(get_cached_daily_article(), first)
+        self.assertEqual(get_cached_daily_article().title, "Dog")
+
+    def test_ttl_across_processes(self):
+        """A change made by another process shows up after the TTL, though the shared locmem copy is never dropped"""
+        clock = FakeClock()
+        with override_settings(DAILY_ARTICLE_CACHE_TTL=300), patch("game.daily_article_cache.time", clock):
+            self.assertEqual(get_cached_daily_article().title, "Cat")
+
+            # Another process changes the article: neither this process's entry nor its locmem copy is dropped
+            DailyArticle.objects.filter(date=self.today).update(article=self.article2)
+            clock.now += 200
+            with patch("game.daily_article_cache._entries", {}):  # A worker that loaded the shared copy later
+                self.assertEqual(get_cached_daily_article().title, "Cat")
+                clock.now += 101
+                self.assertEqual(get_cached_daily_article().title, "Dog")
+            self.assertEqual(get_cached_daily_article().title, "Dog")
+
+
+class FakeClock:
+    """Stands in for the time module, both clocks advanced by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
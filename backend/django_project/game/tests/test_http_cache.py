@@ -0,0 +1,141 @@
+import os
+import tempfile
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from game import http_cache, http_client
+from game.http_cache import CacheMiss, ResponseCache, cache_key, normalize_request
+from game.mediawiki_batch import MediaWikiBatchFetcher
+from game.new_wikipedia_service import NewWikipediaService
+from game.tests.test_http_client import FlakyServer
+from game.tests.wikipedia_stand_in import WikipediaStandIn
+
+
+class ResponseCacheTest(SimpleTestCase):
+    """Test suite for the on-disk response cache."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_normalized_keys(self):
+        """Requests differing only in parameter order share a key."""
+        url = "https://en.wikipedia.org/w/api.php"
+        self.assertEqual(cache_key(url, {"action": "query", "pageids": 1}), cache_key(url, {"pageids": "1", "action": "query"}))
+        self.assertEqual(cache_key(url + "?b=2&a=1"), cache_key(url, {"a": 1, "b": 2}))
+        self.assertNotEqual(cache_key(url, {"pageids": 1}), cache_key(url, {"pageids": 2}))
+        self.assertEqual(normalize_request("https://EN.wikipedia.org/w/api.php?b=2&a=1"), url + "?a=1&b=2")
+
+    def test_get_and_set(self):
+        """A stored response comes back as it was; others are misses."""
+        cache = ResponseCache(self.directory.name)
+        cache.set("http://api.test", {"q": 1}, 200, {"Content-Type": "application/json"}, b'{"a":\n1}')
+
+        self.assertEqual(cache.get("http://api.test", {"q": 1}), (200, {"Content-Type": "application/json"}, b'{"a":\n1}'))
+        self.assertIsNone(cache.get("http://api.test", {"q": 2}))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        cache.clear()
+        self.assertIsNone(cache.get("http://api.test", {"q": 1}))
+
+    def test_overwrite_size(self):
+        """Overwriting an entry does not count its old size twice."""
+        cache = ResponseCache(self.directory.name, max_bytes=2500)
+        for _ in range(5):
+            cache.set("http://api.test", {"q": 1}, 200, {}, b"x" * 700)
+        self.assertEqual(cache._size, sum(size for _, size, _ in cache._entries()))
+        self.assertLess(cache._size, 1000)
+
+    def test_ttl(self):
+        """Entries older than the TTL are misses, and removed."""
+        cache = ResponseCache(self.directory.name, ttl=60)
+        cache.set("http://api.test", {"q": 1}, 200, {}, b"old")
+        path = cache._path(cache_key("http://api.test", {"q": 1}))
+        os.utime(path, (time.time(), time.time() - 120))
+
+        self.assertIsNone(cache.get("http://api.test", {"q": 1}))
+        self.assertFalse(os.path.exists(path))
+
+    def test_lru_eviction(self):
+        """Over its size, the cache drops the least recently used entries first."""
+        cache = ResponseCache(self.directory.name, max_bytes=2500)
+        for n in range(3):
+            cache.set("http://api.test", {"q": n}, 200, {}, b"x" * 700)
+            path = cache._path(cache_key("http://api.test", {"q": n}))
+            os.utime(path, (time.time() - 100 + n, time.time()))
+        cache.get("http://api.test", {"q": 0})      # Now the most recently used
+
+        cache.set("http://api.test", {"q": 3}, 200, {}, b"x" * 700)
+
+        self.assertIsNotNone(cache.get("http://api.test", {"q": 0}))
+        self.assertIsNone(cache.get("http://api.test", {"q": 1}))
+        self.assertIsNone(cache.get("http://api.test", {"q": 2}))
+        self.assertIsNotNone(cache.get("http://api.test", {"q": 3}))
+
+
+@override_settings(WIKIPEDIA_HTTP_RETRIES=0)
+class CachedHTTPClientTest(SimpleTestCase):
+    """Test suite for the shared HTTP client reading through the response cache."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        http_client.reset_session()
+        self.addCleanup(http_client.reset_session)
+
+    def test_off_by_default(self):
+        """Without a cache directory, every request goes to the network."""
+        with override_settings(WIKIPEDIA_HTTP_CACHE_DIR=None), WikipediaStandIn() as stand_in:
+            for _ in range(2):
+                http_client.get(stand_in.url, params={"pageids": "1", "prop": "info"})
+        self.assertEqual(len(stand_in.requests), 2)
+
+    def test_cache_mode(self):
+        """Repeated requests are answered from the cache; random listings and failures are not cached."""
+        with override_settings(WIKIPEDIA_HTTP_CACHE_DIR=self.directory.name), WikipediaStandIn() as stand_in:
+            first = http_client.get(stand_in.url, params={"action": "query", "pageids": "4", "prop": "info"})
+            second = http_client.get(stand_in.url, params={"prop": "info", "pageids": "4", "action": "query"})
+            self.assertEqual(len(stand_in.requests), 1)
+            self.assertTrue(second.from_cache)
+            self.assertEqual(second.json(), first.json())
+            self.assertEqual(second.status_code, 200)
+
+            service = type("StandInWikipediaService", (NewWikipediaService,), {"BASE_API_URL": stand_in.url})
+            listings = [service.get_random_articles(2) for _ in range(2)]
+            self.assertNotEqual(listings[0], listings[1])
+            self.assertEqual(len(stand_in.requests), 3)
+
+        with override_settings(WIKIPEDIA_HTTP_CACHE_DIR=self.directory.name), FlakyServer([(503, {}, 0)]) as server:
+            self.assertEqual(http_client.get(server.url).status_code, 503)
+            self.assertEqual(http_client.get(server.url).status_code, 200)
+            self.assertTrue(http_client.get(server.url).from_cache)
+        self.assertEqual(server.requests, 2)
+
+    def test_api_errors_not_cached(self):
+        """MediaWiki errors come back as 200s, and are not cached."""
+        error = b'{"error": {"code": "maxlag", "info": "Waiting for a database server"}}'
+        with override_settings(WIKIPEDIA_HTTP_CACHE_DIR=self.directory.name):
+            http_cache.store("http://api.test", {"q": 1}, 200, {}, error)
+            http_cache.store("http://api.test", {"q": 2}, 200, {}, b'{"query": {}}')
+            self.assertIsNone(http_cache.lookup("http://api.test", {"q": 1}))
+            self.assertIsNotNone(http_cache.lookup("http://api.test", {"q": 2}))
+
+    def test_record_and_replay(self):
+        """A recorded run can be replayed without the network; requests it did not make fail."""
+        def run(url):
+            service = type("StandInWikipediaService", (NewWikipediaService,), {"BASE_API_URL": url})
+            listing = service.get_random_articles(3)
+            return listing, MediaWikiBatchFetcher(url).fetch_pages([article["id"] for article in listing])
+
+        with override_settings(WIKIPEDIA_HTTP_CACHE_DIR=self.directory.name, WIKIPEDIA_HTTP_CACHE_MODE="record"):
+            with WikipediaStandIn() as stand_in:
+                recorded = run(stand_in.url)
+
+        with override_settings(WIKIPEDIA_HTTP_CACHE_DIR=self.directory.name, WIKIPEDIA_HTTP_CACHE_MODE="replay"):
+            self.assertEqual(run(stand_in.url), recorded)     # The stand-in is gone
+            with self.assertRaises(CacheMiss):
+                http_client.get(stand_in.url, params={"pageids": "99"})
+            self.assertEqual(http_cache.get_response_cache().mode, "replay")
+
+        self.assertEqual(recorded[1]["1"]["title"], "Article 1")
@@ -0,0 +1,111 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from game import http_client
+from game.new_wikipedia_service import NewWikipediaService
+
+
+class FlakyServer:
+    """Local server answering each request with the next (status, headers, delay) of answers, then 200s."""
+
+    def __init__(self, answers=()):
+        self.answers = list(answers)
+        self.requests = 0
+        self.connections = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"     # Keep-alive
+
+            def do_GET(self):
+                server.requests += 1
+                server.connections.add(self.client_address)
+                status, headers, delay = server.answers.pop(0) if server.answers else (200, {}, 0)
+                time.sleep(delay)
+                body = b'{"ok": true}'
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/w/api.php"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@override_settings(WIKIPEDIA_HTTP_BACKOFF=0, WIKIPEDIA_HTTP_RETRIES=3, WIKIPEDIA_HTTP_TIMEOUT=(1, 1))
+class HTTPClientTest(SimpleTestCase):
+    """Test suite for the shared HTTP client of the Wikipedia services."""
+
+    def setUp(self):
+        http_client.reset_session()
+
+    def tearDown(self):
+        http_client.reset_session()
+
+    def test_shared_session(self):
+        """Requests share one session and reuse its connection."""
+        self.assertIs(http_client.get_session(), http_client.get_session())
+        with FlakyServer() as server:
+            for _ in range(3):
+                self.assertEqual(http_client.get(server.url, params={"q": 1}).json(), {"ok": True})
+        self.assertEqual(server.requests, 3)
+        self.assertEqual(len(server.connections), 1)
+        self.assertEqual(http_client.get_session().headers["User-Agent"], http_client.get_user_agent())
+
+    def test_retries_server_errors(self):
+        """429 and 5xx answers are retried, honouring Retry-After."""
+        with FlakyServer([(503, {}, 0), (429, {"Retry-After": "0"}, 0)]) as server:
+            response = http_client.get(server.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(server.requests, 3)
+
+    @override_settings(WIKIPEDIA_HTTP_RETRIES=1)
+    def test_gives_up(self):
+        """After the last retry, the failed answer is returned for raise_for_status."""
+        with FlakyServer([(500, {}, 0)] * 3) as server:
+            response = http_client.get(server.url)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(server.requests, 2)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            response.raise_for_status()
+
+    @override_settings(WIKIPEDIA_HTTP_RETRIES=0, WIKIPEDIA_HTTP_TIMEOUT=(1, 0.2))
+    def test_timeout(self):
+        """Slow answers time out instead of hanging."""
+        with FlakyServer([(200, {}, 1)]) as server:
+            with self.assertRaises(requests.exceptions.RequestException):
+                http_client.get(server.url)
+
+    def test_adapter(self):
+        """Both schemes use the pooled adapter with the configured retries."""
+        with override_settings(WIKIPEDIA_HTTP_POOL_SIZE=4):
+            adapter = http_client.make_adapter()
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+
+    def test_shared_wiki_client(self):
+        """The Wikipedia-API client is created once, with the pooled adapter."""
+        with patch.object(NewWikipediaService, "_wiki", None):
+            wiki = NewWikipediaService.get_wiki()
+            self.assertIs(NewWikipediaService().wiki, wiki)
+            self.assertIsInstance(wiki._session.get_adapter("https://en.wikipedia.org").max_retries, http_client.Retry)
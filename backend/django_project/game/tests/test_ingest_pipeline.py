@@ -0,0 +1,88 @@
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from game import http_client
+from game.ingest_pipeline import IngestPipeline
+from game.models import ArticleCache
+from game.new_wikipedia_service import NewWikipediaService
+from game.tests.wikipedia_stand_in import WikipediaStandIn
+
+
+def make_service(stand_in):
+    """Returns a NewWikipediaService pointed at stand_in."""
+    return type("StandInWikipediaService", (NewWikipediaService,), {"BASE_API_URL": stand_in.url})
+
+
+class IngestPipelineTest(TestCase):
+    """Test suite for the concurrent ingest pipeline, against a local stand-in for the MediaWiki API."""
+
+    def test_ingests_articles(self):
+        """New articles are stored with their text and images; stubs and missing pages are dropped."""
+        with WikipediaStandIn(missing={3}) as stand_in:
+            articles = make_service(stand_in).ingest_random_articles(count=6, workers=4)
+
+        self.assertEqual(len(articles), 6)
+        self.assertEqual(ArticleCache.objects.count(), 6)
+        for article in articles:
+            n = article.article_id
+            self.assertNotEqual(int(n) % 5, 0)
+            self.assertNotEqual(n, "3")
+            self.assertEqual(article.title, "Article " + n)
+            self.assertGreater(len(article.content), 1000)
+            self.assertEqual(article.image_urls, ["http://upload.test/" + n + ".jpg"])
+
+    def test_overlaps_requests(self):
+        """Network stages run concurrently."""
+        with WikipediaStandIn(delay=0.02) as stand_in:
+            pipeline = IngestPipeline(make_service(stand_in), workers=4)
+            articles = pipeline.run(8)
+
+        self.assertEqual(len(articles), 8)
+        self.assertGreater(stand_in.max_in_flight, 1)
+        self.assertEqual(pipeline.stats["cached"], 8)
+        self.assertGreater(pipeline.stats["stubs"], 0)
+
+    def test_skips_cached(self):
+        """Articles already in the cache are not fetched again."""
+        ArticleCache.objects.create(article_id="1", title="Cached", content="Cached text")
+        with WikipediaStandIn() as stand_in:
+            pipeline = IngestPipeline(make_service(stand_in), workers=2)
+            articles = pipeline.run(2)
+
+        self.assertNotIn("1", [article.article_id for article in articles])
+        self.assertEqual(pipeline.stats["skipped"], 1)
+        self.assertEqual(ArticleCache.objects.get(article_id="1").title, "Cached")
+        self.assertFalse(any(request.get("pageids") == "1" for request in stand_in.requests))
+
+    def test_bounded_candidates(self):
+        """Listing stops after max_candidates ids, even if too few articles were stored."""
+        with WikipediaStandIn(missing=set(range(1, 100))) as stand_in:
+            pipeline = IngestPipeline(make_service(stand_in), workers=2)
+            articles = pipeline.run(3, max_candidates=10)
+
+        self.assertEqual(articles, [])
+        self.assertEqual(pipeline.stats["listed"], 10)
+        self.assertEqual(pipeline.stats["content_failed"], 10)
+
+    @override_settings(WIKIPEDIA_HTTP_RETRIES=0)
+    def test_unreachable(self):
+        """With the API down, nothing is listed and nothing is stored."""
+        http_client.reset_session()
+        with WikipediaStandIn() as stand_in:
+            service = make_service(stand_in)
+        self.assertEqual(service.ingest_random_articles(count=2, workers=2), [])
+        http_client.reset_session()
+
+    @patch("game.new_wikipedia_service.NewWikipediaService.ingest_random_articles")
+    def test_command_workers(self, mock_ingest):
+        """fetch_wikipedia_articles --workers uses the pipeline."""
+        mock_ingest.return_value = [MagicMock(title="Ingested Article")]
+
+        out = StringIO()
+        call_command("fetch_wikipedia_articles", count=1, workers=3, stdout=out)
+
+        mock_ingest.assert_called_once_with(1, workers=3)
+        self.assertIn("Ingested Article", out.getvalue())
@@ -1,11 +1,14 @@
 from io import StringIO
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 from django.utils import timezone
 import datetime
 from unittest.mock import patch, MagicMock
 
-from game.models import ArticleCache
+from game.models import ArticleCache, GameState, UserGuess
+from django.contrib.auth.models import User
+import numpy as np
 
 
 class FetchWikipediaArticlesCommandTest(TestCase):
@@ -368,3 +371,82 @@ class ManageArticlesCommandTest(TestCase):
         self.assertIn("Images:", output)
         self.assertIn("http://example.com/image1.jpg", output)
         self.assertIn("http://example.com/image2.jpg", output)
+
+
+class BackfillGuessScoresCommandTest(TestCase):
+    """Test the backfill_guess_scores management command"""
+
+    def setUp(self):
+        user = User.objects.create_user(username="backfill", password="password")
+        article = ArticleCache.objects.create(article_id="article1", title="Cat", content="The cat is a pet.")
+        game_state = GameState.objects.create(user=user, article=article)
+        self.unscored = UserGuess.objects.create(game_state=game_state, guess_text="dog", score=0)
+        self.scored = UserGuess.objects.create(game_state=game_state, guess_text="pet", score=500, similarity_score=0.5)
+
+    @patch("game.management.commands.backfill_guess_scores.score_guesses")
+    def test_backfill_missing_scores(self, mock_score):
+        """Only guesses without a similarity score are scored by default"""
+        mock_score.return_value = (np.array([0.25], dtype=np.float32), None, None)
+
+        out = StringIO()
+        call_command("backfill_guess_scores", batch_size=10, stdout=out)
+
+        mock_score.assert_called_once_with(["dog"], ["Cat"], batch_size=10, n_process=1)
+        self.unscored.refresh_from_db()
+        self.assertAlmostEqual(self.unscored.similarity_score, 0.25)
+        self.assertIn("updated 1", out.getvalue())
+
+    @patch("game.management.commands.backfill_guess_scores.score_guesses")
+    def test_backfill_all_dry_run(self, mock_score):
+        """--all rescores every guess and --dry-run saves nothing"""
+        mock_score.return_value = (np.array([0.25, 0.5], dtype=np.float32), None, None)
+
+        out = StringIO()
+        call_command("backfill_guess_scores", all=True, dry_run=True, stdout=out)
+
+        self.assertEqual(mock_score.call_args[0][0], ["dog", "pet"])
+        self.unscored.refresh_from_db()
+        self.assertEqual(self.unscored.similarity_score, 0.0)
+        self.assertIn("1 would change", out.getvalue())
+
+    @patch("game.management.commands.backfill_guess_scores.score_guesses")
+    def test_backfill_chunks(self, mock_score):
+        """Guesses are scored chunk by chunk"""
+        mock_score.side_effect = lambda texts, titles, **kwargs: (np.full(len(texts), 0.75, dtype=np.float32), None, None)
+
+        call_command("backfill_guess_scores", all=True, chunk_size=1, stdout=StringIO())
+
+        self.assertEqual(mock_score.call_count, 2)
+        self.assertEqual(UserGuess.objects.filter(similarity_score=0.75).count(), 2)
+
+    def test_nothing_to_backfill(self):
+        """The command reports when there is nothing to score"""
+        UserGuess.objects.all().delete()
+        out = StringIO()
+        call_command("backfill_guess_scores", stdout=out)
+        self.assertIn("No guesses to score", out.getvalue())
+
+
+class RunNLPWorkerCommandTest(TestCase):
+    """Test the run_nlp_worker management command"""
+
+    @patch("game.management.commands.run_nlp_worker.nlp_models.preload")
+    @patch("game.management.commands.run_nlp_worker.NLPServer")
+    def test_run_worker(self, MockServer, mock_preload):
+        """The model is loaded before serving, with the given socket and batching options"""
+        MockServer.return_value.stats.return_value = {"requests": 3, "batches": 2}
+
+        out = StringIO()
+        call_command("run_nlp_worker", address="/tmp/nlp.sock", batch_size=8, batch_wait_ms=2, stdout=out)
+
+        mock_preload.assert_called_once()
+        MockServer.assert_called_once_with("/tmp/nlp.sock", 8, 0.002)
+        MockServer.return_value.serve_forever.assert_called_once()
+        MockServer.return_value.close.assert_called_once()
+        self.assertIn("3 requests in 2 batches", out.getvalue())
+
+    def test_no_address(self):
+        """Without an address the command fails"""
+        with self.settings(NLP_SERVICE_ADDRESS=None):
+            with self.assertRaises(CommandError):
+                call_command("run_nlp_worker", stdout=StringIO())
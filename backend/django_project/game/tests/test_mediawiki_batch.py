@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+
+from game.mediawiki_batch import MediaWikiBatchFetcher, chunks, is_content_image
+from game.models import ArticleCache
+from game.new_wikipedia_service import NewWikipediaService
+from game.tests.wikipedia_stand_in import WikipediaStandIn
+
+
+class MediaWikiBatchFetcherTest(TestCase):
+    """Test suite for batched MediaWiki queries, against a local stand-in for the MediaWiki API."""
+
+    def test_fetch_pages(self):
+        """Titles, categories and image URLs of many pages come from a few requests."""
+        with WikipediaStandIn(missing={7}) as stand_in:
+            fetcher = MediaWikiBatchFetcher(stand_in.url)
+            pages = fetcher.fetch_pages(range(1, 121))
+
+        self.assertEqual(len(pages), 120)
+        self.assertEqual(pages["1"]["title"], "Article 1")
+        self.assertEqual(pages["1"]["images"], ["http://upload.test/1.jpg"])   # Icons are left out
+        self.assertEqual(pages["5"]["categories"], [{"title": "Category:Stubs"}])
+        self.assertTrue(pages["7"]["missing"])
+        self.assertEqual(pages["7"]["images"], [])
+        self.assertFalse(pages["8"]["missing"])
+
+        # 3 queries of 50 pages, then 3 of 50 image titles
+        self.assertEqual(fetcher.stats["requests"], 6)
+        self.assertEqual(len(stand_in.requests), 6)
+        self.assertTrue(all(len(request.get("pageids", request.get("titles")).split("|")) <= 50 for request in stand_in.requests))
+
+    def test_continuation(self):
+        """Lists split over continued responses are merged."""
+        with WikipediaStandIn(images_per_response=4) as stand_in:
+            fetcher = MediaWikiBatchFetcher(stand_in.url)
+            pages = fetcher.fetch_pages([1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+
+        for n in range(1, 11):
+            self.assertEqual(pages[str(n)]["images"], ["http://upload.test/" + str(n) + ".jpg"])
+            self.assertEqual(len(pages[str(n)]["categories"]), 1)
+        self.assertEqual([request.get("imcontinue") for request in stand_in.requests[:3]], [None, "4", "8"])
+
+    @patch("game.mediawiki_batch.http_client.get")
+    def test_normalized_titles(self, mock_get):
+        """Image URLs are keyed by the titles asked for, even when the API normalizes them."""
+        mock_get.return_value.json.return_value = {"query": {
+            "normalized": [{"from": "File:A_cat.jpg", "to": "File:A cat.jpg"}],
+            "pages": {"-1": {"title": "File:A cat.jpg", "imageinfo": [{"url": "http://upload.test/cat.jpg"}]}},
+        }}
+        urls = MediaWikiBatchFetcher("http://api.test").fetch_image_urls(["File:A_cat.jpg"])
+        self.assertEqual(urls, {"File:A_cat.jpg": "http://upload.test/cat.jpg"})
+
+    def test_helpers(self):
+        """Batches hold at most 50 items; icons and non-images are not content images."""
+        self.assertEqual([len(chunk) for chunk in chunks(range(120))], [50, 50, 20])
+        self.assertTrue(is_content_image("File:Cat.JPG"))
+        self.assertFalse(is_content_image("File:Icon cat.png"))
+        self.assertFalse(is_content_image("File:Cat.svg"))
+
+
+class BatchedFetchAndCacheTest(TestCase):
+    """Test suite for fetch_and_cache_random_articles with batched metadata."""
+
+    def test_fetch_and_cache(self):
+        """Only the text of each article is fetched on its own; stubs by category are skipped before that."""
+        wiki = MagicMock()
+        wiki.page.side_effect = lambda title: MagicMock(text=title + " is about things. " * 100)
+
+        with WikipediaStandIn() as stand_in:
+            service = type("StandInWikipediaService", (NewWikipediaService,), {"BASE_API_URL": stand_in.url})
+            with patch.object(NewWikipediaService, "get_wiki", return_value=wiki):
+                articles = service.fetch_and_cache_random_articles(count=6)
+
+        self.assertEqual(len(articles), 6)
+        self.assertEqual([article.article_id for article in articles], ["1", "2", "3", "4", "6", "7"])
+        self.assertEqual(ArticleCache.objects.get(article_id="6").image_urls, ["http://upload.test/6.jpg"])
+
+        # One listing, one metadata query and one image query for all 20 candidates
+        self.assertEqual(len(stand_in.requests), 3)
+        self.assertEqual(wiki.page.call_count, 6)
+        self.assertNotIn("Article 5", [call.args[0] for call in wiki.page.call_args_list])
+
+    def test_deleted_page(self):
+        """A page deleted after the batch query is skipped, not cached with empty text."""
+        page_data = {"pageid": "4", "title": "Article 4", "categories": [], "images": [], "missing": False}
+        wiki = MagicMock()
+        wiki.page.return_value.exists.return_value = False
+        with patch.object(NewWikipediaService, "get_wiki", return_value=wiki):
+            self.assertIsNone(NewWikipediaService.get_article_content(4, page_data=page_data))
@@ -21,7 +21,7 @@ class MockArticleCache:
 class NewWikipediaServiceTest(TestCase):
     """Test suite for the NewWikipediaService."""
 
-    @patch("game.new_wikipedia_service.requests.get")
+    @patch("game.new_wikipedia_service.http_client.get")
     def test_get_random_articles_success(self, mock_get):
         """Test successful fetching of random articles."""
         mock_get.return_value.json.return_value = {
@@ -47,7 +47,7 @@ class NewWikipediaServiceTest(TestCase):
         self.assertEqual(call_params['rnlimit'], 4)
         self.assertEqual(call_params['rnnamespace'], 0)
 
-    @patch("game.new_wikipedia_service.requests.get")
+    @patch("game.new_wikipedia_service.http_client.get")
     def test_get_random_articles_request_exception(self, mock_get):
         """Test error handling for RequestException in get_random_articles (covers lines 58-60)."""
         mock_get.side_effect = requests.exceptions.RequestException("Network Error")
@@ -55,7 +55,7 @@ class NewWikipediaServiceTest(TestCase):
         articles = NewWikipediaService.get_random_articles(count=2)
         self.assertEqual(articles, [])  # Should return empty list on error
 
-    @patch("game.new_wikipedia_service.requests.get")
+    @patch("game.new_wikipedia_service.http_client.get")
     def test_get_random_articles_malformed_response(self, mock_get):
         """Test handling of unexpected API response format in get_random_articles."""
         # Simulate a response missing 'query' or 'random'
@@ -65,13 +65,13 @@ class NewWikipediaServiceTest(TestCase):
         articles = NewWikipediaService.get_random_articles(count=2)
         self.assertEqual(articles, [])  # Should return empty list
 
-    @patch("game.new_wikipedia_service.requests.get")
+    @patch("game.new_wikipedia_service.http_client.get")
     @patch("game.new_wikipedia_service.NewWikipediaService._get_image_urls", return_value=["http://image.com/img1.jpg"])
-    @patch("game.new_wikipedia_service.wikipediaapi.Wikipedia")  # Mock the wikipediaapi class
-    def test_get_article_content_success(self, mock_wikipedia_class, mock_image_urls, mock_get):
+    @patch("game.new_wikipedia_service.NewWikipediaService.get_wiki")  # Mock the shared Wikipedia-API client
+    def test_get_article_content_success(self, mock_get_wiki, mock_image_urls, mock_get):
         """Test successful fetching of article content."""
         # --- Mocking wikipediaapi ---
-        # Mock the instance returned by Wikipedia(...)
+        # Mock the instance returned by get_wiki()
         mock_wiki_instance = MagicMock()
         # Mock the page object returned by wiki_instance.page(...)
         mock_page_object = MagicMock()
@@ -79,8 +79,8 @@ class NewWikipediaServiceTest(TestCase):
         # FIX: Make content longer than 1000 characters to avoid false stub detection
         mock_page_object.text = "This is non-stub article content. " * 100
         mock_wiki_instance.page.return_value = mock_page_object
-        # Make the Wikipedia class return our mocked instance
-        mock_wikipedia_class.return_value = mock_wiki_instance
+        # Make the shared client our mocked instance
+        mock_get_wiki.return_value = mock_wiki_instance
         # ---------------------------
 
         # Mock the requests.get call for page info
@@ -111,7 +111,7 @@ class NewWikipediaServiceTest(TestCase):
         self.assertFalse(article["is_stub"], "Article should not be detected as stub")
         mock_image_urls.assert_called_once_with("Test Title")
 
-    @patch("game.new_wikipedia_service.requests.get")
+    @patch("game.new_wikipedia_service.http_client.get")
     def test_get_article_content_request_exception(self, mock_get):
         """Test RequestException during page info fetch in get_article_content (covers lines 127-129)."""
         # Simulate error on the first API call (fetching page info)
@@ -120,7 +120,7 @@ class NewWikipediaServiceTest(TestCase):
         article = NewWikipediaService.get_article_content(pageid=123)
         self.assertIsNone(article)
 
-    @patch("game.new_wikipedia_service.requests.get")
+    @patch("game.new_wikipedia_service.http_client.get")
     def test_get_article_content_malformed_response(self, mock_get):
         """Test malformed API response for page info in get_article_content (covers lines 100-101)."""
         # Simulate a response missing 'query' or 'pages'
@@ -130,9 +130,9 @@ class NewWikipediaServiceTest(TestCase):
         article = NewWikipediaService.get_article_content(pageid=123)
         self.assertIsNone(article)
 
-    @patch("game.new_wikipedia_service.requests.get")
-    @patch("game.new_wikipedia_service.wikipediaapi.Wikipedia")
-    def test_get_article_content_page_does_not_exist(self, mock_wikipedia_class, mock_get):
+    @patch("game.new_wikipedia_service.http_client.get")
+    @patch("game.new_wikipedia_service.NewWikipediaService.get_wiki")
+    def test_get_article_content_page_does_not_exist(self, mock_get_wiki, mock_get):
         """Test handling when wikipediaapi says page doesn't exist (covers lines 110-111)."""
         # Mock the page info call to succeed
         mock_get.return_value.json.return_value = {
@@ -145,14 +145,14 @@ class NewWikipediaServiceTest(TestCase):
         mock_page_object = MagicMock()
         mock_page_object.exists.return_value = False  # The crucial part
         mock_wiki_instance.page.return_value = mock_page_object
-        mock_wikipedia_class.return_value = mock_wiki_instance
+        mock_get_wiki.return_value = mock_wiki_instance
 
         article = NewWikipediaService.get_article_content(pageid=123)
         self.assertIsNone(article)
 
-    @patch("game.new_wikipedia_service.requests.get")
-    @patch("game.new_wikipedia_service.wikipediaapi.Wikipedia")
-    def test_get_article_content_general_exception(self, mock_wikipedia_class, mock_get):
+    @patch("game.new_wikipedia_service.http_client.get")
+    @patch("game.new_wikipedia_service.NewWikipediaService.get_wiki")
+    def test_get_article_content_general_exception(self, mock_get_wiki, mock_get):
         """Test general exception handling in get_article_content (covers lines 127-129)."""
         # Mock the page info call to succeed
         mock_get.return_value.json.return_value = {
@@ -163,7 +163,7 @@ class NewWikipediaServiceTest(TestCase):
         # Mock wikipediaapi page access to raise a generic exception
         mock_wiki_instance = MagicMock()
         mock_wiki_instance.page.side_effect = Exception("Something went wrong")
-        mock_wikipedia_class.return_value = mock_wiki_instance
+        mock_get_wiki.return_value = mock_wiki_instance
 
         article = NewWikipediaService.get_article_content(pageid=123)
         self.assertIsNone(article)
@@ -207,7 +207,7 @@ class NewWikipediaServiceTest(TestCase):
 
     # --- Tests for _get_image_urls ---
 
-    @patch("game.new_wikipedia_service.requests.get")
+    @patch("game.new_wikipedia_service.http_client.get")
     def test_get_image_urls_success(self, mock_get):
         """Test successful fetching of image URLs."""
         # Mock response for the first call (getting image titles)
@@ -263,7 +263,7 @@ class NewWikipediaServiceTest(TestCase):
         expected_titles = "File:Image1.jpg|File:Image2.png"
         self.assertEqual(second_call_params['titles'], expected_titles)
 
-    @patch("game.new_wikipedia_service.requests.get")
+    @patch("game.new_wikipedia_service.http_client.get")
     def test_get_image_urls_request_exception(self, mock_get):
         """Test RequestException in _get_image_urls (covers lines 224-226)."""
         # Simulate error on the first API call (fetching image titles)
@@ -272,7 +272,7 @@ class NewWikipediaServiceTest(TestCase):
         urls = NewWikipediaService._get_image_urls("Some Title")
         self.assertEqual(urls, [])  # Should return empty list on error
 
-    @patch("game.new_wikipedia_service.requests.get")
+    @patch("game.new_wikipedia_service.http_client.get")
     def test_get_image_urls_request_exception_info(self, mock_get):
         """Test RequestException when fetching image info in _get_image_urls (covers lines 224-226)."""
         # Mock response for the first call (getting image titles) - SUCCESS
@@ -313,7 +313,7 @@ class NewWikipediaServiceTest(TestCase):
         mock_response_titles.raise_for_status = MagicMock()
 
         # Patch requests.get just for this test
-        with patch("game.new_wikipedia_service.requests.get", return_value=mock_response_titles) as mock_get_local:
+        with patch("game.new_wikipedia_service.http_client.get", return_value=mock_response_titles) as mock_get_local:
             urls = NewWikipediaService._get_image_urls("Some Article Title")
             self.assertEqual(urls, [])
             # Only one call should be made, as there are no valid titles to get URLs for
@@ -322,12 +322,13 @@ class NewWikipediaServiceTest(TestCase):
     # --- Tests for fetch_and_cache_random_articles ---
 
     # FIX: Update the mock cache decorator return value to match article 'B'
+    @patch("game.new_wikipedia_service.NewWikipediaService.get_article_batch", return_value={})
     @patch("game.new_wikipedia_service.ArticleService.cache_article", return_value=MockArticleCache(title="B", article_id="2"))
     @patch("game.new_wikipedia_service.ArticleService.get_article_by_id", return_value=None)  # Assume nothing is cached initially
     @patch("game.new_wikipedia_service.NewWikipediaService.get_article_content")
     @patch("game.new_wikipedia_service.NewWikipediaService.get_random_articles")
     def test_fetch_and_cache_random_articles_success(
-        self, mock_get_random, mock_get_content, mock_get_by_id, mock_cache
+        self, mock_get_random, mock_get_content, mock_get_by_id, mock_cache, mock_get_batch
     ):
         """Test successful fetching and caching, including logging (covers line 258)."""
         mock_get_random.return_value = [
@@ -365,8 +366,8 @@ class NewWikipediaServiceTest(TestCase):
         mock_get_by_id.assert_any_call('2')
         # FIX: Assert get_content was called for both IDs
         self.assertEqual(mock_get_content.call_count, 2)
-        mock_get_content.assert_any_call(1)
-        mock_get_content.assert_any_call(2)
+        mock_get_content.assert_any_call(1, page_data=None)
+        mock_get_content.assert_any_call(2, page_data=None)
         # --------------------------------------------------
         # Should cache article 2 (since article 1's content fetch returned None)
         mock_cache.assert_called_once_with(
@@ -376,12 +377,13 @@ class NewWikipediaServiceTest(TestCase):
             image_urls=[]
         )
 
+    @patch("game.new_wikipedia_service.NewWikipediaService.get_article_batch", return_value={})
     @patch("game.new_wikipedia_service.ArticleService.cache_article")
     @patch("game.new_wikipedia_service.ArticleService.get_article_by_id", return_value=None)  # Assume nothing is cached
     @patch("game.new_wikipedia_service.NewWikipediaService.get_article_content")
     @patch("game.new_wikipedia_service.NewWikipediaService.get_random_articles")
     def test_fetch_and_cache_skips_failed_content_fetch(
-        self, mock_get_random, mock_get_content, mock_get_by_id, mock_cache
+        self, mock_get_random, mock_get_content, mock_get_by_id, mock_cache, mock_get_batch
     ):
         """Test that fetch_and_cache skips articles if get_content fails (covers lines 252-253)."""
         mock_get_random.return_value = [
@@ -404,19 +406,20 @@ class NewWikipediaServiceTest(TestCase):
         mock_get_random.assert_called_once_with(4)  # count * 2
         # Should attempt to get content for both
         self.assertEqual(mock_get_content.call_count, 2)
-        mock_get_content.assert_any_call(1)
-        mock_get_content.assert_any_call(2)
+        mock_get_content.assert_any_call(1, page_data=None)
+        mock_get_content.assert_any_call(2, page_data=None)
         # cache_article should only be called once (for article B)
         mock_cache.assert_called_once_with(
             article_id='2', title='B', content='Content B', image_urls=[]
         )
 
+    @patch("game.new_wikipedia_service.NewWikipediaService.get_article_batch", return_value={})
     @patch("game.new_wikipedia_service.ArticleService.cache_article")
     @patch("game.new_wikipedia_service.ArticleService.get_article_by_id", return_value=None)  # Assume nothing cached
     @patch("game.new_wikipedia_service.NewWikipediaService.get_article_content")
     @patch("game.new_wikipedia_service.NewWikipediaService.get_random_articles")
     def test_fetch_and_cache_skips_stub(
-        self, mock_get_random, mock_get_content, mock_get_by_id, mock_cache
+        self, mock_get_random, mock_get_content, mock_get_by_id, mock_cache, mock_get_batch
     ):
         """Test that fetch_and_cache skips stub articles."""
         mock_get_random.return_value = [
@@ -438,19 +441,20 @@ class NewWikipediaServiceTest(TestCase):
         mock_get_random.assert_called_once_with(4)  # count * 2
         # Should attempt to get content for both
         self.assertEqual(mock_get_content.call_count, 2)
-        mock_get_content.assert_any_call(1)
-        mock_get_content.assert_any_call(2)
+        mock_get_content.assert_any_call(1, page_data=None)
+        mock_get_content.assert_any_call(2, page_data=None)
         # cache_article should only be called once (for article 2, since 1 was a stub)
         mock_cache.assert_called_once_with(
             article_id='2', title='NotAStub', content='Real content', image_urls=[]
         )
 
+    @patch("game.new_wikipedia_service.NewWikipediaService.get_article_batch", return_value={})
     @patch("game.new_wikipedia_service.ArticleService.cache_article")  # Need to patch cache even if not called
     @patch("game.new_wikipedia_service.ArticleService.get_article_by_id")  # Mock this specifically
     @patch("game.new_wikipedia_service.NewWikipediaService.get_article_content")
     @patch("game.new_wikipedia_service.NewWikipediaService.get_random_articles")
     def test_fetch_and_cache_uses_existing(
-        self, mock_get_random, mock_get_content, mock_get_by_id, mock_cache  # mock_cache is patched but not used
+        self, mock_get_random, mock_get_content, mock_get_by_id, mock_cache, mock_get_batch  # mock_cache is patched but not used
     ):
         """Test that fetch_and_cache uses already cached articles."""
         mock_get_random.return_value = [
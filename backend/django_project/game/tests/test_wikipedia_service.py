@@ -7,7 +7,7 @@ from game.wikipedia_service import WikipediaService
 class WikipediaServiceTest(TestCase):
     """Test the WikipediaService class"""
 
-    @patch("game.wikipedia_service.requests.get")
+    @patch("game.wikipedia_service.http_client.get")
     def test_get_random_articles(self, mock_get):
         """Test fetching random articles"""
         # Setup mock response
@@ -38,7 +38,7 @@ class WikipediaServiceTest(TestCase):
         self.assertEqual(kwargs["params"]["rnlimit"], 2)
         self.assertEqual(kwargs["params"]["rnnamespace"], 0)
 
-    @patch("game.wikipedia_service.requests.get")
+    @patch("game.wikipedia_service.http_client.get")
     def test_get_random_articles_error(self, mock_get):
         """Test error handling when fetching random articles"""
         # Setup mock to directly raise an exception
@@ -52,7 +52,7 @@ class WikipediaServiceTest(TestCase):
         # Verify empty result on error
         self.assertEqual(articles, [])
 
-    @patch("game.wikipedia_service.requests.get")
+    @patch("game.wikipedia_service.http_client.get")
     @patch("game.wikipedia_service.WikipediaService._get_image_urls")
     def test_get_article_content(self, mock_get_images, mock_get):
         """Test fetching article content"""
@@ -82,7 +82,7 @@ class WikipediaServiceTest(TestCase):
             article_data["images"], ["http://example.com/image1.jpg"]
         )
 
-    @patch("game.wikipedia_service.requests.get")
+    @patch("game.wikipedia_service.http_client.get")
     def test_get_article_content_error(self, mock_get):
         """Test error handling when fetching article content"""
         # Setup mock to directly raise an exception
@@ -127,7 +127,7 @@ class WikipediaServiceTest(TestCase):
         self.assertNotIn("alert", text)  # Script content removed
         self.assertNotIn("color:red", text)  # Style content removed
 
-    @patch("game.wikipedia_service.requests.get")
+    @patch("game.wikipedia_service.http_client.get")
     def test_get_image_urls(self, mock_get):
         """Test getting image URLs"""
         # Setup mock response
@@ -214,7 +214,7 @@ class WikipediaServiceTest(TestCase):
             image_urls=["image2.jpg"],
         )
 
-    @patch("game.wikipedia_service.requests.get")
+    @patch("game.wikipedia_service.http_client.get")
     def test_get_image_urls_error(self, mock_get):
         """Test error handling when getting image URLs"""
         # Setup mock to raise exception
@@ -228,7 +228,7 @@ class WikipediaServiceTest(TestCase):
         # Verify empty result on error
         self.assertEqual(urls, [])
 
-    @patch("game.wikipedia_service.requests.get")
+    @patch("game.wikipedia_service.http_client.get")
     def test_get_image_urls_empty(self, mock_get):
         """Test getting image URLs with empty input"""
         # Call with empty list
@@ -238,7 +238,7 @@ class WikipediaServiceTest(TestCase):
         self.assertEqual(urls, [])
         mock_get.assert_not_called()
 
-    @patch("game.wikipedia_service.requests.get")
+    @patch("game.wikipedia_service.http_client.get")
     def test_get_image_urls_no_images_found(self, mock_get):
         """Test getting image URLs when no images match the filter"""
         # Call with only icon files
@@ -0,0 +1,118 @@
+"""
+wikipedia_stand_in.py
+
+This module contains a local stand-in for the MediaWiki API, for testing the Wikipedia services over real HTTP.
+
+Page n is titled "Article n"; pages whose id is a multiple of 5 are stubs and pages in `missing` do not exist.
+Every page has one image, "File:Image n.jpg", served from http://upload.test/n.jpg.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class WikipediaStandIn:
+    """
+    WikipediaStandIn serves the MediaWiki API queries the Wikipedia services make, on a local port.
+
+    delay adds a pause to every response; requests and max_in_flight record how it was used. With
+    images_per_response, image lists of more pages than that are split over continued responses.
+    """
+
+    def __init__(self, delay: float = 0, missing=(), images_per_response: int = 0):
+        self.delay = delay
+        self.missing = set(missing)
+        self.images_per_response = images_per_response
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                body = json.dumps(stand_in.answer(params)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/w/api.php"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def answer(self, params):
+        with self._lock:
+            self.requests.append(params)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return self._answer(params)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _answer(self, params):
+        if params.get("list") == "random":
+            with self._lock:
+                start, self._next_id = self._next_id, self._next_id + int(params["rnlimit"])
+            return {"query": {"random": [{"id": n, "title": "Article " + str(n)} for n in range(start, self._next_id)]}}
+
+        props = params.get("prop", "").split("|")
+        pages = {}
+        if "pageids" in params:
+            pageids = params["pageids"].split("|")
+            start = int(params.get("imcontinue", 0))
+            for i, pageid in enumerate(pageids):
+                if start and i < start:
+                    continue
+                pages[pageid] = self.page(int(pageid), props if not start else ["images"])
+            if "images" in props and self.images_per_response and len(pageids) - start > self.images_per_response:
+                # Long image lists come back in parts: the rest of the pages' images follow in the next response
+                end = start + self.images_per_response
+                for pageid in pageids[end:]:
+                    pages[pageid].pop("images", None)
+                return {"continue": {"imcontinue": str(end), "continue": "||"}, "query": {"pages": pages}}
+        elif "imageinfo" in props:
+            for title in params["titles"].split("|"):
+                n = title.rsplit(" ", 1)[1].split(".")[0]
+                pages["-" + n] = {"title": title, "imageinfo": [{"url": "http://upload.test/" + n + ".jpg"}]}
+        elif "titles" in params:
+            for title in params["titles"].split("|"):
+                n = title.rsplit(" ", 1)[1]
+                pages[n] = {"pageid": int(n), "title": title,
+                            "images": [{"title": "File:Image " + n + ".jpg"}, {"title": "File:Icon " + n + ".svg"}]}
+        return {"query": {"pages": pages}}
+
+    def page(self, n, props):
+        if n in self.missing:
+            return {"pageid": n, "missing": ""}
+
+        stub = n % 5 == 0
+        page = {"pageid": n, "title": "Article " + str(n)}
+        if "categories" in props:
+            page["categories"] = [{"title": "Category:Stubs" if stub else "Category:Things"}]
+        if "extracts" in props:
+            page["extract"] = "Article " + str(n) + " is about things. " * (5 if stub else 100)
+        if "images" in props:
+            page["images"] = [{"title": "File:Image " + str(n) + ".jpg"}, {"title": "File:Icon " + str(n) + ".svg"}]
+        return page
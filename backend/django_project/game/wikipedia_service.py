@@ -3,6 +3,7 @@ import logging
 import re
 from bs4 import BeautifulSoup
 from .article_service import ArticleService
+from . import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +37,7 @@ class WikipediaService:
         }
 
         try:
-            response = requests.get(cls.BASE_API_URL, params=params)
+            response = http_client.get(cls.BASE_API_URL, params=params)
             response.raise_for_status()
             data = response.json()
 
@@ -76,7 +77,7 @@ class WikipediaService:
         }
 
         try:
-            response = requests.get(cls.BASE_API_URL, params=params)
+            response = http_client.get(cls.BASE_API_URL, params=params)
             response.raise_for_status()
             data = response.json()
 
@@ -221,7 +222,7 @@ class WikipediaService:
         }
 
         try:
-            response = requests.get(cls.BASE_API_URL, params=params)
+            response = http_client.get(cls.BASE_API_URL, params=params)
             response.raise_for_status()
             data = response.json()
 
@@ -3,10 +3,17 @@ import './ArticleDisplay.css';
 
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL; // Access the environment variable
 
-function ArticleDisplay() {
-    const [article, setArticle] = useState({}); // State to hold the article
+// article can be passed in by a parent that already loaded it (null while it is loading),
+// otherwise the component fetches it itself
+function ArticleDisplay({ article: givenArticle }) {
+    const [fetchedArticle, setArticle] = useState({}); // State to hold the article
+    const selfFetch = givenArticle === undefined;
+    const article = (selfFetch ? fetchedArticle : givenArticle) || {};
 
     useEffect(() => {
+        if (!selfFetch) {
+            return; // Parent provides the article
+        }
         const fetchArticle = async () => {
             try {
                 console.log(`Attempting to Fetch Article: ${API_BASE_URL}scrambled_article/`);
@@ -28,7 +35,7 @@ function ArticleDisplay() {
         };
 
         fetchArticle(); // Call the fetch function
-    }, []); // Runs when CSRF token is updated
+    }, [selfFetch]); // Runs once, unless the parent provides the data
 
     // Default Lorem Ipsum text
     const defaultText = `
@@ -3,10 +3,17 @@ import './GuessScoreboard.css';
 
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL; // Access the environment variable
 
-function GuessScoreboard() {
-    const [scores, setScores] = useState({}); // State to hold the scores
+// scores can be passed in by a parent that already loaded them (null while it is loading),
+// otherwise the component fetches them itself
+function GuessScoreboard({ scores: givenScores }) {
+    const [fetchedScores, setScores] = useState({}); // State to hold the scores
+    const selfFetch = givenScores === undefined;
+    const scores = selfFetch ? fetchedScores : givenScores;
     
     useEffect(() => {
+        if (!selfFetch) {
+            return; // Parent provides the scores
+        }
         const fetchScores = async () => {
             try {
                 console.log(`Attempting to Fetch Guess Scoreboard: ${API_BASE_URL}guess_scoreboard/`);
@@ -28,7 +35,7 @@ function GuessScoreboard() {
         };
 
         fetchScores(); // Call the fetch function
-    }, []); // Runs when CSRF token is updated
+    }, [selfFetch]); // Runs once, unless the parent provides the data
 
     return (
         <div className="guess-scoreboard">
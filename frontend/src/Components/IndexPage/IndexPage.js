@@ -18,21 +18,29 @@ function IndexPage() {
     const [showModal, setShowModal] = useState(false);
     const [showProfile, setShowProfile] = useState(false);
 
-    // Fetch game over status, score, and title
+    const [snapshot, setSnapshot] = useState(null);
+
+    // Show the game from a snapshot: article, scores and game over status in one response
+    const applySnapshot = (data) => {
+        setSnapshot(data);
+        setFinalScore(data.score);
+        setFinalTitle(data.title);
+        setShowProfile(true);
+
+        if (data.game_over) {
+            setShowModal(true);
+        }
+    };
+
+    // Fetch the whole game (article, scores, game over status, score, and title) in one request
     useEffect(() => {
-        axios.get(`${API_BASE_URL}game_over/`, { withCredentials: true })
+        axios.get(`${API_BASE_URL}game_snapshot/`, { withCredentials: true })
             .then(response => {
-                console.log('Game over response:', response.data);
-                setFinalScore(response.data.score);
-                setFinalTitle(response.data.title);
-                setShowProfile(true);
-
-                if (response.data.game_over) {
-                    setShowModal(true);
-                }
+                console.log('Game snapshot response:', response.data);
+                applySnapshot(response.data);
             })
             .catch(error => {
-                console.error('Error fetching game over status:', error);
+                console.error('Error fetching game snapshot:', error);
                 setShowModal(false);
                 setFinalScore("");
                 setFinalTitle("");
@@ -126,7 +134,7 @@ function IndexPage() {
         const trimmedInputValue = inputValue.trim();
         if (trimmedInputValue !== "") {
             const url = `${API_BASE_URL}process_guess/`;
-            const data = { 'guess': trimmedInputValue };
+            const data = { 'guess': trimmedInputValue, 'snapshot': true }; // Ask for the updated game back
             fetch(url, {
                 method: 'POST',
                 credentials: 'include',
@@ -139,7 +147,11 @@ function IndexPage() {
             .then(response => response.json())
             .then(data => {
                 console.log('Success:', data);
-                window.location.reload(); // Reload page 
+                if (data.snapshot) {
+                    applySnapshot(data.snapshot); // Show the updated game without reloading the page
+                } else {
+                    window.location.reload(); // Reload page
+                }
             })
             .catch((error) => {
                 console.error('Error:', error);
@@ -164,7 +176,7 @@ function IndexPage() {
             />}
 
             <div className = "game-container">
-                <GuessScoreboard />
+                <GuessScoreboard scores={snapshot ? snapshot.scores : null} />
 
                 <div className = "content">
                     <div className = "input-container-wrapper" onClick={() => textInputRef.current && textInputRef.current.focus()}>
@@ -199,7 +211,7 @@ function IndexPage() {
                         </div>
                         <div className="divider"></div>
                         <p className="blurb">From Wikipedia, the free encyclopedia</p>
-                        <ArticleDisplay />
+                        <ArticleDisplay article={snapshot ? snapshot.article : null} />
                     </div>
                 </div>
 